@@ -2,8 +2,10 @@
 Clase BeeAgent - Representa la abeja que se mueve por el mundo.
 Maneja el movimiento, detección de celdas e interacción con el clasificador.
 """
-import time
 from config import *
+from detection_log import DetectionLog
+from detection_pipeline import AsyncDetector, LookaheadClassifier
+from simulation_clock import SimulationClock
 from utils import Logger, load_random_flower_test_image, load_random_object_image
 
 
@@ -13,13 +15,15 @@ class BeeAgent:
     Realiza detección de flores y objetos usando el clasificador.
     """
     
-    def __init__(self, grid_world, classifier):
+    def __init__(self, grid_world, classifier, log_dir=None):
         """
         Inicializa el agente abeja.
         
         Args:
             grid_world: Instancia de GridWorld
-            classifier: Instancia de FlowerClassifier
+            classifier: Instancia de FlowerClassifier, o None para simular sin
+                clasificar imágenes (ejecuciones sin pantalla)
+            log_dir: Directorio donde volcar detection_log (None = solo en memoria)
         """
         self.grid_world = grid_world
         self.classifier = classifier
@@ -30,7 +34,19 @@ class BeeAgent:
         self.flowers_detected = 0
         self.objects_detected = 0
         self.cells_visited = 0
-        self.detection_log = []  # Lista de detecciones (pos, tipo, confianza)
+        self.detection_log = DetectionLog(directory=log_dir, name='abeja')  # Registro columnar de detecciones
+        
+        # Clasificación anticipada del camino planificado (posición -> imagen, clase real)
+        self.lookahead = LookaheadClassifier(classifier) if classifier is not None else None
+        self.planned_detections = {}
+        
+        # Detección asíncrona (se crea con la primera submit_detection) y
+        # función opcional que recibe cada entrada nueva de detection_log
+        self.async_detector = None
+        self.on_detection = None
+        
+        # Reloj de los retardos de follow_path (el simulador lo comparte con la animación)
+        self.clock = SimulationClock()
         
         Logger.log("BeeAgent inicializado")
     
@@ -56,61 +72,127 @@ class BeeAgent:
             Logger.log(f"Posición {position} no es transitable", "WARNING")
             return False
     
-    def detect_cell_content(self, cell_type=None):
+    def _pick_image(self, cell_type):
         """
-        Detecta y clasifica el contenido de la celda actual.
+        Selecciona una imagen de prueba según el tipo real de la celda.
+        
+        Returns:
+            Tupla (ruta de imagen o None, clase real)
+        """
+        if cell_type == CELL_FLOWER:
+            return load_random_flower_test_image(TEST_DIR), 'flor'
+        return load_random_object_image(OBJECTS_DIR), 'objeto'
+    
+    def plan_detections(self, path):
+        """
+        Prepara la detección de todas las flores y objetos de un camino conocido:
+        elige sus imágenes y las clasifica por lotes en un hilo de fondo, de
+        modo que detect_cell_content solo tenga que consultar el resultado.
+        Las celdas planificadas antes que no están en `path` (camino reparado)
+        se descartan.
         
         Args:
-            cell_type: Tipo de celda (opcional). Si no se proporciona, se obtiene de la posición actual.
+            path: Lista de posiciones (x, y) que recorrerá la abeja
+            
+        Returns:
+            Número de celdas encoladas
         """
-        if self.position is None:
-            return None, None, 0.0, None
-
-        # Si no se proporciona el tipo de celda, obtenerlo
-        if cell_type is None:
-            cell_type = self.grid_world.get_cell_type(self.position)
+        if self.lookahead is None or not LOOKAHEAD_CLASSIFICATION:
+            return 0
         
-        Logger.log(f"Detectando contenido en {self.position}, tipo de celda: {cell_type}")
-
-        if cell_type not in [CELL_FLOWER, CELL_OBJECT]:
-            return cell_type, None, 0.0, None
-
-        # Seleccionar imagen según el tipo real de la celda
-        if cell_type == CELL_FLOWER:
-            image_path = load_random_flower_test_image(TEST_DIR)
-            ground_truth = 'flor'
-            Logger.log(f"Celda de FLOR detectada, cargando imagen de test: {image_path}")
-        else:
-            image_path = load_random_object_image(OBJECTS_DIR)
-            ground_truth = 'objeto'
-            Logger.log(f"Celda de OBJETO detectada, cargando imagen de objeto: {image_path}")
-
-        classification = None
-        confidence = 0.0
-
-        if image_path:
-            try:
-                Logger.log(f"Clasificando imagen: {image_path}")
-                classification, confidence = self.classifier.predict(image_path)
-                Logger.log(f"Resultado: {classification} con confianza {confidence:.2f}")
-            except Exception as e:
-                Logger.log(f"Error clasificando imagen {image_path}: {e}", "ERROR")
-                import traceback
-                traceback.print_exc()
+        # Olvidar las celdas del plan anterior que el camino nuevo ya no recorre
+        positions = set(path)
+        for position in [p for p in self.planned_detections if p not in positions]:
+            del self.planned_detections[position]
+        self.lookahead.retain(positions)
+        
+        items = []
+        for position in path:
+            cell_type = self.grid_world.get_content(position)
+            if cell_type not in [CELL_FLOWER, CELL_OBJECT] or position in self.planned_detections:
+                continue
+            image_path, ground_truth = self._pick_image(cell_type)
+            self.planned_detections[position] = (image_path, ground_truth)
+            if image_path:
+                items.append((position, image_path))
+        
+        self.lookahead.submit(items)
+        Logger.log(f"Clasificación anticipada de {len(items)} celdas del camino")
+        return len(items)
+    
+    def _prepare_detection(self, cell_type):
+        """
+        Prepara la detección en la posición actual: elige la imagen (o reutiliza
+        la elegida al planificar el camino).
+        
+        Returns:
+            Dict con position, cell_type, image_path, ground_truth y planned
+        """
+        ground_truth = 'flor' if cell_type == CELL_FLOWER else 'objeto'
+        planned = self.planned_detections.pop(self.position, None)
+        if planned is not None and planned[1] != ground_truth:
+            planned = None  # La celda cambió desde que se planificó
+        
+        if self.classifier is None:
+            image_path = None
+        elif planned is not None:
+            image_path = planned[0]
         else:
-            Logger.log("No se encontró imagen para clasificación", "WARNING")
-
-        is_correct = (classification == ground_truth)
-
-        self.detection_log.append({
+            image_path, ground_truth = self._pick_image(cell_type)
+            Logger.log(f"Celda de {'FLOR' if cell_type == CELL_FLOWER else 'OBJETO'} detectada, imagen: {image_path}")
+        
+        return {
             'position': self.position,
+            'cell_type': cell_type,
             'image_path': image_path,
             'ground_truth': ground_truth,
+            'planned': planned is not None,
+        }
+    
+    def _classify(self, job):
+        """
+        Clasifica la imagen de un trabajo de detección, usando el resultado
+        anticipado si lo hay. Puede ejecutarse fuera del hilo de la animación.
+        
+        Returns:
+            Tupla (clase o None, confianza)
+        """
+        image_path = job['image_path']
+        if not image_path:
+            if self.classifier is not None:
+                Logger.log("No se encontró imagen para clasificación", "WARNING")
+            return None, 0.0
+        
+        try:
+            Logger.log(f"Clasificando imagen: {image_path}")
+            result = self.lookahead.get(job['position']) if job['planned'] else None
+            if result is None:
+                result = self.classifier.predict(image_path)
+            Logger.log(f"Resultado: {result[0]} con confianza {result[1]:.2f}")
+            return result
+        except Exception as e:
+            Logger.log(f"Error clasificando imagen {image_path}: {e}", "ERROR")
+            import traceback
+            traceback.print_exc()
+            return None, 0.0
+    
+    def _record_detection(self, job, result):
+        """Registra una detección terminada en detection_log y en las estadísticas."""
+        classification, confidence = result if result is not None else (None, 0.0)
+        ground_truth = job['ground_truth']
+        position = job['position']
+        is_correct = (classification == ground_truth)
+        
+        entry = {
+            'position': position,
+            'image_path': job['image_path'],
+            'ground_truth': ground_truth,
             'prediction': classification,
             'confidence': confidence,
             'correct': is_correct
-        })
-
+        }
+        self.detection_log.append(entry)
+        
         if classification is not None:
             if is_correct:
                 if ground_truth == 'flor':
@@ -118,17 +200,86 @@ class BeeAgent:
                 else:
                     self.objects_detected += 1
                 Logger.log(
-                    f"✓ Análisis en {self.position} -> {classification} (confianza: {confidence:.2f})"
+                    f"✓ Análisis en {position} -> {classification} (confianza: {confidence:.2f})"
                 )
             else:
                 Logger.log(
-                    f"✗ Clasificación incorrecta en {self.position}: {classification} frente a {ground_truth}",
+                    f"✗ Clasificación incorrecta en {position}: {classification} frente a {ground_truth}",
                     "WARNING"
                 )
-        else:
+        elif self.classifier is not None:
             Logger.log("Clasificación no disponible", "WARNING")
+        
+        if self.on_detection is not None:
+            self.on_detection(entry)
+        return entry
+    
+    def detect_cell_content(self, cell_type=None):
+        """
+        Detecta y clasifica el contenido de la celda actual (de forma síncrona).
+        
+        Args:
+            cell_type: Tipo de celda (opcional). Si no se proporciona, se obtiene de la posición actual.
+        """
+        if self.position is None:
+            return None, None, 0.0, None
+
+        # Si no se proporciona el tipo de celda, obtenerlo
+        if cell_type is None:
+            cell_type = self.grid_world.get_cell_type(self.position)
+        
+        Logger.log(f"Detectando contenido en {self.position}, tipo de celda: {cell_type}")
+
+        if cell_type not in [CELL_FLOWER, CELL_OBJECT]:
+            return cell_type, None, 0.0, None
 
-        return cell_type, classification, confidence, image_path
+        # Las detecciones asíncronas pendientes van antes en el registro
+        self.wait_for_detections()
+        
+        job = self._prepare_detection(cell_type)
+        classification, confidence = self._classify(job)
+        self._record_detection(job, (classification, confidence))
+        return cell_type, classification, confidence, job['image_path']
+    
+    def submit_detection(self, cell_type=None):
+        """
+        Encola la detección de la celda actual y retorna sin esperar a la
+        clasificación: la abeja puede seguir moviéndose. El resultado se añade
+        a detection_log (en orden de encolado) y se pasa a on_detection.
+        Sin clasificador o sin detección asíncrona se detecta de forma síncrona.
+        
+        Args:
+            cell_type: Tipo de celda (opcional). Si no se proporciona, se obtiene de la posición actual.
+            
+        Returns:
+            True si se encoló o registró una detección
+        """
+        if self.position is None:
+            return False
+        if cell_type is None:
+            cell_type = self.grid_world.get_cell_type(self.position)
+        if cell_type not in [CELL_FLOWER, CELL_OBJECT]:
+            return False
+        
+        if self.classifier is None or not ASYNC_DETECTION:
+            self.detect_cell_content(cell_type)
+            return True
+        
+        if self.async_detector is None:
+            self.async_detector = AsyncDetector(self._classify, self._record_detection)
+        self.async_detector.submit(self._prepare_detection(cell_type))
+        return True
+    
+    def wait_for_detections(self, timeout=None):
+        """
+        Espera a que se registren todas las detecciones asíncronas pendientes.
+        
+        Returns:
+            True si no quedan detecciones pendientes
+        """
+        if self.async_detector is None:
+            return True
+        return self.async_detector.drain(timeout)
     
     def follow_path(self, path, delay=0.1):
         """
@@ -136,7 +287,7 @@ class BeeAgent:
         
         Args:
             path: Lista de posiciones (x, y)
-            delay: Tiempo de espera entre pasos (segundos)
+            delay: Tiempo de espera entre pasos (segundos simulados, ver self.clock)
             
         Yields:
             Posición actual en cada paso
@@ -149,7 +300,7 @@ class BeeAgent:
                 self.detect_cell_content()
             
             yield position
-            time.sleep(delay)
+            self.clock.wait(delay)
     
     def get_statistics(self):
         """
@@ -158,8 +309,9 @@ class BeeAgent:
         Returns:
             Dict con estadísticas
         """
-        correct_detections = sum(1 for det in self.detection_log if det['correct'])
-        total_detections = len(self.detection_log)
+        # Contadores incrementales del registro: no se recorre el historial
+        correct_detections = self.detection_log.correct
+        total_detections = self.detection_log.total
         accuracy = (correct_detections / total_detections * 100) if total_detections > 0 else 0
         
         return {
@@ -177,7 +329,12 @@ class BeeAgent:
         self.flowers_detected = 0
         self.objects_detected = 0
         self.cells_visited = 0
-        self.detection_log = []
+        if self.async_detector is not None:
+            self.async_detector.cancel()
+        self.detection_log.clear()
+        self.planned_detections = {}
+        if self.lookahead is not None:
+            self.lookahead.cancel()
         Logger.log("Estadísticas de la abeja reiniciadas")
     
     def reached_goal(self):
@@ -0,0 +1,137 @@
+"""
+Compara las redes base del clasificador en CPU: latencia por imagen,
+rendimiento por lotes y precisión sobre las imágenes de la simulación
+(flores de TEST_DIR y objetos de OBJECTS_DIR), para elegir la red más
+barata que cumpla la precisión pedida.
+
+Cada red se evalúa con su checkpoint de MODELS_DIR (train_model.py --backbone);
+si no existe se mide solo la velocidad, con pesos aleatorios.
+
+Uso:
+    python benchmark_backbones.py
+    python benchmark_backbones.py --backbones resnet18 mobilenet_v3_small --min-accuracy 90
+"""
+import argparse
+import os
+import time
+import numpy as np
+import torch
+from config import *
+from flower_classifier import BACKBONES, FlowerClassifier, VisionTransformerClassifier
+from prediction_table import pool_images
+from utils import Logger
+
+
+def labeled_images():
+    """
+    Imágenes de evaluación con su clase esperada.
+
+    Returns:
+        Tupla (rutas, etiquetas): 0 = flor (TEST_DIR), 1 = objeto (OBJECTS_DIR)
+    """
+    flowers = pool_images((TEST_DIR,))
+    objects = pool_images((OBJECTS_DIR,))
+    return flowers + objects, np.array([0] * len(flowers) + [1] * len(objects), dtype=np.int64)
+
+
+def time_forward(model, batch, runs):
+    """
+    Mediana del tiempo de una pasada del modelo (tras dos de calentamiento).
+
+    Returns:
+        Segundos por pasada
+    """
+    timings = []
+    with torch.inference_mode():
+        for i in range(runs + 2):
+            start = time.perf_counter()
+            model(batch)
+            if i >= 2:
+                timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def benchmark(backbone, images, labels, runs=10, batch_size=PREDICT_BATCH_SIZE):
+    """
+    Mide una red base.
+
+    Args:
+        backbone: Clave de BACKBONES
+        images: Rutas de evaluación
+        labels: Clases esperadas de `images`
+        runs: Pasadas cronometradas para la latencia y el rendimiento
+        batch_size: Imágenes por pasada al medir el rendimiento
+
+    Returns:
+        Dict con backbone, params_m, latency_ms, throughput, accuracy (None
+        sin checkpoint) y checkpoint
+    """
+    classifier = FlowerClassifier(backbone=backbone)
+    if os.path.exists(classifier.model_path):
+        trained = classifier.load_model()
+    else:
+        trained = False
+        classifier.model = VisionTransformerClassifier(NUM_CLASSES, pretrained=False, backbone=backbone)
+        classifier.model.to(classifier.device)
+    classifier.prepare()
+    model = classifier.model
+
+    single = torch.randn(1, 3, IMAGE_SIZE, IMAGE_SIZE, device=classifier.device)
+    batch = torch.randn(batch_size, 3, IMAGE_SIZE, IMAGE_SIZE, device=classifier.device)
+    latency = time_forward(model, single, runs)
+    throughput = batch_size / time_forward(model, batch, runs)
+
+    accuracy = None
+    if trained and len(images):
+        classes, _, valid = classifier.predict_arrays(images, batch_size)
+        accuracy = 100.0 * float((classes[valid] == labels[valid]).mean()) if valid.any() else None
+
+    return {
+        'backbone': backbone,
+        'params_m': sum(p.numel() for p in model.parameters()) / 1e6,
+        'latency_ms': latency * 1000,
+        'throughput': throughput,
+        'accuracy': accuracy,
+        'checkpoint': classifier.model_path if trained else None,
+    }
+
+
+def cheapest(results, min_accuracy):
+    """Resultado más rápido (menor latencia) con precisión >= min_accuracy, o None."""
+    candidates = [r for r in results if r['accuracy'] is not None and r['accuracy'] >= min_accuracy]
+    return min(candidates, key=lambda r: r['latency_ms']) if candidates else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia, rendimiento y precisión de las redes base")
+    parser.add_argument('--backbones', nargs='+', choices=list(BACKBONES), default=list(BACKBONES))
+    parser.add_argument('--runs', type=int, default=10, help="Pasadas cronometradas por medida")
+    parser.add_argument('--batch-size', type=int, default=PREDICT_BATCH_SIZE, help="Imágenes por pasada al medir el rendimiento")
+    parser.add_argument('--min-accuracy', type=float, default=None, help="Precisión mínima (%%) para recomendar una red")
+    parser.add_argument('--verbose', action='store_true', help="Mostrar los mensajes INFO")
+    args = parser.parse_args()
+
+    Logger.quiet = not args.verbose
+    images, labels = labeled_images()
+    print(f"CPU, {torch.get_num_threads()} hilos de PyTorch; {len(images)} imágenes de evaluación\n")
+
+    results = []
+    print(f"{'Red base':<20} {'Parámetros':>10} {'Latencia':>10} {'Rendimiento':>13} {'Precisión':>10}")
+    for backbone in args.backbones:
+        r = benchmark(backbone, images, labels, args.runs, args.batch_size)
+        results.append(r)
+        accuracy = f"{r['accuracy']:.1f}%" if r['accuracy'] is not None else "sin modelo"
+        print(f"{backbone:<20} {r['params_m']:>9.1f}M {r['latency_ms']:>8.1f}ms "
+              f"{r['throughput']:>9.1f} i/s {accuracy:>10}")
+
+    if args.min_accuracy is not None:
+        best = cheapest(results, args.min_accuracy)
+        if best is None:
+            print(f"\nNinguna red entrenada alcanza {args.min_accuracy:.1f}% de precisión")
+        else:
+            print(f"\nRed más barata con precisión >= {args.min_accuracy:.1f}%: {best['backbone']} "
+                  f"({best['latency_ms']:.1f} ms, {best['accuracy']:.1f}%) -> BACKBONE = '{best['backbone']}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Clase Camera - Vista desplazable y con zoom sobre el mundo cuadriculado.
+Permite que la ventana tenga un tamaño fijo independiente de GRID_SIZE y que
+solo se dibujen las celdas visibles.
+"""
+import math
+from config import *
+
+
+class Camera:
+    """
+    Cámara 2D con paneo y zoom sobre el GridWorld.
+
+    Las coordenadas de pantalla se calculan como:
+        x = columna * cell_px - offset_x
+        y = fila * cell_px - offset_y
+    donde cell_px = CELL_SIZE * zoom.
+    """
+
+    def __init__(self, viewport_width, viewport_height, world_size, cell_size=CELL_SIZE):
+        """
+        Inicializa la cámara.
+
+        Args:
+            viewport_width: Ancho de la ventana en píxeles
+            viewport_height: Alto de la ventana en píxeles
+            world_size: Tamaño del mundo (NxN celdas)
+            cell_size: Tamaño base de una celda con zoom 1.0
+        """
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+        self.world_size = world_size
+        self.cell_size = cell_size
+
+        self.zoom = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+
+        # Se incrementa con cada paneo/zoom para invalidar cachés de render
+        self.version = 0
+
+        self._clamp()
+
+    @property
+    def min_zoom(self):
+        """Zoom mínimo: el mundo completo cabe en la ventana."""
+        world_px = self.world_size * self.cell_size
+        return min(1.0, min(self.viewport_width, self.viewport_height) / world_px)
+
+    @property
+    def cell_px(self):
+        """Tamaño en pantalla de una celda. Es entero mientras se dibujan sprites."""
+        size = self.cell_size * self.zoom
+        if size >= LOD_MIN_CELL_PX:
+            return int(round(size))
+        return size
+
+    @property
+    def use_minimap(self):
+        """True si las celdas son tan pequeñas que conviene dibujar el minimapa."""
+        return self.cell_size * self.zoom < LOD_MIN_CELL_PX
+
+    def _clamp(self):
+        """Mantiene el zoom y el desplazamiento dentro de los límites del mundo."""
+        self.zoom = min(max(self.zoom, self.min_zoom), MAX_ZOOM)
+        world_px = self.world_size * self.cell_px
+
+        max_x = max(world_px - self.viewport_width, 0)
+        max_y = max(world_px - self.viewport_height, 0)
+        self.offset_x = min(max(self.offset_x, 0.0), max_x)
+        self.offset_y = min(max(self.offset_y, 0.0), max_y)
+
+    def pan(self, dx, dy):
+        """
+        Desplaza la cámara.
+
+        Args:
+            dx: Desplazamiento horizontal en píxeles de pantalla
+            dy: Desplazamiento vertical en píxeles de pantalla
+        """
+        self.offset_x += dx
+        self.offset_y += dy
+        self._clamp()
+        self.version += 1
+
+    def zoom_at(self, factor, anchor=None):
+        """
+        Cambia el zoom manteniendo fijo el punto del mundo bajo `anchor`.
+
+        Args:
+            factor: Multiplicador del zoom (>1 acerca, <1 aleja)
+            anchor: Punto (x, y) de pantalla. Por defecto el centro de la ventana.
+        """
+        if anchor is None:
+            anchor = (self.viewport_width / 2, self.viewport_height / 2)
+
+        old_cell_px = self.cell_px
+        world_x = (anchor[0] + self.offset_x) / old_cell_px
+        world_y = (anchor[1] + self.offset_y) / old_cell_px
+
+        self.zoom *= factor
+        self._clamp()
+
+        new_cell_px = self.cell_px
+        self.offset_x = world_x * new_cell_px - anchor[0]
+        self.offset_y = world_y * new_cell_px - anchor[1]
+        self._clamp()
+        self.version += 1
+
+    def fit_world(self):
+        """Ajusta el zoom para ver el mundo completo."""
+        self.zoom = self.min_zoom
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self._clamp()
+        self.version += 1
+
+    def center_on(self, position):
+        """Centra la cámara en una celda (fila, columna)."""
+        cell_px = self.cell_px
+        self.offset_x = (position[1] + 0.5) * cell_px - self.viewport_width / 2
+        self.offset_y = (position[0] + 0.5) * cell_px - self.viewport_height / 2
+        self._clamp()
+        self.version += 1
+
+    def visible_range(self):
+        """
+        Rango de celdas visibles.
+
+        Returns:
+            Tupla (fila_inicio, fila_fin, col_inicio, col_fin) con fines exclusivos
+        """
+        cell_px = self.cell_px
+        first_row = max(int(self.offset_y // cell_px), 0)
+        first_col = max(int(self.offset_x // cell_px), 0)
+        last_row = min(int(math.ceil((self.offset_y + self.viewport_height) / cell_px)), self.world_size)
+        last_col = min(int(math.ceil((self.offset_x + self.viewport_width) / cell_px)), self.world_size)
+        return first_row, last_row, first_col, last_col
+
+    def cell_to_screen(self, position):
+        """Esquina superior izquierda en pantalla de la celda (fila, columna)."""
+        cell_px = self.cell_px
+        return (
+            int(round(position[1] * cell_px - self.offset_x)),
+            int(round(position[0] * cell_px - self.offset_y))
+        )
+
+    def screen_to_cell(self, x, y):
+        """Celda (fila, columna) bajo un punto de pantalla (puede quedar fuera del mundo)."""
+        cell_px = self.cell_px
+        return (
+            int((y + self.offset_y) // cell_px),
+            int((x + self.offset_x) // cell_px)
+        )
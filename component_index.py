@@ -0,0 +1,134 @@
+"""
+Clase ComponentIndex - Componentes conexas de las celdas transitables.
+Responde en O(1) amortizado si dos celdas están conectadas y se actualiza
+de forma incremental cuando se abren o cierran celdas (obstáculos dinámicos).
+"""
+from collections import deque
+import numpy as np
+
+
+class ComponentIndex:
+    """
+    Etiquetas de componente por celda con union-find sobre las etiquetas.
+
+    - Abrir una celda une su etiqueta con la de sus vecinos: O(α)
+    - Cerrar una celda puede partir su componente; en lugar de recalcularla
+      en el momento se marca como obsoleta y se reetiqueta (BFS solo de la
+      parte consultada) la próxima vez que se pregunte por ella
+    """
+
+    def __init__(self, size):
+        """
+        Inicializa el índice vacío.
+
+        Args:
+            size: Tamaño del mundo (NxN)
+        """
+        self.size = size
+        self.labels = np.full((size, size), -1, dtype=np.int32)
+        self.parent = []
+        self.stale = set()  # Raíces de componentes que pueden haberse partido
+
+    def _new_label(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def _find(self, label):
+        parent = self.parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        while parent[label] != root:
+            parent[label], label = root, parent[label]
+        return root
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return root_a
+        self.parent[root_b] = root_a
+        # Si cualquiera de las dos podía estar partida, la unión también
+        if root_b in self.stale:
+            self.stale.discard(root_b)
+            self.stale.add(root_a)
+        return root_a
+
+    def _neighbors(self, position):
+        x, y = position
+        for nx, ny in ((x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)):
+            if 0 <= nx < self.size and 0 <= ny < self.size and self.labels[nx, ny] >= 0:
+                yield (nx, ny)
+
+    def _flood(self, start, label):
+        """Asigna `label` a todas las celdas transitables alcanzables desde start."""
+        self.labels[start] = label
+        queue = deque([start])
+        while queue:
+            position = queue.popleft()
+            for neighbor in self._neighbors(position):
+                if self._find(self.labels[neighbor]) != label:
+                    self.labels[neighbor] = label
+                    queue.append(neighbor)
+
+    def build(self, walkable):
+        """
+        Etiqueta todas las componentes desde cero.
+
+        Args:
+            walkable: Matriz bool (size, size) con las celdas transitables
+        """
+        self.labels.fill(-1)
+        self.labels[walkable] = -2  # Transitable sin etiquetar
+        self.parent = []
+        self.stale = set()
+
+        for start in map(tuple, np.argwhere(walkable)):
+            if self.labels[start] != -2:
+                continue
+            label = self._new_label()
+            self.labels[start] = label
+            queue = deque([start])
+            while queue:
+                x, y = queue.popleft()
+                for nx, ny in ((x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)):
+                    if 0 <= nx < self.size and 0 <= ny < self.size and self.labels[nx, ny] == -2:
+                        self.labels[nx, ny] = label
+                        queue.append((nx, ny))
+
+    def open_cell(self, position):
+        """Una celda pasa a ser transitable: se une con sus vecinos."""
+        if self.labels[position] >= 0:
+            return
+        label = self._new_label()
+        self.labels[position] = label
+        for neighbor in list(self._neighbors(position)):
+            label = self._union(label, self.labels[neighbor])
+
+    def close_cell(self, position):
+        """Una celda deja de ser transitable: su componente puede partirse."""
+        label = self.labels[position]
+        if label < 0:
+            return
+        self.labels[position] = -1
+        # Con 0 o 1 vecino transitable quitar la celda no desconecta nada
+        if sum(1 for _ in self._neighbors(position)) > 1:
+            self.stale.add(self._find(label))
+
+    def component_of(self, position):
+        """
+        Identificador de la componente de una celda (-1 si no es transitable).
+        Reetiqueta la parte consultada si su componente estaba obsoleta.
+        """
+        label = self.labels[position]
+        if label < 0:
+            return -1
+        root = self._find(label)
+        if root in self.stale:
+            root = self._new_label()
+            self._flood(position, root)
+        return root
+
+    def connected(self, pos1, pos2):
+        """True si existe un camino de celdas transitables entre pos1 y pos2."""
+        component = self.component_of(pos1)
+        return component >= 0 and component == self.component_of(pos2)
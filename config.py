@@ -7,15 +7,38 @@ import os
 # ==================== CONFIGURACIÓN DEL MUNDO ====================
 GRID_SIZE = 20  # Tamaño de la cuadrícula NxN
 CELL_SIZE = 40  # Tamaño de cada celda en píxeles
-SCREEN_WIDTH = GRID_SIZE * CELL_SIZE
-SCREEN_HEIGHT = GRID_SIZE * CELL_SIZE
-FPS = 10  # Frames por segundo
+MAX_SCREEN_SIZE = 800  # La ventana no crece más allá de esto; el resto se ve con la cámara
+SCREEN_WIDTH = min(GRID_SIZE * CELL_SIZE, MAX_SCREEN_SIZE)
+SCREEN_HEIGHT = min(GRID_SIZE * CELL_SIZE, MAX_SCREEN_SIZE)
+FPS = 60  # Frames por segundo (el render solo redibuja lo que cambia)
+
+# Cámara (paneo y zoom)
+MAX_ZOOM = 2.0            # Zoom máximo (celdas de CELL_SIZE * 2 píxeles)
+ZOOM_STEP = 1.25          # Factor de zoom por paso de rueda/tecla
+CAMERA_PAN_STEP = 40      # Píxeles desplazados por cada flecha
+LOD_MIN_CELL_PX = 16      # Por debajo de este tamaño se dibuja el minimapa en lugar de sprites
 
 # Porcentajes de generación
 OBSTACLE_PERCENTAGE = 0.15  # 15% de obstáculos
 FLOWER_PERCENTAGE = 0.12    # 12% de flores
 OBJECT_PERCENTAGE = 0.08    # 8% de objetos
 
+# Índice espacial de flores/objetos (lado de cada cubeta en celdas)
+SPATIAL_BUCKET_SIZE = 8
+
+# Mundo dinámico (árboles que crecen y objetos que se mueven durante la simulación)
+DYNAMIC_WORLD = False          # Aplicar eventos de cambio de celdas en cada paso de la abeja
+DYNAMIC_TREES_PER_STEP = 1     # Árboles nuevos por lote de eventos
+DYNAMIC_OBJECTS_PER_STEP = 2   # Objetos que se desplazan por lote de eventos
+WORLD_EVENT_LOG_SIZE = 256     # Lotes de cambios recordados para validar cachés de caminos
+PATH_CACHE_SIZE = 32           # Búsquedas cacheadas por PathFinder
+PATH_REPAIR_MAX_NODES = 400    # Nodos máximos del desvío local al reparar un camino bloqueado
+
+# Tipos de cambio que notifica GridWorld a sus suscriptores
+STRUCTURE_CHANGE = 'structure'  # Obstáculos (transitabilidad) o mundo regenerado
+CONTENT_CHANGE = 'content'      # Flores u objetos, sin cambiar la transitabilidad
+OVERLAY_CHANGE = 'overlay'      # Posición de la abeja
+
 # ==================== RUTAS DE ARCHIVOS ====================
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -26,6 +49,7 @@ SPRITE_HIVE = os.path.join(ASSETS_DIR, 'colmena.png')
 SPRITE_TREE = os.path.join(ASSETS_DIR, 'arbol.png')
 SPRITE_FLOWER = os.path.join(ASSETS_DIR, 'flor.png')
 SPRITE_OBJECT = os.path.join(ASSETS_DIR, 'objecto.png')
+SPRITE_CACHE_SIZES = 8  # Tamaños de celda (niveles de zoom) que guarda el atlas de sprites
 
 # Datasets
 FLOWERS_DIR = os.path.join(BASE_DIR, 'fotos_flores_proyecto', 'flores')
@@ -36,14 +60,46 @@ REAL_FLOWERS_DIR = os.path.join(BASE_DIR, 'fotos_flores_proyecto')
 
 # Modelos
 MODELS_DIR = os.path.join(BASE_DIR, 'models')
-MODEL_PATH = os.path.join(MODELS_DIR, 'flower_classifier.pth')
+MODEL_PATH = os.path.join(MODELS_DIR, 'flower_classifier.pth')  # Checkpoint de ResNet50; las demás redes base usan flower_classifier_<red>.pth
 
 # ==================== CONFIGURACIÓN DEL MODELO ====================
 IMAGE_SIZE = 224  # Tamaño estándar para Vision Transformers
 BATCH_SIZE = 16
 EPOCHS = 10
 LEARNING_RATE = 1e-4
+FREEZE_BACKBONE = False  # Entrenar solo la capa final sobre la caché de embeddings (red base congelada)
+HEAD_LEARNING_RATE = 1e-3  # Tasa de aprendizaje de la capa final con la red base congelada
+HEAD_BATCH_SIZE = 256  # Embeddings por paso al entrenar solo la capa final
+EMBEDDING_CACHE_DIR = os.path.join(MODELS_DIR, 'embeddings')  # Cachés de embeddings por red base
+DATASET_SHARDS = True  # Entrenar leyendo las imágenes ya decodificadas de un shard uint8 en memmap
+SHARD_DIR = os.path.join(MODELS_DIR, 'shards')  # Shards de imágenes por conjunto de datos
+DATALOADER_WORKERS = 'auto'  # Procesos que cargan los lotes (0 = en el proceso principal, 'auto' = prueba corta)
+DATALOADER_PERSISTENT_WORKERS = True  # Mantener los trabajadores entre épocas
+DATALOADER_PREFETCH_FACTOR = 2  # Lotes precargados por trabajador
+DATALOADER_PIN_MEMORY = None  # Memoria fijada para copiar a la GPU (None = solo si hay GPU)
+DATALOADER_PROBE_BATCHES = 5  # Lotes cronometrados por opción al elegir los trabajadores
 NUM_CLASSES = 2  # Flor vs Objeto
+BACKBONE = 'resnet50'  # Red base: resnet50, resnet18, mobilenet_v3_small, efficientnet_b0 o shufflenet_v2_x1_0
+INFERENCE_BACKEND = 'eager'  # Motor de ejecución del modelo: 'eager', 'torchscript' u 'onnx' (requiere onnxruntime)
+QUANTIZATION = None  # Variante INT8 que se carga: None (float32), 'dynamic' o 'static' (se genera con quantize_model.py)
+QUANTIZATION_BACKEND = 'x86'  # Motor de cuantización de PyTorch ('x86' o 'fbgemm'; 'qnnpack' en ARM)
+QUANTIZATION_CALIBRATION_IMAGES = 64  # Imágenes de TRAIN_DIR para calibrar la cuantización estática
+PREDICT_BATCH_SIZE = 16  # Imágenes por pasada del modelo en la clasificación por lotes
+INFERENCE_SERVER = True  # Agrupar en micro-lotes las clasificaciones de todos los hilos del simulador
+INFERENCE_MAX_BATCH = 16  # Imágenes máximas por lote del servicio de inferencia
+INFERENCE_MAX_WAIT_MS = 5  # Espera máxima (ms) para completar un lote
+PREDICT_DECODE_WORKERS = min(4, os.cpu_count() or 1)  # Hilos que decodifican y preprocesan las imágenes de un lote
+LOOKAHEAD_CLASSIFICATION = True  # Clasificar por adelantado las flores/objetos del camino planificado
+LOOKAHEAD_FIRST_BATCH = 2  # Tamaño del primer lote anticipado (luego se duplica hasta PREDICT_BATCH_SIZE)
+ASYNC_DETECTION = True  # Clasificar en trabajadores de fondo mientras la abeja sigue moviéndose
+DETECTION_WORKERS = 2  # Hilos trabajadores de la detección asíncrona
+DETECTION_QUEUE_SIZE = 8  # Detecciones en espera máximas antes de frenar a la abeja
+DETECTION_LOG_CHUNK_SIZE = 4096  # Filas por bloque del registro columnar de detecciones
+DETECTION_LOG_DIR = os.path.join(BASE_DIR, 'logs')  # Archivos de los registros de detecciones del simulador con pantalla
+DETECTION_LOG_MAX_PATHS = 65536  # Rutas de imagen internadas que se mantienen en memoria por registro
+PREDICTION_TABLE = True  # Precalcular al inicio las predicciones de TEST_DIR y OBJECTS_DIR
+PREDICTION_TABLE_SUFFIX = '_predictions.json'  # Tabla guardada junto al modelo: flower_classifier_predictions.json
+PREDICTION_TABLE_BATCH_SIZE = 64  # Imágenes por llamada a predict_batch al precalcular
 
 # ==================== COLORES ====================
 COLOR_WHITE = (255, 255, 255)
@@ -57,10 +113,18 @@ COLOR_ORANGE = (255, 165, 0)
 COLOR_PURPLE = (128, 0, 128)
 COLOR_PATH = (173, 216, 230)  # Azul claro para el camino
 COLOR_EXPLORED = (255, 182, 193)  # Rosa claro para nodos explorados
+COLOR_EXPLORED_LATE = (199, 21, 133)  # Color de los últimos nodos explorados (degradado)
+
+# Coloreado de nodos explorados: 'order' (orden de expansión), 'depth' (profundidad) o 'flat'
+OVERLAY_COLOR_MODE = 'order'
 
 # ==================== CONFIGURACIÓN DE BÚSQUEDA ====================
 SEARCH_DELAY = 0.3  # Delay en segundos entre pasos de búsqueda
 ANALYSIS_DELAY = 1.0  # Delay en segundos para análisis de imagen
+SWARM_SIZE = 500  # Abejas por defecto del motor de enjambre (swarm.py)
+SWARM_MAX_TARGETS = 64  # Objetivos distintos del enjambre (un campo de distancias por objetivo)
+COOPERATIVE_WINDOW = 8  # Pasos de la ventana del planificador cooperativo (WHCA*)
+CLOCK_MODE = 'Tiempo real'  # Velocidad inicial: 'Tiempo real', 'x10', 'x100' o 'Sin límite'
 ANIMATION_SPEED = 200  # Milisegundos entre frames de animación
 
 # ==================== TIPOS DE CELDAS ====================
@@ -0,0 +1,286 @@
+"""
+Planificación cooperativa de varias abejas (WHCA*: A* cooperativo con ventana).
+Cada abeja se planifica en orden de prioridad con un A* en espacio-tiempo
+que respeta las celdas ya reservadas por las anteriores, solo dentro de una
+ventana de `window` pasos. Cada `replan_interval` ticks se vuelve a
+planificar (horizonte deslizante), así que el costo por tick depende del
+tamaño de la ventana y no de la longitud de los caminos.
+
+La tabla de reservas es un arreglo (window + 1, N, N) usado como búfer
+circular en el tiempo; cada celda guarda el índice de la abeja que la ocupa.
+"""
+import heapq
+import numpy as np
+from config import *
+from swarm import UNREACHABLE, distance_fields
+from utils import Logger
+
+
+FREE = -1  # Celda sin reservar
+
+# Acciones en espacio-tiempo: esperar y los 4 vecinos (Arriba, Derecha, Abajo, Izquierda)
+MOVES = [(0, 0), (-1, 0), (0, 1), (1, 0), (0, -1)]
+
+
+class ReservationTable:
+    """
+    Reservas (celda, tiempo) -> abeja para los próximos `window` pasos.
+    El tiempo t se guarda en el plano t % (window + 1).
+    """
+
+    def __init__(self, size, window):
+        """
+        Args:
+            size: Tamaño del mundo (NxN)
+            window: Pasos hacia adelante que se pueden reservar
+        """
+        self.size = size
+        self.window = window
+        self.depth = window + 1
+        self.cells = np.full((self.depth, size, size), FREE, dtype=np.int32)
+
+    def clear(self):
+        """Borra todas las reservas."""
+        self.cells.fill(FREE)
+
+    def owner(self, position, time):
+        """Abeja que reservó la celda en ese instante (FREE si nadie)."""
+        return self.cells[time % self.depth, position[0], position[1]]
+
+    def reserve(self, position, time, agent):
+        self.cells[time % self.depth, position[0], position[1]] = agent
+
+    def reserve_all(self, position, agent):
+        """Reserva la celda durante toda la ventana."""
+        self.cells[:, position[0], position[1]] = agent
+
+    def release(self, position, agent):
+        """Libera en toda la ventana las reservas de la abeja sobre la celda."""
+        column = self.cells[:, position[0], position[1]]
+        column[column == agent] = FREE
+
+    def is_free(self, agent, origin, destination, time):
+        """
+        True si la abeja puede pasar de `origin` (en t) a `destination` (en t + 1)
+        sin chocar: la celda destino está libre en t + 1 y nadie hace el
+        movimiento contrario a la vez (intercambio de celdas).
+        """
+        owner = self.owner(destination, time + 1)
+        if owner != FREE and owner != agent:
+            return False
+        if destination == origin:
+            return True
+        swap = self.owner(destination, time)
+        return swap == FREE or swap == agent or self.owner(origin, time + 1) != swap
+
+
+class CooperativePlanner:
+    """
+    Planificador cooperativo con ventana y horizonte deslizante.
+
+    Uso:
+        planner = CooperativePlanner(grid_world)
+        for start in starts:
+            planner.add_agent(start, hive_pos)
+        while not planner.finished:
+            planner.step()
+    """
+
+    def __init__(self, grid_world, window=COOPERATIVE_WINDOW, replan_interval=None,
+                 remove_on_arrival=True):
+        """
+        Inicializa el planificador.
+
+        Args:
+            grid_world: Instancia de GridWorld
+            window: Pasos que se planifican y reservan en cada replanificación
+            replan_interval: Ticks entre replanificaciones (por defecto window // 2)
+            remove_on_arrival: Si es True las abejas que llegan a su meta salen
+                del mundo (entran en la colmena) y liberan la celda; si es
+                False se quedan paradas en ella
+        """
+        self.grid_world = grid_world
+        self.window = window
+        self.replan_interval = replan_interval or max(1, window // 2)
+        self.remove_on_arrival = remove_on_arrival
+        self.reservations = ReservationTable(grid_world.size, window)
+
+        self.positions = []   # Posición actual de cada abeja
+        self.goals = []
+        self.plans = []       # Camino de cada abeja dentro de la ventana (empieza en su posición)
+        self.arrived = []
+        self.time = 0
+        self._planned_at = None
+        self._rounds = 0      # Replanificaciones hechas (rota las prioridades)
+        self._heuristics = {}  # meta -> campo de distancias
+        self._heuristics_version = None
+        self.expanded = 0     # Nodos expandidos en total (para medir el costo)
+
+    def add_agent(self, start, goal):
+        """
+        Añade una abeja.
+
+        Returns:
+            Índice de la abeja
+        """
+        start = (int(start[0]), int(start[1]))
+        self.positions.append(start)
+        self.goals.append((int(goal[0]), int(goal[1])))
+        self.plans.append([start])
+        self.arrived.append(False)
+        self._planned_at = None
+        return len(self.positions) - 1
+
+    @property
+    def finished(self):
+        """True si todas las abejas llegaron a su meta."""
+        return all(self.arrived)
+
+    def _heuristic(self, goal):
+        """Distancia real a la meta ignorando a las demás abejas (campo BFS cacheado)."""
+        version = self.grid_world.structure_version
+        if version != self._heuristics_version:
+            self._heuristics = {}
+            self._heuristics_version = version
+        field = self._heuristics.get(goal)
+        if field is None:
+            walkable = self.grid_world.content != CELL_OBSTACLE
+            field = distance_fields(walkable, [goal])[0]
+            self._heuristics[goal] = field
+        return field
+
+    def _search(self, agent, start, goal):
+        """
+        A* en espacio-tiempo dentro de la ventana.
+
+        Los nodos son (celda, t); esperar cuesta 1 salvo en la meta. Un nodo
+        en el límite de la ventana se completa con la distancia estimada.
+
+        Returns:
+            Lista de window + 1 posiciones, o None si no hay movimiento posible
+        """
+        heuristic = self._heuristic(goal)
+        size = self.grid_world.size
+        content = self.grid_world.content
+        reservations = self.reservations
+        t0 = self.time
+        horizon = self.window
+
+        def estimate(position):
+            value = heuristic[position]
+            return value if value != UNREACHABLE else size * size
+
+        start_node = (start, 0)
+        parents = {start_node: None}
+        costs = {start_node: 0}
+        heap = [(estimate(start), 0, start, 0)]
+        best = None
+        while heap:
+            f, g, position, step = heapq.heappop(heap)
+            if costs.get((position, step), g) < g:
+                continue
+            self.expanded += 1
+            if step == horizon:
+                best = (position, step)
+                break
+            for dx, dy in MOVES:
+                neighbor = (position[0] + dx, position[1] + dy)
+                if not (0 <= neighbor[0] < size and 0 <= neighbor[1] < size):
+                    continue
+                if content[neighbor] == CELL_OBSTACLE:
+                    continue
+                if not reservations.is_free(agent, position, neighbor, t0 + step):
+                    continue
+                waiting_at_goal = neighbor == position == goal
+                cost = g + (0 if waiting_at_goal else 1)
+                node = (neighbor, step + 1)
+                if cost < costs.get(node, float('inf')):
+                    costs[node] = cost
+                    parents[node] = (position, step)
+                    heapq.heappush(heap, (cost + estimate(neighbor), cost, neighbor, step + 1))
+
+        if best is None:
+            return None
+        path = []
+        node = best
+        while node is not None:
+            path.append(node[0])
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def plan(self):
+        """
+        Replanifica todas las abejas activas en orden de prioridad (rotado en
+        cada ronda para que ninguna abeja quede siempre la última).
+        """
+        self.reservations.clear()
+        active = [i for i, done in enumerate(self.arrived) if not done]
+        if not self.remove_on_arrival:
+            # Las abejas que ya llegaron se quedan en su meta y la siguen ocupando
+            for agent, done in enumerate(self.arrived):
+                if done:
+                    self.reservations.reserve_all(self.positions[agent], agent)
+        if not active:
+            return
+
+        # Las abejas aún sin planificar ocupan su celda durante toda la ventana:
+        # así las de mayor prioridad no las encierran y cada abeja siempre
+        # puede, como mínimo, quedarse donde está
+        for agent in active:
+            self.reservations.reserve_all(self.positions[agent], agent)
+
+        shift = self._rounds % len(active)
+        for agent in active[shift:] + active[:shift]:
+            position = self.positions[agent]
+            self.reservations.release(position, agent)
+            path = self._search(agent, position, self.goals[agent])
+            if path is None:
+                path = [position] * (self.window + 1)  # Sin salida: esperar
+            for step, cell in enumerate(path):
+                self.reservations.reserve(cell, self.time + step, agent)
+                if self.remove_on_arrival and cell == self.goals[agent]:
+                    break  # Entró en la colmena: la celda queda libre después
+            self.plans[agent] = path
+        self._planned_at = self.time
+        self._rounds += 1
+
+    def step(self):
+        """
+        Avanza un tick: replanifica si toca (o si cambiaron los obstáculos) y
+        mueve cada abeja a la siguiente celda de su plan.
+
+        Returns:
+            Lista con las posiciones de todas las abejas
+        """
+        if (self._planned_at is None
+                or self.time - self._planned_at >= self.replan_interval
+                or self.grid_world.structure_version != self._heuristics_version):
+            self.plan()
+
+        offset = self.time - self._planned_at + 1
+        for agent, plan in enumerate(self.plans):
+            if self.arrived[agent]:
+                continue
+            self.positions[agent] = plan[min(offset, len(plan) - 1)]
+            if self.positions[agent] == self.goals[agent]:
+                self.arrived[agent] = True
+                if not self.remove_on_arrival:
+                    # Queda parada en la meta: las demás replanifican alrededor de ella
+                    self._planned_at = None
+        self.time += 1
+        return list(self.positions)
+
+    def run(self, max_ticks=1000):
+        """
+        Avanza hasta que lleguen todas las abejas o se agoten los ticks.
+
+        Returns:
+            Lista de pasos: posiciones de todas las abejas tras cada tick
+        """
+        history = []
+        while not self.finished and self.time < max_ticks:
+            history.append(self.step())
+        Logger.log(f"Planificación cooperativa: {len(self.positions)} abejas, "
+                   f"{self.time} ticks, {self.expanded} nodos expandidos")
+        return history
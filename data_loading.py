@@ -0,0 +1,165 @@
+"""
+Carga de datos en paralelo para entrenar y evaluar el clasificador.
+
+make_loader() construye el DataLoader con los parámetros de config.py:
+procesos trabajadores (o 'auto' para elegirlos con una prueba corta),
+trabajadores persistentes entre épocas, lotes precargados por trabajador y
+memoria fijada (pin_memory) cuando se entrena en GPU.
+
+Cada trabajador siembra NumPy y `random` a partir de su semilla de PyTorch
+(seed_worker); sin esto los procesos hijos heredan el mismo estado de
+np.random y repetirían las mismas variantes de aumento.
+"""
+import os
+import random
+import time
+import numpy as np
+import torch
+from torch.utils.data import DataLoader
+from config import *
+from utils import Logger
+
+
+_tuned_workers = {}  # _dataset_key(dataset, batch_size) -> trabajadores elegidos por autotune_workers
+
+
+def seed_worker(worker_id):
+    """worker_init_fn: semilla distinta de NumPy y random en cada trabajador."""
+    seed = torch.initial_seed() % 2**32
+    np.random.seed(seed)
+    random.seed(seed)
+
+
+def worker_candidates(max_workers=None):
+    """Números de trabajadores que se prueban: 0, 1, 2, 4, ... hasta los núcleos disponibles."""
+    max_workers = max_workers or os.cpu_count() or 1
+    candidates = [0]
+    workers = 1
+    while workers <= max_workers and max_workers > 1:
+        candidates.append(workers)
+        workers *= 2
+    return candidates
+
+
+def _dataset_key(dataset, batch_size):
+    """
+    Clave estable de un dataset para recordar su número de trabajadores:
+    directorio, uso del shard y variantes, aumento, tamaño y lote (nunca id(),
+    que Python reutiliza tras liberar el objeto). None si el dataset no
+    tiene root_dir (no se recuerda).
+    """
+    root_dir = getattr(dataset, 'root_dir', None)
+    if root_dir is None:
+        return None
+    shard = getattr(dataset, 'shard', None)
+    return (
+        type(dataset).__name__,
+        os.path.abspath(root_dir),
+        shard is not None,
+        shard.variants if shard is not None else None,
+        getattr(dataset, 'apply_augmentation', None),
+        len(dataset),
+        batch_size,
+    )
+
+
+def _build_loader(dataset, batch_size, shuffle, num_workers, persistent_workers, prefetch_factor,
+                  pin_memory, seed):
+    options = {}
+    if num_workers > 0:
+        options['persistent_workers'] = persistent_workers
+        options['prefetch_factor'] = prefetch_factor
+    generator = torch.Generator()
+    if seed is not None:
+        generator.manual_seed(seed)
+    else:
+        generator.seed()
+    return DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=shuffle,
+        num_workers=num_workers,
+        pin_memory=pin_memory,
+        worker_init_fn=seed_worker,
+        generator=generator,
+        **options
+    )
+
+
+def autotune_workers(dataset, batch_size, candidates=None, probe_batches=DATALOADER_PROBE_BATCHES,
+                     prefetch_factor=DATALOADER_PREFETCH_FACTOR):
+    """
+    Elige el número de trabajadores midiendo unos pocos lotes con cada opción.
+
+    Se descarta el primer lote (arranque de los procesos) y se para en cuanto
+    duplicar los trabajadores no mejora al menos un 10%. El resultado se
+    recuerda para el mismo conjunto de datos (ver _dataset_key) y tamaño de lote.
+
+    Args:
+        dataset: Dataset a cargar
+        batch_size: Tamaño del lote
+        candidates: Números de trabajadores a probar (por defecto worker_candidates())
+        probe_batches: Lotes cronometrados por opción
+
+    Returns:
+        Número de trabajadores más rápido
+    """
+    key = _dataset_key(dataset, batch_size)
+    if key is not None and key in _tuned_workers:
+        return _tuned_workers[key]
+    candidates = candidates or worker_candidates()
+    if len(candidates) == 1 or len(dataset) < 2 * batch_size:
+        return candidates[0]
+
+    best_workers, best_rate = candidates[0], 0.0
+    timings = []
+    for workers in candidates:
+        loader = _build_loader(dataset, batch_size, True, workers, False, prefetch_factor, False, 0)
+        iterator = iter(loader)
+        next(iterator)  # Arranque de los trabajadores
+        start = time.perf_counter()
+        images = 0
+        for _ in range(probe_batches):
+            try:
+                batch, _ = next(iterator)
+            except StopIteration:
+                break
+            images += len(batch)
+        rate = images / max(time.perf_counter() - start, 1e-9)
+        del iterator, loader
+        timings.append(f"{workers}: {rate:.0f} img/s")
+        if rate > best_rate * 1.1:
+            best_workers, best_rate = workers, rate
+        elif workers > 1:
+            break  # Duplicar los trabajadores ya no compensa
+    Logger.log(f"Trabajadores de carga de datos: {best_workers} ({', '.join(timings)})")
+    if key is not None:
+        _tuned_workers[key] = best_workers
+    return best_workers
+
+
+def make_loader(dataset, batch_size, shuffle, num_workers=DATALOADER_WORKERS,
+                persistent_workers=DATALOADER_PERSISTENT_WORKERS, prefetch_factor=DATALOADER_PREFETCH_FACTOR,
+                pin_memory=DATALOADER_PIN_MEMORY, seed=None):
+    """
+    DataLoader configurable para entrenar o evaluar.
+
+    Args:
+        dataset: Dataset a cargar
+        batch_size: Tamaño del lote
+        shuffle: Barajar en cada época
+        num_workers: Procesos trabajadores, o 'auto' para elegirlos con autotune_workers
+        persistent_workers: Mantener los trabajadores vivos entre épocas
+        prefetch_factor: Lotes precargados por trabajador
+        pin_memory: Fijar la memoria de los lotes (None = solo si hay GPU)
+        seed: Semilla del orden de los lotes y de los trabajadores (None = aleatoria)
+
+    Returns:
+        DataLoader
+    """
+    if num_workers == 'auto':
+        num_workers = autotune_workers(dataset, batch_size, prefetch_factor=prefetch_factor)
+    if pin_memory is None:
+        pin_memory = torch.cuda.is_available()
+    return _build_loader(dataset, batch_size, shuffle, num_workers, persistent_workers,
+                         prefetch_factor, pin_memory, seed)
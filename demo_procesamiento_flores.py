@@ -7,7 +7,8 @@ import cv2
 import numpy as np
 from PIL import Image
 import matplotlib.pyplot as plt
-from utils import ImageProcessor, Logger
+from image_processing import ImageProcessor
+from utils import Logger
 from config import REAL_FLOWERS_DIR
 
 
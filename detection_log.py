@@ -0,0 +1,306 @@
+"""
+Clase DetectionLog - Registro columnar de detecciones para ejecuciones largas.
+Cada detección ocupa una fila de un arreglo estructurado de NumPy (posición,
+imagen, clase real, predicción, confianza, acierto) y las rutas de imagen se
+guardan una sola vez (internado). Los bloques llenos se vuelcan a un archivo
+binario de solo-añadir para que la memoria no crezca con la duración de la
+simulación, y los contadores incrementales hacen que las estadísticas
+cuesten O(1).
+
+Por defecto el registro vive en memoria; solo quien pasa un directorio
+(el simulador con pantalla, con DETECTION_LOG_DIR) escribe archivos.
+Cada registro escribe en su propio archivo, `<directorio>/<nombre>_<fecha>_<pid>_<n>.bin`,
+y cada clear() empieza uno nuevo: dos registros (la abeja y el enjambre)
+nunca comparten archivo y reiniciar no borra la ejecución anterior.
+
+Sigue aceptando el uso que tenía la lista de dicts: append(dict), len(),
+log[-1], log[i] e iteración (las filas se devuelven como dicts).
+"""
+import itertools
+import os
+import threading
+import time
+import numpy as np
+from config import *
+
+
+DETECTION_DTYPE = np.dtype([
+    ('row', np.int32),
+    ('col', np.int32),
+    ('image', np.int32),         # Índice en DetectionLog.paths (-1 = sin imagen)
+    ('ground_truth', np.int8),   # Índice en LABELS
+    ('prediction', np.int8),     # Índice en LABELS (0 = sin predicción)
+    ('confidence', np.float32),
+    ('correct', np.bool_),
+])
+
+# Códigos de las clases; cualquier otra etiqueta se guarda como 'unknown'
+LABELS = (None, 'flor', 'objeto', 'unknown')
+LABEL_CODES = {label: code for code, label in enumerate(LABELS)}
+
+_run_ids = itertools.count()  # Sufijo de los archivos de este proceso
+
+
+class DetectionLog:
+    """
+    Registro de detecciones por bloques de `chunk_size` filas.
+
+    Sin `directory` (por defecto) los bloques se quedan en memoria (unos 20
+    bytes por detección). Con `directory` los bloques llenos se escriben al
+    archivo del registro y solo el bloque actual ocupa memoria; las filas
+    volcadas se leen del disco (memmap) si se piden.
+    """
+
+    def __init__(self, chunk_size=DETECTION_LOG_CHUNK_SIZE, directory=None, name='detecciones',
+                 max_paths=DETECTION_LOG_MAX_PATHS):
+        """
+        Inicializa un registro vacío.
+
+        Args:
+            chunk_size: Filas por bloque
+            directory: Directorio de los archivos del registro (None = solo en memoria).
+                Las rutas de imagen internadas se añaden a `path + '.paths'`.
+            name: Prefijo de los archivos (p. ej. 'abeja' o 'enjambre')
+            max_paths: Rutas internadas que se mantienen en memoria; al
+                superarse, las ya volcadas se olvidan (se leen del archivo si se piden)
+        """
+        self.chunk_size = chunk_size
+        self.directory = directory
+        self.name = name
+        self.max_paths = max_paths
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Vacía el registro y los contadores; las filas siguientes van a un archivo nuevo."""
+        with self._lock:
+            self.path = None         # Archivo de esta ejecución (se crea en el primer volcado)
+            self._paths = []         # Rutas internadas en memoria (índices desde _paths_base)
+            self._paths_base = 0
+            self._path_ids = {}
+            self._saved_paths = 0    # Rutas ya escritas al archivo .paths
+            self._chunks = []        # Bloques llenos en memoria (sin archivo)
+            self._flushed = 0        # Filas escritas al archivo
+            self._current = np.zeros(self.chunk_size, dtype=DETECTION_DTYPE)
+            self._size = 0           # Filas en el bloque actual
+            self._last = None        # Última entrada (dict) para log[-1]
+
+            # Contadores incrementales
+            self.total = 0
+            self.correct = 0
+            self.by_label = {label: 0 for label in LABELS[1:]}          # Detecciones por clase real
+            self.correct_by_label = {label: 0 for label in LABELS[1:]}  # Aciertos por clase real
+
+    def _open_file(self):
+        """Crea el archivo de esta ejecución; 'x' garantiza no pisar el de otro registro."""
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        while True:
+            path = os.path.join(self.directory, f"{self.name}_{stamp}_{os.getpid()}_{next(_run_ids)}.bin")
+            try:
+                open(path, 'xb').close()
+            except FileExistsError:
+                continue
+            open(path + '.paths', 'w', encoding='utf-8').close()
+            self.path = path
+            return
+
+    @property
+    def paths(self):
+        """Rutas de imagen internadas, en el orden de sus índices."""
+        with self._lock:
+            return self._all_paths()
+
+    def _all_paths(self):
+        if self._paths_base == 0:
+            return list(self._paths)
+        return self._read_saved_paths()[:self._paths_base] + self._paths
+
+    def _read_saved_paths(self):
+        with open(self.path + '.paths', 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def _intern(self, image_path):
+        if image_path is None:
+            return -1
+        index = self._path_ids.get(image_path)
+        if index is None:
+            index = self._paths_base + len(self._paths)
+            self._path_ids[image_path] = index
+            self._paths.append(image_path)
+        return index
+
+    def append(self, entry):
+        """
+        Añade una detección.
+
+        Args:
+            entry: Dict con position, image_path, ground_truth, prediction,
+                confidence y correct (el formato de BeeAgent)
+        """
+        with self._lock:
+            row = self._current[self._size]
+            row['row'], row['col'] = entry['position']
+            row['image'] = self._intern(entry['image_path'])
+            row['ground_truth'] = LABEL_CODES.get(entry['ground_truth'], LABEL_CODES['unknown'])
+            row['prediction'] = LABEL_CODES.get(entry['prediction'], LABEL_CODES['unknown'])
+            row['confidence'] = entry['confidence'] or 0.0
+            row['correct'] = bool(entry['correct'])
+            self._size += 1
+            self._last = self._to_dict(row)
+
+            ground_truth = LABELS[row['ground_truth']]
+            self.total += 1
+            self.by_label[ground_truth] += 1
+            if entry['correct']:
+                self.correct += 1
+                self.correct_by_label[ground_truth] += 1
+
+            if self._size == self.chunk_size:
+                self._flush_chunk()
+
+    def extend(self, positions, image_paths, ground_truth, predictions, confidences, correct):
+        """
+        Añade varias detecciones de una vez, por columnas (enjambres de abejas).
+
+        Args:
+            positions: Arreglo (n, 2) de posiciones (fila, columna)
+            image_paths: Lista de n rutas (o None)
+            ground_truth: Lista de n clases reales
+            predictions: Lista de n predicciones (o None)
+            confidences: Arreglo de n confianzas
+            correct: Arreglo booleano de n aciertos
+        """
+        count = len(positions)
+        if count == 0:
+            return
+        rows = np.zeros(count, dtype=DETECTION_DTYPE)
+        positions = np.asarray(positions)
+        rows['row'], rows['col'] = positions[:, 0], positions[:, 1]
+        rows['ground_truth'] = [LABEL_CODES.get(label, LABEL_CODES['unknown']) for label in ground_truth]
+        rows['prediction'] = [LABEL_CODES.get(label, LABEL_CODES['unknown']) for label in predictions]
+        rows['confidence'] = confidences
+        rows['correct'] = correct
+
+        with self._lock:
+            rows['image'] = [self._intern(path) for path in image_paths]
+            self.total += count
+            self.correct += int(rows['correct'].sum())
+            by_label = np.bincount(rows['ground_truth'], minlength=len(LABELS))
+            correct_by_label = np.bincount(rows['ground_truth'][rows['correct']], minlength=len(LABELS))
+            for code, label in enumerate(LABELS[1:], start=1):
+                self.by_label[label] += int(by_label[code])
+                self.correct_by_label[label] += int(correct_by_label[code])
+
+            self._last = self._to_dict(rows[-1])
+
+            # Copiar por tramos que quepan en el bloque actual
+            start = 0
+            while start < count:
+                take = min(count - start, self.chunk_size - self._size)
+                self._current[self._size:self._size + take] = rows[start:start + take]
+                self._size += take
+                start += take
+                if self._size == self.chunk_size:
+                    self._flush_chunk()
+
+    def _flush_chunk(self):
+        """Guarda el bloque actual (en el archivo o en memoria) y empieza otro."""
+        if self.directory is None:
+            self._chunks.append(self._current)
+            self._current = np.zeros(self.chunk_size, dtype=DETECTION_DTYPE)
+        else:
+            if self.path is None:
+                self._open_file()
+            with open(self.path, 'ab') as f:
+                f.write(self._current[:self._size].tobytes())
+            with open(self.path + '.paths', 'a', encoding='utf-8') as f:
+                for image_path in self._paths[self._saved_paths - self._paths_base:]:
+                    f.write(image_path + '\n')
+            self._saved_paths = self._paths_base + len(self._paths)
+            self._flushed += self._size
+            if len(self._path_ids) > self.max_paths:
+                # Todas las rutas están en el archivo: olvidarlas (las repetidas se vuelven a internar)
+                self._paths_base = self._saved_paths
+                self._paths = []
+                self._path_ids = {}
+        self._size = 0
+
+    def flush(self):
+        """Vuelca al archivo las filas del bloque actual (al terminar una ejecución)."""
+        with self._lock:
+            if self.directory is not None and self._size:
+                self._flush_chunk()
+
+    def _to_dict(self, row, paths=None):
+        image = int(row['image'])
+        if image < 0:
+            image_path = None
+        elif paths is not None:
+            image_path = paths[image]
+        elif image >= self._paths_base:
+            image_path = self._paths[image - self._paths_base]
+        else:
+            image_path = self._read_saved_paths()[image]
+        return {
+            'position': (int(row['row']), int(row['col'])),
+            'image_path': image_path,
+            'ground_truth': LABELS[row['ground_truth']],
+            'prediction': LABELS[row['prediction']],
+            'confidence': float(row['confidence']),
+            'correct': bool(row['correct']),
+        }
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, index):
+        """Detección `index` como dict (admite índices negativos)."""
+        with self._lock:
+            if index < 0:
+                index += self.total
+            if not 0 <= index < self.total:
+                raise IndexError("índice de detección fuera de rango")
+            if index == self.total - 1:
+                return dict(self._last)
+            return self._to_dict(self._row(index))
+
+    def _row(self, index):
+        stored = self._flushed + len(self._chunks) * self.chunk_size
+        if index >= stored:
+            return self._current[index - stored]
+        if self.directory is None:
+            return self._chunks[index // self.chunk_size][index % self.chunk_size]
+        return np.memmap(self.path, dtype=DETECTION_DTYPE, mode='r', shape=(self._flushed,))[index]
+
+    def columns(self):
+        """
+        Todas las filas como un único arreglo estructurado (para análisis).
+        Con archivo, las filas volcadas se leen con memmap.
+        """
+        with self._lock:
+            parts = list(self._chunks)
+            if self.path is not None and self._flushed:
+                parts.insert(0, np.memmap(self.path, dtype=DETECTION_DTYPE, mode='r', shape=(self._flushed,)))
+            parts.append(self._current[:self._size])
+            return np.concatenate(parts)
+
+    def __iter__(self):
+        rows = self.columns()
+        with self._lock:
+            paths = self._all_paths()
+        for row in rows:
+            yield self._to_dict(row, paths)
+
+    @staticmethod
+    def load(path):
+        """
+        Lee un registro volcado a disco.
+
+        Returns:
+            Tupla (arreglo estructurado en memmap, lista de rutas de imagen)
+        """
+        with open(path + '.paths', 'r', encoding='utf-8') as f:
+            paths = f.read().splitlines()
+        rows = np.memmap(path, dtype=DETECTION_DTYPE, mode='r') if os.path.getsize(path) else np.zeros(0, DETECTION_DTYPE)
+        return rows, paths
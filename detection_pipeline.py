@@ -0,0 +1,254 @@
+"""
+Etapas de detección desacopladas del movimiento de la abeja.
+
+- LookaheadClassifier: cuando se conoce el camino completo, las imágenes de
+  todas sus flores y objetos se clasifican por lotes en un hilo de fondo; al
+  llegar la abeja a la celda la detección se reduce a consultar un diccionario.
+- AsyncDetector: cola acotada con un grupo de trabajadores; la abeja sigue
+  moviéndose mientras se clasifica y los resultados se registran en orden.
+"""
+import queue
+import threading
+from config import *
+from utils import Logger
+
+
+class LookaheadClassifier:
+    """
+    Clasifica en segundo plano, por lotes, las imágenes asignadas a un
+    conjunto de posiciones y guarda los resultados por posición.
+
+    El primer lote es pequeño para que las celdas más cercanas estén listas
+    cuanto antes; después el tamaño se duplica hasta batch_size.
+    """
+
+    def __init__(self, classifier, batch_size=PREDICT_BATCH_SIZE):
+        """
+        Inicializa el clasificador anticipado.
+
+        Args:
+            classifier: Instancia de FlowerClassifier (se usa predict_batch)
+            batch_size: Imágenes por pasada del modelo
+        """
+        self.classifier = classifier
+        self.batch_size = batch_size
+        self.results = {}     # posición -> (clase, confianza)
+        self.pending = {}     # posición -> ruta de imagen aún sin clasificar
+        self._condition = threading.Condition()
+        self._running = False
+        self._generation = 0  # Se incrementa al cancelar para descartar lotes en curso
+
+    def submit(self, items):
+        """
+        Encola posiciones para clasificar en un hilo de fondo.
+
+        Args:
+            items: Lista de tuplas (posición, ruta de imagen) en orden de visita
+        """
+        with self._condition:
+            for position, image_path in items:
+                if position not in self.results:
+                    self.pending[position] = image_path
+            if self.pending and not self._running:
+                self._running = True
+                threading.Thread(target=self._worker, args=(self._generation,), daemon=True).start()
+
+    def _worker(self, generation):
+        """Clasifica los pendientes en lotes, en el orden en que se encolaron."""
+        size = min(LOOKAHEAD_FIRST_BATCH, self.batch_size)
+        while True:
+            with self._condition:
+                if generation != self._generation:
+                    return
+                if not self.pending:
+                    self._running = False
+                    return
+                batch = list(self.pending.items())[:size]
+
+            try:
+                predictions = self.classifier.predict_batch([path for _, path in batch], self.batch_size)
+            except Exception as e:
+                Logger.log(f"Error en la clasificación anticipada: {e}", "ERROR")
+                predictions = [(None, 0.0)] * len(batch)
+
+            with self._condition:
+                if generation != self._generation:
+                    return
+                for (position, _), prediction in zip(batch, predictions):
+                    if self.pending.pop(position, None) is not None:
+                        self.results[position] = prediction
+                self._condition.notify_all()
+            Logger.log(f"Clasificación anticipada: {len(batch)} imágenes en un lote")
+            size = min(size * 2, self.batch_size)
+
+    def retain(self, positions):
+        """
+        Descarta los pendientes y resultados de las posiciones que ya no están
+        en el plan (p. ej. tras reparar el camino).
+
+        Args:
+            positions: Conjunto de posiciones que siguen planificadas
+
+        Returns:
+            Número de posiciones descartadas
+        """
+        with self._condition:
+            stale = [position for position in list(self.pending) + list(self.results) if position not in positions]
+            for position in stale:
+                self.pending.pop(position, None)
+                self.results.pop(position, None)
+            if stale:
+                self._condition.notify_all()
+            return len(stale)
+
+    def get(self, position, timeout=None):
+        """
+        Resultado de una posición. Si aún se está clasificando espera a que termine.
+
+        Args:
+            position: Tupla (x, y)
+            timeout: Espera máxima en segundos (None = sin límite)
+
+        Returns:
+            Tupla (clase, confianza), o None si la posición no se encoló
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: position not in self.pending, timeout)
+            return self.results.pop(position, None)
+
+    def cancel(self):
+        """Descarta los pendientes y los resultados (p. ej. al reiniciar la simulación)."""
+        with self._condition:
+            self._generation += 1
+            self._running = False  # El hilo anterior termina al ver la generación nueva
+            self.pending.clear()
+            self.results.clear()
+            self._condition.notify_all()
+
+
+class AsyncDetector:
+    """
+    Etapa de detección asíncrona: cola acotada + grupo de hilos trabajadores.
+
+    Los trabajos se numeran al encolarse; cada trabajador los procesa en
+    cuanto puede, pero los resultados se entregan a `on_result` estrictamente
+    en el orden de encolado (búfer de reordenamiento), de modo que el
+    registro de detecciones queda igual que con la detección síncrona.
+    `on_result` se llama fuera del cerrojo y desde un solo trabajador a la
+    vez, así que puede tardar (p. ej. publicar en la GUI) sin bloquear
+    submit, pending, drain ni cancel.
+    """
+
+    def __init__(self, process, on_result, workers=DETECTION_WORKERS, queue_size=DETECTION_QUEUE_SIZE):
+        """
+        Inicializa la etapa y arranca los trabajadores.
+
+        Args:
+            process: Función trabajo -> resultado (se ejecuta en los trabajadores)
+            on_result: Función (trabajo, resultado) llamada en orden de encolado
+            workers: Número de hilos trabajadores
+            queue_size: Trabajos en espera máximos; submit bloquea si se llena
+        """
+        self.process = process
+        self.on_result = on_result
+        self.queue = queue.Queue(maxsize=queue_size)
+        self._condition = threading.Condition()
+        self._done = {}          # secuencia -> (trabajo, resultado) aún sin entregar
+        self._submitted = 0
+        self._ready = 0          # Siguiente secuencia a sacar del búfer para entregarla
+        self._next = 0           # Trabajos ya entregados
+        self._delivering = False # Hay un trabajador entregando resultados
+        self._generation = 0
+        self._workers = [
+            threading.Thread(target=self._worker, daemon=True, name=f"detector-{i}")
+            for i in range(workers)
+        ]
+        for thread in self._workers:
+            thread.start()
+
+    @property
+    def pending(self):
+        """Trabajos encolados o en proceso que aún no se entregaron."""
+        with self._condition:
+            return self._submitted - self._next
+
+    def submit(self, job):
+        """
+        Encola un trabajo. Bloquea solo si la cola está llena (contrapresión).
+
+        Returns:
+            Número de secuencia del trabajo
+        """
+        with self._condition:
+            sequence = self._submitted
+            self._submitted += 1
+            generation = self._generation
+        self.queue.put((generation, sequence, job))
+        return sequence
+
+    def _worker(self):
+        while True:
+            generation, sequence, job = self.queue.get()
+            try:
+                result = self.process(job)
+            except Exception as e:
+                Logger.log(f"Error en la detección asíncrona: {e}", "ERROR")
+                result = None
+            deliver = False
+            with self._condition:
+                if generation == self._generation:
+                    self._done[sequence] = (job, result)
+                    # Si otro trabajador ya está entregando, él recoge este resultado
+                    deliver = not self._delivering
+                    self._delivering = True
+            if deliver:
+                self._deliver()
+            self.queue.task_done()
+
+    def _deliver(self):
+        """Entrega en orden, fuera del cerrojo, todo lo que ya esté listo."""
+        while True:
+            with self._condition:
+                ready = []
+                while self._ready in self._done:
+                    ready.append(self._done.pop(self._ready))
+                    self._ready += 1
+                if not ready:
+                    self._delivering = False
+                    return
+                generation = self._generation
+            for ready_job, ready_result in ready:
+                if generation != self._generation:
+                    break  # Cancelado durante la entrega
+                try:
+                    self.on_result(ready_job, ready_result)
+                except Exception as e:
+                    Logger.log(f"Error registrando detección: {e}", "ERROR")
+            with self._condition:
+                if generation == self._generation:
+                    self._next += len(ready)
+                    self._condition.notify_all()
+
+    def drain(self, timeout=None):
+        """
+        Espera a que se entreguen todos los trabajos encolados.
+
+        Returns:
+            True si no quedan trabajos pendientes
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._next == self._submitted, timeout)
+
+    def cancel(self):
+        """Descarta los trabajos pendientes; los que estén en proceso no se entregan."""
+        with self._condition:
+            self._generation += 1
+            while True:
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                except queue.Empty:
+                    break
+            self._done.clear()
+            self._ready = self._next = self._submitted
+            self._condition.notify_all()
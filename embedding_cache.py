@@ -0,0 +1,180 @@
+"""
+Clase EmbeddingCache - Embeddings de la red base precalculados en disco.
+
+Con la red base congelada, cada época de entrenamiento repetiría exactamente
+las mismas pasadas hacia adelante. La caché las hace una sola vez por
+(imagen, variante de aumento) y guarda los embeddings de la penúltima capa en
+un arreglo float16 (n, variantes, dimensión) que se lee con memmap; entrenar
+la capa final sobre él tarda segundos.
+
+Archivos en `<cache_dir>/<backbone>_<carpeta>_<hash de la ruta>/` (uno por
+red base y conjunto de datos, como los shards de imágenes):
+    embeddings_<generación>.npy  arreglo float16 (formato .npy, se abre con mmap)
+    manifest.json                red base, pesos, tamaño de imagen, variantes,
+                                 generación y la lista de imágenes
+                                 [ruta, mtime_ns] en el orden de las filas
+
+Al actualizarla solo se calculan las imágenes nuevas o modificadas; las
+demás filas se copian de la caché anterior. Cada actualización escribe un
+archivo de embeddings nuevo y después reemplaza el manifiesto, que nombra su
+generación: si se interrumpe, el manifiesto sigue apuntando a los datos
+anteriores, que no se tocaron.
+"""
+import glob
+import hashlib
+import json
+import os
+import time
+import uuid
+import numpy as np
+import torch
+from config import *
+from utils import Logger
+
+
+MANIFEST_FILE = 'manifest.json'
+EMBEDDINGS_FILE = 'embeddings_{}.npy'  # Con la generación del manifiesto
+
+
+def cache_directory(backbone, data_root=None, cache_dir=EMBEDDING_CACHE_DIR):
+    """Directorio de la caché: <cache_dir>/<backbone>_<carpeta>_<hash de la ruta> (o <backbone> sin data_root)."""
+    if data_root is None:
+        return os.path.join(cache_dir, backbone)
+    data_root = os.path.abspath(data_root)
+    digest = hashlib.sha1(data_root.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(cache_dir, f"{backbone}_{os.path.basename(data_root)}_{digest}")
+
+
+class EmbeddingCache:
+    """
+    Caché de embeddings de una red base.
+
+    Uso:
+        cache = EmbeddingCache('resnet50', data_root=TRAIN_DIR)
+        embeddings = cache.update(model, paths, load_variant, variants=5)
+        x = embeddings[indices, variant_indices]   # (lote, dimensión) float16
+    """
+
+    def __init__(self, backbone, cache_dir=EMBEDDING_CACHE_DIR, weights='imagenet', data_root=None):
+        """
+        Args:
+            backbone: Nombre de la red base
+            cache_dir: Directorio raíz de las cachés
+            weights: Identificador de los pesos de la red base (si cambian,
+                la caché se recalcula entera)
+            data_root: Directorio del conjunto de datos; cada conjunto tiene
+                su propia caché, así que alternar entre ellos no la descarta
+        """
+        self.backbone = backbone
+        self.weights = weights
+        self.directory = cache_directory(backbone, data_root, cache_dir)
+        self.manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+
+    def _embeddings_path(self, generation):
+        return os.path.join(self.directory, EMBEDDINGS_FILE.format(generation))
+
+    def _read_manifest(self):
+        """Manifiesto actual, o None si no hay caché o no coincide con sus embeddings."""
+        if not os.path.exists(self.manifest_path):
+            return None
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            path = self._embeddings_path(manifest['generation'])
+            header = np.load(path, mmap_mode='r')
+        except (OSError, ValueError, KeyError) as e:
+            Logger.log(f"Caché de embeddings ilegible ({e}), se recalcula", "WARNING")
+            return None
+        if header.shape != (len(manifest['entries']), manifest['variants'], manifest['dim']):
+            Logger.log("Embeddings y manifiesto no coinciden, se recalcula la caché", "WARNING")
+            return None
+        manifest['path'] = path
+        return manifest
+
+    def load(self):
+        """
+        Abre la caché existente sin modificarla.
+
+        Returns:
+            Tupla (embeddings en memmap, rutas) o None si no hay caché
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        return np.load(manifest['path'], mmap_mode='r'), [path for path, _ in manifest['entries']]
+
+    def update(self, model, paths, load_variant, variants, device=None, batch_size=BATCH_SIZE):
+        """
+        Deja la caché al día con `paths` y la devuelve.
+
+        Args:
+            model: VisionTransformerClassifier (se usa model.features en modo evaluación)
+            paths: Rutas de las imágenes, en el orden que tendrán las filas
+            load_variant: Función (ruta, variante) -> tensor (3, IMAGE_SIZE, IMAGE_SIZE)
+            variants: Variantes de aumento por imagen
+            device: Dispositivo del modelo
+            batch_size: Imágenes por pasada del modelo
+
+        Returns:
+            Arreglo float16 (len(paths), variants, dimensión) en memmap
+        """
+        device = device or torch.device('cpu')
+        stamps = [os.stat(path).st_mtime_ns if os.path.exists(path) else 0 for path in paths]
+        settings = {
+            'backbone': self.backbone,
+            'weights': self.weights,
+            'image_size': IMAGE_SIZE,
+            'variants': variants,
+            'dim': model.num_features,
+        }
+
+        # Filas reutilizables de la caché anterior
+        previous = self._read_manifest()
+        old_rows = {}
+        old = None
+        if previous is not None and all(previous.get(key) == value for key, value in settings.items()):
+            old = np.load(previous['path'], mmap_mode='r')
+        if old is not None:
+            old_rows = {tuple(entry): row for row, entry in enumerate(previous['entries'])}
+        reuse = [old_rows.get((path, stamp)) for path, stamp in zip(paths, stamps)]
+        pending = [i for i, row in enumerate(reuse) if row is None]
+        if old is not None and len(old) == len(paths) and reuse == list(range(len(paths))):
+            return old  # Nada cambió
+
+        os.makedirs(self.directory, exist_ok=True)
+        generation = uuid.uuid4().hex
+        embeddings_path = self._embeddings_path(generation)
+        embeddings = np.lib.format.open_memmap(
+            embeddings_path, mode='w+', dtype=np.float16, shape=(len(paths), variants, model.num_features))
+        for i, row in enumerate(reuse):
+            if row is not None:
+                embeddings[i] = old[row]
+        del old
+
+        start = time.perf_counter()
+        was_training = model.training
+        model.eval()
+        jobs = [(i, variant) for i in pending for variant in range(variants)]
+        with torch.inference_mode():
+            for first in range(0, len(jobs), batch_size):
+                chunk = jobs[first:first + batch_size]
+                batch = torch.stack([load_variant(paths[i], variant) for i, variant in chunk]).to(device)
+                features = model.features(batch).cpu().numpy().astype(np.float16)
+                for (i, variant), vector in zip(chunk, features):
+                    embeddings[i, variant] = vector
+        model.train(was_training)
+        embeddings.flush()
+        del embeddings
+
+        # El reemplazo del manifiesto es el único paso que publica la generación nueva
+        manifest = dict(settings, generation=generation,
+                        entries=[[path, stamp] for path, stamp in zip(paths, stamps)])
+        with open(self.manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+        for stale in glob.glob(self._embeddings_path('*')):
+            if stale != embeddings_path:
+                os.remove(stale)  # Generaciones anteriores o escrituras interrumpidas
+        Logger.log(f"Caché de embeddings: {len(pending)} imágenes nuevas x {variants} variantes "
+                   f"en {time.perf_counter() - start:.1f}s, {len(paths) - len(pending)} reutilizadas")
+        return np.load(embeddings_path, mmap_mode='r')
@@ -5,24 +5,48 @@ Clasifica imágenes como 'flor' o 'objeto' (no-flor).
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset
 from torchvision import transforms, models
 from PIL import Image
 import os
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from config import *
-from utils import ImageProcessor, Logger
+from data_loading import make_loader
+from embedding_cache import EmbeddingCache
+from image_processing import ImageProcessor
+from image_shard import ImageShard, shard_directory
+from prediction_table import PredictionTable, file_checksum
+from inference_backends import EagerBackend, create_backend, export_model
+from quantization import load_quantized, quantized_model_path
+from utils import Logger
+
+
+# Técnicas de aumento de datos de FlowerDataset.augment (incluida la imagen original)
+AUGMENTATION_VARIANTS = 5
+
+# Normalización de ImageNet que esperan las redes base
+IMAGENET_MEAN = [0.485, 0.456, 0.406]
+IMAGENET_STD = [0.229, 0.224, 0.225]
 
 
 class FlowerDataset(Dataset):
     """Dataset personalizado para entrenamiento del clasificador."""
     
-    def __init__(self, root_dir, transform=None, apply_augmentation=True):
+    def __init__(self, root_dir, transform=None, apply_augmentation=True, use_shard=False, shard_dir=SHARD_DIR):
         """
         Args:
             root_dir: Directorio raíz con subcarpetas 'flores' y 'objetos'
             transform: Transformaciones de torchvision
             apply_augmentation: Si True, aplica aumento de datos con procesamiento de imágenes
+            use_shard: Si True las imágenes se decodifican una sola vez a un
+                shard uint8 en memmap (ver image_shard.py) y se leen de ahí;
+                con aumento de datos el shard guarda las AUGMENTATION_VARIANTS
+                variantes ya procesadas. Como ya están redimensionadas,
+                `transform` se sustituye por su equivalente (a tensor y
+                normalización de ImageNet).
+            shard_dir: Directorio donde se guardan los shards (con use_shard)
         """
         self.root_dir = root_dir
         self.transform = transform
@@ -30,9 +54,18 @@ class FlowerDataset(Dataset):
         self.samples = []
         self.classes = ['flower', 'object']
         self.class_to_idx = {'flower': 0, 'object': 1}
+        self.shard = None
         
         # Cargar rutas de imágenes
         self._load_samples()
+        if use_shard and self.samples:
+            paths = [img_path for img_path, _ in self.samples]
+            labels = [label for _, label in self.samples]
+            variants = AUGMENTATION_VARIANTS if apply_augmentation else 1
+            self.shard = ImageShard.pack(paths, labels, shard_directory(root_dir, IMAGE_SIZE, variants, shard_dir),
+                                         variants=variants, augment=self.augment)
+            self._mean = torch.tensor(IMAGENET_MEAN).view(3, 1, 1)
+            self._std = torch.tensor(IMAGENET_STD).view(3, 1, 1)
     
     def _load_samples(self):
         """Carga las rutas de todas las imágenes y sus etiquetas."""
@@ -54,35 +87,62 @@ class FlowerDataset(Dataset):
     def __len__(self):
         return len(self.samples)
     
-    def __getitem__(self, idx):
-        img_path, label = self.samples[idx]
-        
+    @staticmethod
+    def load_image(img_path):
+        """Abre una imagen en RGB (gris si no se puede cargar)."""
         try:
-            image = Image.open(img_path).convert('RGB')
+            return Image.open(img_path).convert('RGB')
         except:
             # Crear imagen de respaldo si falla la carga
-            image = Image.new('RGB', (224, 224), color=(128, 128, 128))
+            return Image.new('RGB', (224, 224), color=(128, 128, 128))
+    
+    @staticmethod
+    def augment(image, augmentation_type):
+        """
+        Aplica una de las AUGMENTATION_VARIANTS técnicas de procesamiento.
+        
+        Args:
+            image: PIL Image
+            augmentation_type: 0 original, 1 ecualización global, 2 CLAHE,
+                3 subexpuesta, 4 sobreexpuesta
+        """
+        if augmentation_type == 0:
+            # Original
+            return image
+        elif augmentation_type == 1:
+            # Ecualización global
+            return ImageProcessor.equalize_histogram_global(image)
+        elif augmentation_type == 2:
+            # Ecualización adaptativa (CLAHE)
+            return ImageProcessor.equalize_histogram_adaptive(image)
+        elif augmentation_type == 3:
+            # Subexpuesta
+            return ImageProcessor.create_underexposed(image, factor=0.6)
+        elif augmentation_type == 4:
+            # Sobreexpuesta
+            return ImageProcessor.create_overexposed(image, factor=1.4)
+        raise ValueError(f"Variante de aumento desconocida: {augmentation_type}")
+    
+    def shard_tensor(self, idx, augmentation_type=0):
+        """Muestra leída del shard: vista del memmap, sin decodificar, procesar ni copiar."""
+        image = torch.from_numpy(self.shard.images[idx, augmentation_type]).permute(2, 0, 1)
+        if self.transform:
+            image = (image.float().div_(255) - self._mean) / self._std
+        return image
+    
+    def __getitem__(self, idx):
+        if self.shard is not None:
+            # Seleccionar aleatoriamente una de las variantes ya procesadas
+            augmentation_type = np.random.randint(0, self.shard.variants) if self.apply_augmentation else 0
+            return self.shard_tensor(idx, augmentation_type), int(self.shard.labels[idx])
+        
+        img_path, label = self.samples[idx]
+        image = self.load_image(img_path)
         
         # Aplicar aumento de datos con procesamiento avanzado
         if self.apply_augmentation:
             # Seleccionar aleatoriamente una técnica de procesamiento
-            augmentation_type = np.random.randint(0, 5)
-            
-            if augmentation_type == 0:
-                # Original
-                pass
-            elif augmentation_type == 1:
-                # Ecualización global
-                image = ImageProcessor.equalize_histogram_global(image)
-            elif augmentation_type == 2:
-                # Ecualización adaptativa (CLAHE)
-                image = ImageProcessor.equalize_histogram_adaptive(image)
-            elif augmentation_type == 3:
-                # Subexpuesta
-                image = ImageProcessor.create_underexposed(image, factor=0.6)
-            elif augmentation_type == 4:
-                # Sobreexpuesta
-                image = ImageProcessor.create_overexposed(image, factor=1.4)
+            image = self.augment(image, np.random.randint(0, AUGMENTATION_VARIANTS))
         
         # Aplicar transformaciones de PyTorch
         if self.transform:
@@ -91,27 +151,79 @@ class FlowerDataset(Dataset):
         return image, label
 
 
+# Redes base disponibles: constructor de torchvision y capa de clasificación
+# que se sustituye por una de NUM_CLASSES salidas
+BACKBONES = {
+    'resnet50': (models.resnet50, 'fc'),
+    'resnet18': (models.resnet18, 'fc'),
+    'mobilenet_v3_small': (models.mobilenet_v3_small, 'classifier.3'),
+    'efficientnet_b0': (models.efficientnet_b0, 'classifier.1'),
+    'shufflenet_v2_x1_0': (models.shufflenet_v2_x1_0, 'fc'),
+}
+
+
+def model_path_for(backbone, quantization=None):
+    """
+    Ruta del checkpoint de una red base dentro de MODELS_DIR.
+    ResNet50 conserva la ruta original (MODEL_PATH); las demás usan
+    flower_classifier_<backbone>.pth. Las variantes cuantizadas añaden
+    _int8_<modo> al nombre.
+    """
+    if backbone == 'resnet50':
+        path = MODEL_PATH
+    else:
+        path = os.path.join(MODELS_DIR, f'flower_classifier_{backbone}.pth')
+    return quantized_model_path(path, quantization) if quantization else path
+
+
 class VisionTransformerClassifier(nn.Module):
     """
     Clasificador basado en Vision Transformer (ViT).
     Usa un modelo preentrenado de timm o torchvision.
     """
     
-    def __init__(self, num_classes=2, pretrained=True):
+    def __init__(self, num_classes=2, pretrained=True, backbone=BACKBONE):
         super(VisionTransformerClassifier, self).__init__()
         
+        if backbone not in BACKBONES:
+            raise ValueError(f"Red base desconocida: {backbone} (opciones: {', '.join(BACKBONES)})")
+        
         # Usar un modelo preentrenado como base
-        # En este caso, usamos ResNet como alternativa más ligera
+        # En este caso, usamos redes convolucionales como alternativa más ligera
         # (ViT puro requeriría instalar timm, aquí usamos arquitectura disponible)
-        self.backbone = models.resnet50(pretrained=pretrained)
+        builder, head_name = BACKBONES[backbone]
+        self.backbone_name = backbone
+        self.backbone = builder(weights='DEFAULT' if pretrained else None)
         
         # Modificar la última capa para nuestro número de clases
-        num_features = self.backbone.fc.in_features
-        self.backbone.fc = nn.Linear(num_features, num_classes)
+        self._head_parent, _, self._head_attr = head_name.rpartition('.')
+        num_features = self.head.in_features
+        setattr(self._head_container(), self._head_attr, nn.Linear(num_features, num_classes))
+        self.num_features = num_features
         
         # Capa softmax para probabilidades
         self.softmax = nn.Softmax(dim=1)
     
+    def _head_container(self):
+        if self._head_parent:
+            return self.backbone.get_submodule(self._head_parent)
+        return self.backbone
+    
+    @property
+    def head(self):
+        """Capa lineal final (la única que se entrena con la red base congelada)."""
+        return getattr(self._head_container(), self._head_attr)
+    
+    def features(self, x):
+        """Embeddings de la penúltima capa: la entrada de `head`, (n, num_features)."""
+        container = self._head_container()
+        head = self.head
+        setattr(container, self._head_attr, nn.Identity())
+        try:
+            return self.backbone(x)
+        finally:
+            setattr(container, self._head_attr, head)
+    
     def forward(self, x):
         x = self.backbone(x)
         return x
@@ -128,14 +240,37 @@ class FlowerClassifier:
     Maneja entrenamiento, evaluación y predicción.
     """
     
-    def __init__(self, model_path=MODEL_PATH):
-        self.model_path = model_path
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+    def __init__(self, model_path=None, backbone=BACKBONE, quantization=QUANTIZATION,
+                 inference_backend=INFERENCE_BACKEND):
+        """
+        Args:
+            model_path: Checkpoint del modelo (por defecto el de la red base en MODELS_DIR)
+            backbone: Red base, una de las claves de BACKBONES
+            quantization: None para float32, o 'dynamic' / 'static' para cargar
+                la variante INT8 exportada con quantize_model.py
+            inference_backend: Motor de ejecución: 'eager', 'torchscript' u 'onnx'
+        """
+        if backbone not in BACKBONES:
+            raise ValueError(f"Red base desconocida: {backbone} (opciones: {', '.join(BACKBONES)})")
+        self.backbone = backbone
+        self.quantization = quantization
+        self.model_path = model_path or model_path_for(backbone, quantization)
+        # Los modelos cuantizados solo se ejecutan en CPU
+        use_cuda = torch.cuda.is_available() and not quantization
+        self.device = torch.device('cuda' if use_cuda else 'cpu')
         self.model = None
+        self.inference_backend = inference_backend
+        self.runtime = None            # Motor de ejecución del modelo cargado (bajo demanda)
         self.transform = None
+        self.loaded_from_file = False  # El modelo en memoria coincide con model_path
+        self.prediction_table = None   # Predicciones precalculadas (enable_prediction_table)
+        self._decoder = None           # Hilos de decodificación de predict_batch (bajo demanda)
+        # Carga del modelo y creación del motor: la tabla de predicciones, el
+        # servicio de inferencia y la clasificación anticipada llegan a la vez
+        self._model_lock = threading.RLock()
         
         self._setup_transforms()
-        Logger.log(f"FlowerClassifier inicializado en dispositivo: {self.device}")
+        Logger.log(f"FlowerClassifier inicializado en dispositivo: {self.device} (red base: {backbone})")
     
     def _setup_transforms(self):
         """Configura las transformaciones para las imágenes."""
@@ -143,12 +278,13 @@ class FlowerClassifier:
             transforms.Resize((IMAGE_SIZE, IMAGE_SIZE)),
             transforms.ToTensor(),
             transforms.Normalize(
-                mean=[0.485, 0.456, 0.406],
-                std=[0.229, 0.224, 0.225]
+                mean=IMAGENET_MEAN,
+                std=IMAGENET_STD
             )
         ])
     
-    def train(self, train_dir=TRAIN_DIR, epochs=EPOCHS, batch_size=BATCH_SIZE):
+    def train(self, train_dir=TRAIN_DIR, epochs=EPOCHS, batch_size=BATCH_SIZE, freeze_backbone=FREEZE_BACKBONE,
+              use_shard=DATASET_SHARDS, num_workers=DATALOADER_WORKERS):
         """
         Entrena el modelo clasificador.
         
@@ -156,29 +292,32 @@ class FlowerClassifier:
             train_dir: Directorio con datos de entrenamiento
             epochs: Número de épocas
             batch_size: Tamaño del batch
+            freeze_backbone: Si es True solo se entrena la capa final, sobre
+                la caché de embeddings (ver train_head)
+            use_shard: Leer las imágenes del shard uint8 ya decodificado
+            num_workers: Procesos de carga de datos, o 'auto' (ver data_loading.py)
         """
+        if freeze_backbone:
+            return self.train_head(train_dir, epochs)
+        
         Logger.log(f"Iniciando entrenamiento por {epochs} épocas...")
         
         # Crear dataset y dataloader
         dataset = FlowerDataset(
             train_dir, 
             transform=self.transform,
-            apply_augmentation=True
+            apply_augmentation=True,
+            use_shard=use_shard
         )
         
         if len(dataset) == 0:
             Logger.log("Dataset vacío, no se puede entrenar", "ERROR")
             return
         
-        dataloader = DataLoader(
-            dataset, 
-            batch_size=batch_size, 
-            shuffle=True,
-            num_workers=0
-        )
+        dataloader = make_loader(dataset, batch_size, shuffle=True, num_workers=num_workers)
         
         # Crear modelo
-        self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=True)
+        self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=True, backbone=self.backbone)
         self.model = self.model.to(self.device)
         
         # Optimizador y función de pérdida
@@ -193,8 +332,8 @@ class FlowerClassifier:
             total = 0
             
             for i, (images, labels) in enumerate(dataloader):
-                images = images.to(self.device)
-                labels = labels.to(self.device)
+                images = images.to(self.device, non_blocking=True)
+                labels = labels.to(self.device, non_blocking=True)
                 
                 # Forward pass
                 optimizer.zero_grad()
@@ -219,25 +358,104 @@ class FlowerClassifier:
         self.save_model()
         Logger.log("Entrenamiento completado")
     
+    def _load_variant(self, img_path, variant):
+        """Imagen con una variante de aumento, preprocesada para el modelo."""
+        return self.transform(FlowerDataset.augment(FlowerDataset.load_image(img_path), variant))
+    
+    def train_head(self, train_dir=TRAIN_DIR, epochs=EPOCHS, batch_size=HEAD_BATCH_SIZE,
+                   learning_rate=HEAD_LEARNING_RATE, pretrained=True, seed=None,
+                   cache_dir=EMBEDDING_CACHE_DIR):
+        """
+        Entrena solo la capa final con la red base congelada.
+        
+        Los embeddings de cada (imagen, variante de aumento) se calculan una
+        sola vez y se guardan en la caché de EMBEDDING_CACHE_DIR; en cada
+        época se toma, como en train(), una variante al azar por imagen.
+        Reentrenar con otras etiquetas o hiperparámetros reutiliza la caché.
+        
+        Args:
+            train_dir: Directorio con datos de entrenamiento
+            epochs: Número de épocas
+            batch_size: Embeddings por paso
+            learning_rate: Tasa de aprendizaje de la capa final
+            pretrained: Red base con pesos de ImageNet (False: pesos aleatorios)
+            seed: Semilla del orden y de las variantes (None = aleatoria)
+            cache_dir: Directorio de las cachés de embeddings
+        """
+        dataset = FlowerDataset(train_dir, transform=self.transform, apply_augmentation=False)
+        if len(dataset) == 0:
+            Logger.log("Dataset vacío, no se puede entrenar", "ERROR")
+            return
+        
+        self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=pretrained, backbone=self.backbone)
+        self.model = self.model.to(self.device)
+        
+        paths = [img_path for img_path, _ in dataset.samples]
+        labels = torch.tensor([label for _, label in dataset.samples])
+        cache = EmbeddingCache(self.backbone, cache_dir, weights='imagenet' if pretrained else 'random', data_root=train_dir)
+        embeddings = cache.update(self.model, paths, self._load_variant, AUGMENTATION_VARIANTS, self.device)
+        
+        Logger.log(f"Entrenando la capa final por {epochs} épocas sobre {len(paths)} x {AUGMENTATION_VARIANTS} embeddings...")
+        head = self.model.head
+        criterion = nn.CrossEntropyLoss()
+        optimizer = optim.Adam(head.parameters(), lr=learning_rate)
+        rng = np.random.default_rng(seed)
+        head.train()
+        for epoch in range(epochs):
+            order = rng.permutation(len(paths))
+            variants = rng.integers(0, AUGMENTATION_VARIANTS, len(paths))
+            running_loss = 0.0
+            correct = 0
+            steps = 0
+            for start in range(0, len(order), batch_size):
+                indices = np.sort(order[start:start + batch_size])  # Lectura del memmap en orden
+                features = torch.from_numpy(embeddings[indices, variants[indices]].astype(np.float32)).to(self.device)
+                targets = labels[indices].to(self.device)
+                
+                optimizer.zero_grad()
+                outputs = head(features)
+                loss = criterion(outputs, targets)
+                loss.backward()
+                optimizer.step()
+                
+                running_loss += loss.item()
+                correct += (outputs.argmax(dim=1) == targets).sum().item()
+                steps += 1
+            Logger.log(f"Época {epoch+1}/{epochs} - Loss: {running_loss / steps:.4f}, "
+                       f"Accuracy: {100 * correct / len(paths):.2f}%")
+        
+        self.model.eval()
+        self.save_model()
+        Logger.log("Entrenamiento de la capa final completado")
+    
     def load_model(self):
         """Carga un modelo preentrenado."""
+        self.loaded_from_file = False
+        self.prediction_table = None  # Las predicciones eran del modelo anterior
+        self.runtime = None
         if not os.path.exists(self.model_path):
             Logger.log(f"No se encontró modelo en {self.model_path}", "WARNING")
+            if self.quantization:
+                Logger.log("Genera la variante cuantizada con: python quantize_model.py", "WARNING")
             Logger.log("Creando modelo nuevo sin entrenar")
-            self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=True)
+            self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=True, backbone=self.backbone)
             self.model = self.model.to(self.device)
             return False
         
         try:
-            self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=False)
-            self.model.load_state_dict(torch.load(self.model_path, map_location=self.device))
+            self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=False, backbone=self.backbone)
+            if self.quantization:
+                self.model = load_quantized(self.model, self.model_path, self.quantization)
+            else:
+                self.model.load_state_dict(torch.load(self.model_path, map_location=self.device))
             self.model = self.model.to(self.device)
             self.model.eval()
+            self.loaded_from_file = True
             Logger.log(f"Modelo cargado desde {self.model_path}")
             return True
         except Exception as e:
             Logger.log(f"Error cargando modelo: {e}", "ERROR")
-            self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=True)
+            self.model = VisionTransformerClassifier(num_classes=NUM_CLASSES, pretrained=True, backbone=self.backbone)
             self.model = self.model.to(self.device)
             return False
     
@@ -246,56 +464,220 @@ class FlowerClassifier:
         if self.model is None:
             Logger.log("No hay modelo para guardar", "WARNING")
             return
+        if self.quantization:
+            Logger.log("Los modelos cuantizados se exportan con quantize_model.py", "WARNING")
+            return
         
         # Crear directorio si no existe
         os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
         
         try:
             torch.save(self.model.state_dict(), self.model_path)
+            self.loaded_from_file = True
+            self.prediction_table = None
+            self.runtime = None
             Logger.log(f"Modelo guardado en {self.model_path}")
         except Exception as e:
             Logger.log(f"Error guardando modelo: {e}", "ERROR")
     
-    def predict(self, image):
+    def enable_prediction_table(self, background=False, paths=None):
         """
-        Predice la clase de una imagen.
+        Precalcula las predicciones de los conjuntos de imágenes de la
+        simulación; desde entonces predict() responde consultando la tabla.
         
         Args:
-            image: PIL Image o ruta a imagen
+            background: Si es True clasifica en un hilo de fondo
+            paths: Rutas a precalcular (por defecto TEST_DIR y OBJECTS_DIR)
             
         Returns:
-            Tupla (class_name, probability)
+            La PredictionTable en uso
         """
-        if self.model is None:
-            self.load_model()
+        with self._model_lock:
+            if self.model is None:
+                self.load_model()
+        
+        # Solo un modelo guardado en disco tiene una tabla persistente
+        checksum = file_checksum(self.model_path) if self.loaded_from_file else None
+        table = PredictionTable(checksum, os.path.splitext(self.model_path)[0] + PREDICTION_TABLE_SUFFIX)
+        self.prediction_table = table
+        if background:
+            table.warm_up_background(self, paths)
+        else:
+            table.warm_up(self, paths)
+        return table
+    
+    def _lookup(self, image):
+        """Predicción precalculada de una ruta, o None."""
+        if self.prediction_table is None or not isinstance(image, str):
+            return None
+        return self.prediction_table.lookup(image)
+    
+    def prepare(self):
+        """
+        Deja el modelo listo para inferencia: lo carga si hace falta, lo pone
+        en modo evaluación y crea su motor de ejecución (una sola vez).
         
-        self.model.eval()
+        Returns:
+            Motor de ejecución: tensor (n, 3, IMAGE_SIZE, IMAGE_SIZE) -> probabilidades (n, NUM_CLASSES)
+        """
+        self._ensure_model()
+        return self.runtime
+    
+    def _ensure_model(self):
+        """Carga el modelo si hace falta y lo deja en modo evaluación con su motor (una sola vez)."""
+        model, runtime = self.model, self.runtime
+        if model is not None and runtime is not None and not model.training:
+            return  # Camino rápido de cada predicción, sin cerrojo
+        with self._model_lock:
+            if self.model is None:
+                self.load_model()
+            if self.model.training:
+                self.model.eval()
+                self.runtime = None
+            if self.runtime is None:
+                self.runtime = self._create_runtime()
+    
+    def _create_runtime(self):
+        """Motor de ejecución configurado; si no se puede crear, PyTorch normal."""
+        if self.inference_backend == 'eager':
+            return EagerBackend(self.model, self.device)
+        if not self.loaded_from_file:
+            Logger.log(f"El motor '{self.inference_backend}' necesita un modelo guardado; se usa 'eager'", "WARNING")
+            return EagerBackend(self.model, self.device)
+        try:
+            runtime = create_backend(self.inference_backend, self.model, self.model_path, self.device)
+            Logger.log(f"Motor de inferencia: {self.inference_backend}")
+            return runtime
+        except Exception as e:
+            Logger.log(f"Error creando el motor '{self.inference_backend}': {e}; se usa 'eager'", "ERROR")
+            return EagerBackend(self.model, self.device)
+    
+    def export(self, backend, path=None):
+        """
+        Exporta el modelo a TorchScript u ONNX.
         
-        # Cargar imagen si es una ruta
+        Args:
+            backend: 'torchscript' u 'onnx'
+            path: Ruta de salida (por defecto junto al checkpoint)
+            
+        Returns:
+            Ruta del modelo exportado
+        """
+        with self._model_lock:
+            self._ensure_model()
+            return export_model(self.model, self.model_path, backend, self.device, path)
+    
+    def _load_tensor(self, image):
+        """
+        Decodifica y preprocesa una imagen (se ejecuta en los hilos de decodificación).
+        
+        Returns:
+            Tensor (3, IMAGE_SIZE, IMAGE_SIZE), o None si no se pudo cargar
+        """
         if isinstance(image, str):
             try:
                 image = Image.open(image).convert('RGB')
-            except:
-                Logger.log("Error cargando imagen para predicción", "ERROR")
-                return "unknown", 0.0
+            except Exception:
+                Logger.log(f"Error cargando imagen para predicción: {image}", "ERROR")
+                return None
+        elif not isinstance(image, Image.Image):
+            image = Image.fromarray(np.asarray(image, dtype=np.uint8))
+        return self.transform(image)
+    
+    def preprocess(self, images):
+        """
+        Decodifica y preprocesa varias imágenes en paralelo (PIL libera el GIL al decodificar).
         
-        # Preprocesar
-        if not isinstance(image, Image.Image):
-            image = Image.fromarray(image)
+        Args:
+            images: Lista de rutas, PIL Images o arreglos (alto, ancho, 3) uint8
+            
+        Returns:
+            Lista de tensores (3, IMAGE_SIZE, IMAGE_SIZE), con None en las que no se pudieron cargar
+        """
+        if len(images) < 2 or PREDICT_DECODE_WORKERS < 2:
+            return [self._load_tensor(image) for image in images]
+        if self._decoder is None:
+            self._decoder = ThreadPoolExecutor(PREDICT_DECODE_WORKERS, thread_name_prefix="decode")
+        return list(self._decoder.map(self._load_tensor, images))
+    
+    def predict_arrays(self, images, batch_size=PREDICT_BATCH_SIZE):
+        """
+        Clasifica varias imágenes y devuelve los resultados vectorizados.
         
-        image_tensor = self.transform(image).unsqueeze(0).to(self.device)
+        Las imágenes se decodifican en paralelo, se apilan y se pasan por el
+        modelo en trozos de `batch_size` bajo torch.inference_mode(), con una
+        sola copia a CPU por trozo.
         
-        # Predicción
-        with torch.no_grad():
-            outputs = self.model.predict_proba(image_tensor)
-            probabilities = outputs.cpu().numpy()[0]
-            predicted_class = np.argmax(probabilities)
-            confidence = probabilities[predicted_class]
+        Args:
+            images: Lista de rutas, PIL Images o arreglos (alto, ancho, 3) uint8
+            batch_size: Imágenes por pasada del modelo
+            
+        Returns:
+            Tupla (clases, confianzas, válidas): índices de clase int64,
+            confianzas float32 y máscara de las imágenes que se pudieron cargar
+        """
+        self._ensure_model()
+        count = len(images)
+        classes = np.zeros(count, dtype=np.int64)
+        confidences = np.zeros(count, dtype=np.float32)
+        valid = np.zeros(count, dtype=bool)
+        
+        tensors = self.preprocess(images)
+        indices = [i for i, tensor in enumerate(tensors) if tensor is not None]
+        valid[indices] = True
+        with torch.inference_mode():
+            for start in range(0, len(indices), batch_size):
+                chunk = indices[start:start + batch_size]
+                batch = torch.stack([tensors[i] for i in chunk]).to(self.device)
+                best, predicted = self.runtime(batch).max(dim=1)
+                classes[chunk] = predicted.cpu().numpy()
+                confidences[chunk] = best.cpu().numpy()
+        return classes, confidences, valid
+    
+    def predict(self, image):
+        """
+        Predice la clase de una imagen (usa el mismo camino que predict_batch).
         
-        class_names = ['flor', 'objeto']
-        predicted_label = class_names[predicted_class]
+        Args:
+            image: Ruta, PIL Image o arreglo (alto, ancho, 3) uint8
+            
+        Returns:
+            Tupla (class_name, probability)
+        """
+        return self.predict_batch([image])[0]
+    
+    def predict_batch(self, images, batch_size=PREDICT_BATCH_SIZE, use_table=True):
+        """
+        Predice la clase de varias imágenes con pasadas por lotes del modelo.
         
-        return predicted_label, float(confidence)
+        Args:
+            images: Lista de rutas, PIL Images o arreglos (alto, ancho, 3) uint8
+            batch_size: Imágenes por pasada del modelo
+            use_table: Si es False ignora la tabla de predicciones precalculadas
+            
+        Returns:
+            Lista de tuplas (class_name, probability), en el mismo orden.
+            Las imágenes que no se pueden cargar dan ("unknown", 0.0).
+        """
+        class_names = ['flor', 'objeto']
+        results = [("unknown", 0.0)] * len(images)
+        
+        # Primero la tabla de predicciones; el modelo solo ve las que falten
+        pending = []
+        for i, image in enumerate(images):
+            cached = self._lookup(image) if use_table else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+        if not pending:
+            return results
+        
+        classes, confidences, valid = self.predict_arrays([images[i] for i in pending], batch_size)
+        for i, predicted_class, confidence, ok in zip(pending, classes, confidences, valid):
+            if ok:
+                results[i] = (class_names[predicted_class], float(confidence))
+        return results
     
     def evaluate(self, test_dir):
         """
@@ -310,8 +692,8 @@ class FlowerClassifier:
         if self.model is None:
             self.load_model()
         
-        dataset = FlowerDataset(test_dir, transform=self.transform, apply_augmentation=False)
-        dataloader = DataLoader(dataset, batch_size=BATCH_SIZE, shuffle=False, num_workers=0)
+        dataset = FlowerDataset(test_dir, transform=self.transform, apply_augmentation=False, use_shard=DATASET_SHARDS)
+        dataloader = make_loader(dataset, BATCH_SIZE, shuffle=False)
         
         self.model.eval()
         correct = 0
@@ -319,8 +701,8 @@ class FlowerClassifier:
         
         with torch.no_grad():
             for images, labels in dataloader:
-                images = images.to(self.device)
-                labels = labels.to(self.device)
+                images = images.to(self.device, non_blocking=True)
+                labels = labels.to(self.device, non_blocking=True)
                 
                 outputs = self.model(images)
                 _, predicted = torch.max(outputs.data, 1)
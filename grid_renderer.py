@@ -0,0 +1,402 @@
+"""
+Clase GridRenderer - Capa de presentación de Pygame para un GridWorld.
+Usa los sprites del atlas compartido (SpriteAtlas) y contiene la capa
+estática cacheada, el redibujado por celdas sucias, el minimapa y los
+overlays de búsqueda. GridWorld no depende de Pygame: el renderer se crea
+solo cuando se dibuja el mundo por primera vez.
+"""
+import math
+import threading
+import numpy as np
+import pygame
+from config import *
+from overlay_renderer import OverlayRenderer
+from sprite_atlas import get_sprite_atlas
+
+
+# Color de cada tipo de celda en el minimapa (índice = CELL_*)
+MINIMAP_COLORS = np.array([
+    COLOR_WHITE,       # CELL_EMPTY
+    (139, 69, 19),     # CELL_OBSTACLE (marrón, igual que el sprite de respaldo)
+    (255, 105, 180),   # CELL_FLOWER
+    COLOR_BLUE,        # CELL_OBJECT
+    COLOR_WHITE,       # CELL_BEE (la abeja se dibuja aparte)
+    COLOR_ORANGE,      # CELL_HIVE
+], dtype=np.uint8)
+
+
+class GridRenderer:
+    """
+    Dibuja un GridWorld en una superficie de Pygame.
+    Lee el estado del mundo (contenido, abeja y colmena) pero nunca lo modifica.
+    """
+    
+    def __init__(self, grid_world):
+        """
+        Inicializa el renderer.
+        
+        Args:
+            grid_world: Instancia de GridWorld a dibujar
+        """
+        self.world = grid_world
+        
+        # Sprites compartidos entre mundos (se cargan en el primer render)
+        self.atlas = get_sprite_atlas()
+        
+        # Caché de renderizado: capa estática pre-renderizada y celdas sucias
+        self._static_layer = None
+        self._static_key = None
+        self._static_camera = None
+        self._render_state = None
+        self._render_camera = None
+        self._dirty_cells = set()
+        self._minimap = None
+        self._minimap_hive_pos = None
+        
+        # Overlays de búsqueda (explorados y camino) en matrices NumPy
+        self.overlay = OverlayRenderer(grid_world.size)
+        self.overlay.reset(walkable_count=grid_world.walkable_count)
+        
+        # Los cambios de obstáculos y contenido llegan como notificaciones del mundo
+        # (a veces desde el hilo de la animación): se encolan y se aplican al
+        # empezar render(), en el hilo que dibuja. La abeja se sigue por
+        # comparación en cada frame
+        self._changes_lock = threading.Lock()
+        self._pending_cells = []
+        self._pending_reset = False
+        grid_world.subscribe(self._on_world_change, (STRUCTURE_CHANGE, CONTENT_CHANGE))
+    
+    def invalidate(self, reset_overlay=False):
+        """
+        Descarta la capa estática y fuerza un redibujado completo en el próximo frame.
+        
+        Args:
+            reset_overlay: Si es True también se limpian los overlays (mundo nuevo)
+        """
+        if reset_overlay:
+            self.overlay.reset(walkable_count=self.world.walkable_count)
+        self._static_layer = None
+        self._render_state = None
+        self._dirty_cells = set()
+        self._minimap = None
+    
+    def mark_dirty_area(self, rect):
+        """
+        Marca como sucias las celdas que intersectan un rectángulo de pantalla.
+        Útil cuando se dibuja algo encima del mundo (p. ej. texto informativo).
+        
+        Args:
+            rect: pygame.Rect en coordenadas de pantalla
+        """
+        camera = self._render_camera
+        if camera is None:
+            first_row, first_col = rect.top // CELL_SIZE, rect.left // CELL_SIZE
+            last_row, last_col = (rect.bottom - 1) // CELL_SIZE, (rect.right - 1) // CELL_SIZE
+        else:
+            first_row, first_col = camera.screen_to_cell(rect.left, rect.top)
+            last_row, last_col = camera.screen_to_cell(rect.right - 1, rect.bottom - 1)
+        
+        for i in range(max(first_row, 0), min(last_row, self.world.size - 1) + 1):
+            for j in range(max(first_col, 0), min(last_col, self.world.size - 1) + 1):
+                self._dirty_cells.add((i, j))
+    
+    def _on_world_change(self, kind, positions, version):
+        """
+        Suscriptor de GridWorld: mundo regenerado o celdas cambiadas por eventos.
+        Solo encola el cambio; las superficies se tocan en _apply_world_changes.
+        """
+        with self._changes_lock:
+            if positions is None:
+                self._pending_reset = True
+                self._pending_cells = []
+            elif not self._pending_reset:
+                self._pending_cells.extend(positions)
+    
+    def _apply_world_changes(self):
+        """Aplica, en el hilo que dibuja, los cambios del mundo encolados desde el último frame."""
+        with self._changes_lock:
+            reset, positions = self._pending_reset, self._pending_cells
+            self._pending_reset, self._pending_cells = False, []
+        if reset:
+            self.invalidate(reset_overlay=True)
+        elif positions:
+            self.update_cells(positions)
+    
+    def update_cells(self, positions):
+        """
+        El contenido de estas celdas cambió (eventos del mundo): se repintan en
+        la capa estática y en el minimapa, y se marcan como sucias, sin
+        reconstruir nada completo. Debe llamarse desde el hilo que dibuja
+        (render() aplica así los cambios notificados por el mundo).
+        
+        Args:
+            positions: Lista de posiciones (fila, columna)
+        """
+        if not positions:
+            return
+        
+        if self._static_layer is not None:
+            camera = self._static_camera
+            sprites = self.sprites if camera is None else self._sprites_for(camera.cell_px)
+            layer_rect = self._static_layer.get_rect()
+            for pos in self._cells_in_range(positions, self._visible_range(camera)):
+                rect = self._cell_rect(pos, camera)
+                self._static_layer.fill((0, 0, 0, 0), rect.clip(layer_rect))
+                sprite = self._content_sprite(pos, self._static_cell_type(pos), sprites)
+                if sprite is not None:
+                    self._static_layer.blit(sprite, rect.topleft)
+                pygame.draw.rect(self._static_layer, COLOR_BLACK, rect, 1)
+        
+        if self._minimap is not None:
+            rows, cols = np.asarray(positions, dtype=np.intp).reshape(-1, 2).T
+            pixels = pygame.surfarray.pixels3d(self._minimap)
+            pixels[cols, rows] = MINIMAP_COLORS[self.world.content[rows, cols]]
+            del pixels
+        
+        self._dirty_cells.update(positions)
+    
+    def _static_cell_type(self, position):
+        """Contenido estático de una celda, ignorando la abeja."""
+        return int(self.world.content[position])
+    
+    @property
+    def sprites(self):
+        """Sprites al tamaño base de celda."""
+        return self.atlas.sprites_for(CELL_SIZE)
+    
+    def _sprites_for(self, cell_px):
+        """Sprites escalados al tamaño de celda indicado (ver SpriteAtlas)."""
+        return self.atlas.sprites_for(cell_px)
+    
+    def _content_sprite(self, position, cell_type, sprites):
+        """Retorna el sprite que corresponde al contenido de una celda (o None)."""
+        if cell_type == CELL_OBSTACLE:
+            return sprites['tree']
+        if cell_type == CELL_FLOWER:
+            return sprites['flower']
+        if cell_type == CELL_OBJECT:
+            return sprites['object']
+        if cell_type == CELL_HIVE and position == self.world.hive_pos:
+            return sprites['hive']
+        return None
+    
+    def _cell_rect(self, position, camera):
+        """Rectángulo de pantalla de una celda, con o sin cámara."""
+        if camera is None:
+            return pygame.Rect(position[1] * CELL_SIZE, position[0] * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+        x, y = camera.cell_to_screen(position)
+        return pygame.Rect(x, y, camera.cell_px, camera.cell_px)
+    
+    def _visible_range(self, camera):
+        """Rango (fila_inicio, fila_fin, col_inicio, col_fin) de celdas a dibujar."""
+        if camera is None:
+            return 0, self.world.size, 0, self.world.size
+        return camera.visible_range()
+    
+    @staticmethod
+    def _cells_in_range(cells, visible):
+        """Filtra las posiciones que caen dentro del rango visible."""
+        first_row, last_row, first_col, last_col = visible
+        return [
+            pos for pos in cells
+            if pos is not None and first_row <= pos[0] < last_row and first_col <= pos[1] < last_col
+        ]
+    
+    def _build_static_layer(self, camera):
+        """
+        Pre-renderiza obstáculos, flores, objetos, colmena y líneas de la cuadrícula
+        en una superficie transparente que se reutiliza entre frames.
+        
+        Sin cámara la capa cubre el mundo completo; con cámara cubre solo la
+        ventana y se reconstruye cuando la cámara se mueve, recorriendo
+        únicamente las celdas visibles.
+        """
+        if camera is None:
+            layer_size = (self.world.size * CELL_SIZE, self.world.size * CELL_SIZE)
+            sprites = self.sprites
+        else:
+            layer_size = (camera.viewport_width, camera.viewport_height)
+            sprites = self._sprites_for(camera.cell_px)
+        layer = pygame.Surface(layer_size, pygame.SRCALPHA)
+        
+        first_row, last_row, first_col, last_col = self._visible_range(camera)
+        blit_sequence = []
+        for i in range(first_row, last_row):
+            for j in range(first_col, last_col):
+                pos = (i, j)
+                sprite = self._content_sprite(pos, self._static_cell_type(pos), sprites)
+                if sprite is not None:
+                    blit_sequence.append((sprite, self._cell_rect(pos, camera).topleft))
+        layer.blits(blit_sequence, doreturn=False)
+        
+        # Bordes de celda: dos líneas por fila/columna visible en lugar de un rect por celda
+        if last_row > first_row and last_col > first_col:
+            top_left = self._cell_rect((first_row, first_col), camera)
+            bottom_right = self._cell_rect((last_row - 1, last_col - 1), camera)
+            cell_px = top_left.width
+            for i in range(first_row, last_row):
+                y = self._cell_rect((i, first_col), camera).top
+                for line_y in (y, y + cell_px - 1):
+                    pygame.draw.line(layer, COLOR_BLACK, (top_left.left, line_y), (bottom_right.right - 1, line_y))
+            for j in range(first_col, last_col):
+                x = self._cell_rect((first_row, j), camera).left
+                for line_x in (x, x + cell_px - 1):
+                    pygame.draw.line(layer, COLOR_BLACK, (line_x, top_left.top), (line_x, bottom_right.bottom - 1))
+        
+        self._static_layer = layer
+        self._static_camera = camera
+    
+    def _draw_cell(self, screen, position, camera):
+        """
+        Redibuja una sola celda (fondo, overlay, contenido, borde y abeja).
+        
+        Returns:
+            pygame.Rect de la celda redibujada
+        """
+        rect = self._cell_rect(position, camera)
+        # Recortar a la vista: Surface.fill no recorta bien rectángulos con origen negativo
+        area = rect.clip(self._static_layer.get_rect())
+        screen.fill(COLOR_WHITE, area)
+        
+        if position != self.world.bee_pos:
+            overlay_color = self.overlay.cell_color(position)
+            if overlay_color is not None:
+                screen.fill(overlay_color, area)
+            screen.blit(self._static_layer, area, area=area)
+        else:
+            # La abeja oculta el contenido de la celda salvo en la colmena
+            if self.world.get_cell_type(position) == CELL_BEE:
+                pygame.draw.rect(screen, COLOR_BLACK, rect, 1)
+            else:
+                screen.blit(self._static_layer, area, area=area)
+            sprites = self.sprites if camera is None else self._sprites_for(camera.cell_px)
+            screen.blit(sprites['bee'], rect.topleft)
+        
+        return area
+    
+    def _blit_cells(self, screen, surface, camera, visible):
+        """
+        Escala una superficie de 1 píxel por celda (región visible) al tamaño
+        de las celdas en pantalla y la dibuja en su posición.
+        """
+        first_row, last_row, first_col, last_col = visible
+        cell_px = CELL_SIZE if camera is None else camera.cell_px
+        scaled_size = (
+            int(math.ceil((last_col - first_col) * cell_px)),
+            int(math.ceil((last_row - first_row) * cell_px))
+        )
+        scaled = pygame.transform.scale(surface, scaled_size)
+        scaled.set_colorkey(surface.get_colorkey())
+        
+        if camera is None:
+            screen.blit(scaled, (first_col * CELL_SIZE, first_row * CELL_SIZE))
+        else:
+            screen.blit(scaled, camera.cell_to_screen((first_row, first_col)))
+    
+    def _build_minimap(self):
+        """Construye el minimapa (1 píxel por celda) a partir de la matriz de celdas."""
+        cells = self.world.content.copy()
+        
+        # La colmena solo se dibuja en hive_pos (la abeja va aparte)
+        cells[cells == CELL_HIVE] = CELL_EMPTY
+        if self.world.hive_pos and self.world.content[self.world.hive_pos] == CELL_HIVE:
+            cells[self.world.hive_pos] = CELL_HIVE
+        
+        # surfarray indexa (x, y) = (columna, fila); las celdas vacías son
+        # transparentes para dejar ver el overlay de búsqueda
+        colors = MINIMAP_COLORS[cells]
+        self._minimap = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+        self._minimap.set_colorkey(COLOR_WHITE)
+        self._minimap_hive_pos = self.world.hive_pos
+    
+    def _render_minimap(self, screen, camera):
+        """
+        Dibuja el mundo como minimapa escalado (nivel de detalle bajo).
+        El costo depende del tamaño de la ventana, no del número de celdas.
+        """
+        if self._minimap is None or self._minimap_hive_pos != self.world.hive_pos:
+            self._build_minimap()
+        
+        viewport = pygame.Rect(0, 0, camera.viewport_width, camera.viewport_height)
+        screen.fill(COLOR_WHITE, viewport)
+        
+        first_row, last_row, first_col, last_col = visible = camera.visible_range()
+        if last_row > first_row and last_col > first_col:
+            if not self.overlay.is_empty:
+                self._blit_cells(screen, self.overlay.surface(visible), camera, visible)
+            region = self._minimap.subsurface(
+                (first_col, first_row, last_col - first_col, last_row - first_row)
+            )
+            self._blit_cells(screen, region, camera, visible)
+        
+        if self.world.bee_pos:
+            half = camera.cell_px / 2
+            x, y = camera.cell_to_screen(self.world.bee_pos)
+            marker = max(4, int(camera.cell_px))
+            marker_rect = pygame.Rect(x + half - marker // 2, y + half - marker // 2, marker, marker)
+            screen.fill(COLOR_YELLOW, marker_rect.clip(viewport))
+        
+        return [viewport]
+    
+    def render(self, screen, path=None, explored=None, camera=None):
+        """
+        Renderiza el mundo en la pantalla de Pygame.
+        
+        El fondo estático (sprites y cuadrícula) se pre-renderiza una sola vez y
+        en cada frame solo se redibujan las celdas cuyo overlay (abeja, camino o
+        nodos explorados) cambió desde el frame anterior. Con cámara solo se
+        recorren las celdas visibles, y con zoom muy bajo se dibuja un minimapa.
+        Los overlays se colorean de forma vectorizada (ver OverlayRenderer).
+        
+        Args:
+            screen: Superficie de Pygame donde renderizar
+            path: Lista de posiciones que representan el camino (opcional)
+            explored: Posiciones exploradas; si es una lista en orden de
+                expansión solo se procesan las nuevas (opcional)
+            camera: Instancia de Camera (opcional). Sin cámara se dibuja el mundo completo.
+            
+        Returns:
+            Lista de pygame.Rect modificados, para pasar a pygame.display.update()
+        """
+        self._apply_world_changes()
+        self._render_camera = camera
+        changed = self.overlay.sync(path, explored, self.world.hive_pos)
+        
+        if camera is not None and camera.use_minimap:
+            # Al volver al modo sprites hará falta un redibujado completo
+            self._render_state = None
+            self._dirty_cells = set()
+            return self._render_minimap(screen, camera)
+        
+        static_key = (id(camera), camera.version if camera else None, self.world.hive_pos)
+        if self._static_layer is None or self._static_key != static_key:
+            self._build_static_layer(camera)
+            self._static_key = static_key
+            self._render_state = None
+        
+        visible = self._visible_range(camera)
+        state = self._render_state
+        if state is None:
+            # Redibujado completo: fondo, overlay escalado, capa estática y abeja
+            view_rect = self._static_layer.get_rect()
+            screen.fill(COLOR_WHITE, view_rect)
+            first_row, last_row, first_col, last_col = visible
+            if not self.overlay.is_empty and last_row > first_row and last_col > first_col:
+                self._blit_cells(screen, self.overlay.surface(visible), camera, visible)
+            screen.blit(self._static_layer, (0, 0))
+            for pos in self._cells_in_range([self.world.bee_pos], visible):
+                self._draw_cell(screen, pos, camera)
+            
+            dirty_rects = [view_rect]
+        else:
+            dirty = self._dirty_cells
+            dirty.update(changed)
+            if state['bee_pos'] != self.world.bee_pos:
+                dirty.add(state['bee_pos'])
+                dirty.add(self.world.bee_pos)
+            
+            dirty_rects = [self._draw_cell(screen, pos, camera) for pos in self._cells_in_range(dirty, visible)]
+        
+        self._dirty_cells = set()
+        self._render_state = {'bee_pos': self.world.bee_pos}
+        return dirty_rects
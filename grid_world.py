@@ -1,17 +1,24 @@
 """
 Clase GridWorld - Representa el mundo cuadriculado del simulador.
 Maneja la generación aleatoria del mundo, obstáculos, flores y objetos.
+
+El mundo es lógica pura (NumPy, sin Pygame) para poder ejecutar simulaciones
+sin pantalla; el dibujo vive en GridRenderer y se importa solo al renderizar.
 """
 import random
-import pygame
+from collections import deque
+import numpy as np
 from config import *
-from utils import Logger, load_random_object_sprite
+from component_index import ComponentIndex
+from spatial_index import GridBucketIndex
+from utils import Logger
 
 
 class GridWorld:
     """
     Clase que representa el mundo cuadriculado donde se mueve la abeja.
-    Maneja la generación de obstáculos, flores, objetos y renderizado.
+    Maneja la generación de obstáculos, flores y objetos; el renderizado se
+    delega a un GridRenderer creado bajo demanda.
     """
     
     def __init__(self, size=GRID_SIZE):
@@ -22,7 +29,6 @@ class GridWorld:
             size: Tamaño de la cuadrícula (NxN)
         """
         self.size = size
-        self.grid = {}  # Diccionario para almacenar el estado de cada celda
         self.bee_pos = None
         self.hive_pos = None
         
@@ -31,51 +37,32 @@ class GridWorld:
         self.objects = []
         self.obstacles = []
         
-        # Sprites
-        self.sprites = {}
-        self.load_sprites()
+        # Capa de contenido (independiente de la abeja) e índices espaciales
+        self.content = np.zeros((size, size), dtype=np.uint8)
+        self.flower_index = GridBucketIndex(SPATIAL_BUCKET_SIZE)
+        self.object_index = GridBucketIndex(SPATIAL_BUCKET_SIZE)
+        self._slots = {}  # Posición -> índice en su lista (flowers/objects/obstacles)
+        
+        # Contadores de generación (ver notify): `version` cuenta todos los cambios
+        # y cada tipo de cambio tiene el suyo, para que las cachés que solo dependen
+        # de los obstáculos no se invaliden cada vez que la abeja se mueve
+        self.version = 0
+        self.structure_version = 0  # Obstáculos (transitabilidad) o mundo regenerado
+        self.content_version = 0    # Flores y objetos
+        self.overlay_version = 0    # Posición de la abeja
+        self._subscribers = []      # (callback, tipos)
+        self._walkability_log = deque(maxlen=WORLD_EVENT_LOG_SIZE)  # (structure_version, celdas)
+        self._log_start = 0
+        
+        # Componentes conexas de celdas transitables (se calculan bajo demanda)
+        self.components = ComponentIndex(size)
+        self._components_ready = False
+        
+        # Renderer de Pygame (se crea al dibujar por primera vez)
+        self._renderer = None
         
         Logger.log(f"GridWorld inicializado con tamaño {size}x{size}")
     
-    def load_sprites(self):
-        """Carga todos los sprites necesarios para el mundo."""
-        try:
-            # Cargar y escalar sprites principales
-            self.sprites['bee'] = pygame.transform.scale(
-                pygame.image.load(SPRITE_BEE), (CELL_SIZE, CELL_SIZE)
-            )
-            self.sprites['hive'] = pygame.transform.scale(
-                pygame.image.load(SPRITE_HIVE), (CELL_SIZE, CELL_SIZE)
-            )
-            self.sprites['tree'] = pygame.transform.scale(
-                pygame.image.load(SPRITE_TREE), (CELL_SIZE, CELL_SIZE)
-            )
-            self.sprites['flower'] = pygame.transform.scale(
-                pygame.image.load(SPRITE_FLOWER), (CELL_SIZE, CELL_SIZE)
-            )
-            self.sprites['object'] = pygame.transform.scale(
-                pygame.image.load(SPRITE_OBJECT), (CELL_SIZE, CELL_SIZE)
-            )
-            
-            Logger.log("Sprites cargados exitosamente")
-        except Exception as e:
-            Logger.log(f"Error cargando sprites: {e}", "ERROR")
-            # Crear sprites de respaldo (rectángulos de colores)
-            self.create_fallback_sprites()
-    
-    def create_fallback_sprites(self):
-        """Crea sprites de respaldo si no se pueden cargar las imágenes."""
-        for sprite_name, color in [
-            ('bee', COLOR_YELLOW),
-            ('hive', COLOR_ORANGE),
-            ('tree', (139, 69, 19)),  # Marrón
-            ('flower', (255, 105, 180)),  # Rosa
-            ('object', COLOR_BLUE)  # Azul para objetos
-        ]:
-            surface = pygame.Surface((CELL_SIZE, CELL_SIZE))
-            surface.fill(color)
-            self.sprites[sprite_name] = surface
-    
     def initialize_world(self, bee_pos=None, hive_pos=None):
         """
         Inicializa el mundo con posiciones aleatorias de elementos.
@@ -85,22 +72,19 @@ class GridWorld:
             hive_pos: Posición de la colmena (x, y). Si es None, se genera aleatoriamente.
         """
         # Limpiar el mundo
-        self.grid = {}
         self.flowers = []
         self.objects = []
         self.obstacles = []
-        
-        # Inicializar todas las celdas como vacías
-        for i in range(self.size):
-            for j in range(self.size):
-                self.grid[(i, j)] = CELL_EMPTY
+        self.content.fill(CELL_EMPTY)
+        self.flower_index.clear()
+        self.object_index.clear()
+        self._slots = {}
         
         # Establecer posición de la abeja
         if bee_pos is None:
             self.bee_pos = (random.randint(0, self.size-1), random.randint(0, self.size-1))
         else:
             self.bee_pos = bee_pos
-        self.grid[self.bee_pos] = CELL_BEE
         
         # Establecer posición de la colmena (asegurándose de que no sea la misma que la abeja)
         if hive_pos is None:
@@ -110,7 +94,7 @@ class GridWorld:
                     break
         else:
             self.hive_pos = hive_pos
-        self.grid[self.hive_pos] = CELL_HIVE
+        self.content[self.hive_pos] = CELL_HIVE
         
         # Generar obstáculos
         num_obstacles = int(self.size * self.size * OBSTACLE_PERCENTAGE)
@@ -124,6 +108,12 @@ class GridWorld:
         num_objects = int(self.size * self.size * OBJECT_PERCENTAGE)
         self.generate_objects(num_objects)
         
+        # Los cambios anteriores dejan de aplicar: todas las cachés se invalidan
+        self._walkability_log.clear()
+        self._components_ready = False
+        self.notify(STRUCTURE_CHANGE, None)
+        self._log_start = self.structure_version
+        
         Logger.log(f"Mundo generado: {num_obstacles} obstáculos, {num_flowers} flores, {num_objects} objetos")
         Logger.log(f"Abeja en {self.bee_pos}, Colmena en {self.hive_pos}")
     
@@ -139,9 +129,9 @@ class GridWorld:
             pos = (x, y)
             
             # No colocar obstáculos donde ya hay algo importante
-            if self.grid[pos] == CELL_EMPTY:
-                self.grid[pos] = CELL_OBSTACLE
-                self.obstacles.append(pos)
+            if self.content[pos] == CELL_EMPTY and pos != self.bee_pos:
+                self.content[pos] = CELL_OBSTACLE
+                self._track(pos, CELL_OBSTACLE)
                 placed += 1
             
             attempts += 1
@@ -158,9 +148,9 @@ class GridWorld:
             pos = (x, y)
             
             # Solo colocar en celdas vacías
-            if self.grid[pos] == CELL_EMPTY:
-                self.grid[pos] = CELL_FLOWER
-                self.flowers.append(pos)
+            if self.content[pos] == CELL_EMPTY and pos != self.bee_pos:
+                self.content[pos] = CELL_FLOWER
+                self._track(pos, CELL_FLOWER)
                 placed += 1
             
             attempts += 1
@@ -177,13 +167,184 @@ class GridWorld:
             pos = (x, y)
             
             # Solo colocar en celdas vacías
-            if self.grid[pos] == CELL_EMPTY:
-                self.grid[pos] = CELL_OBJECT
-                self.objects.append(pos)
+            if self.content[pos] == CELL_EMPTY and pos != self.bee_pos:
+                self.content[pos] = CELL_OBJECT
+                self._track(pos, CELL_OBJECT)
                 placed += 1
             
             attempts += 1
     
+    def _tracked(self, cell_type):
+        """Lista e índice espacial (o None) donde se registra un tipo de celda."""
+        if cell_type == CELL_OBSTACLE:
+            return self.obstacles, None
+        if cell_type == CELL_FLOWER:
+            return self.flowers, self.flower_index
+        if cell_type == CELL_OBJECT:
+            return self.objects, self.object_index
+        return None, None
+    
+    def _track(self, position, cell_type):
+        """Registra una celda en la lista e índice de su tipo."""
+        items, index = self._tracked(cell_type)
+        if items is None:
+            return
+        self._slots[position] = len(items)
+        items.append(position)
+        if index is not None:
+            index.add(position)
+    
+    def _untrack(self, position, cell_type):
+        """Quita una celda de la lista e índice de su tipo en O(1) (intercambio con el último)."""
+        items, index = self._tracked(cell_type)
+        if items is None:
+            return
+        slot = self._slots.pop(position)
+        last = items.pop()
+        if last != position:
+            items[slot] = last
+            self._slots[last] = slot
+        if index is not None:
+            index.remove(position)
+    
+    def apply_events(self, events):
+        """
+        Aplica un lote de cambios de celdas (ver world_events.CellEvent) en O(cambios).
+        
+        Actualiza la matriz de celdas, las listas e índices espaciales, las
+        componentes conexas y las celdas sucias del renderer, e incrementa la
+        versión del mundo si algo cambió. No se permite mover la colmena ni
+        poner un obstáculo sobre la abeja.
+        
+        Args:
+            events: Iterable de CellEvent (position, cell_type)
+            
+        Returns:
+            Lista de posiciones que cambiaron
+        """
+        changed = []
+        walkability_changed = []
+        
+        for position, cell_type in events:
+            x, y = position
+            if not (0 <= x < self.size and 0 <= y < self.size):
+                Logger.log(f"Evento fuera del mundo ignorado: {position}", "WARNING")
+                continue
+            old_type = int(self.content[x, y])
+            if old_type == cell_type:
+                continue
+            if CELL_HIVE in (old_type, cell_type) or cell_type == CELL_BEE:
+                Logger.log(f"Evento no permitido en {position}: {old_type} -> {cell_type}", "WARNING")
+                continue
+            if cell_type == CELL_OBSTACLE and position == self.bee_pos:
+                Logger.log(f"No se puede colocar un obstáculo sobre la abeja en {position}", "WARNING")
+                continue
+            
+            self._untrack(position, old_type)
+            self.content[x, y] = cell_type
+            self._track(position, cell_type)
+            
+            if (old_type == CELL_OBSTACLE) != (cell_type == CELL_OBSTACLE):
+                walkability_changed.append(position)
+                if self._components_ready:
+                    if cell_type == CELL_OBSTACLE:
+                        self.components.close_cell(position)
+                    else:
+                        self.components.open_cell(position)
+            changed.append(position)
+        
+        if walkability_changed:
+            self.notify(STRUCTURE_CHANGE, changed)
+            if len(self._walkability_log) == self._walkability_log.maxlen:
+                self._log_start = self._walkability_log[0][0]
+            self._walkability_log.append((self.structure_version, walkability_changed))
+        elif changed:
+            self.notify(CONTENT_CHANGE, changed)
+        return changed
+    
+    def subscribe(self, callback, kinds=None):
+        """
+        Registra una función que se llama tras cada cambio del mundo.
+        
+        La función recibe (kind, positions, version): el tipo de cambio
+        (STRUCTURE_CHANGE, CONTENT_CHANGE u OVERLAY_CHANGE), la lista de
+        posiciones afectadas (None si cambió todo el mundo) y el contador de
+        ese tipo tras el cambio.
+        
+        Args:
+            callback: Función a llamar
+            kinds: Tipos de cambio que interesan (por defecto todos)
+            
+        Returns:
+            El mismo callback, para poder pasarlo a unsubscribe()
+        """
+        self._subscribers.append((callback, frozenset(kinds) if kinds else None))
+        return callback
+    
+    def unsubscribe(self, callback):
+        """Deja de notificar a una función registrada con subscribe()."""
+        self._subscribers = [(cb, kinds) for cb, kinds in self._subscribers if cb != callback]
+    
+    def notify(self, kind, positions):
+        """
+        Incrementa los contadores de generación y avisa a los suscriptores.
+        
+        Un cambio estructural también cuenta como cambio de contenido y de
+        overlay (el mundo regenerado invalida todo lo que dependa de él).
+        
+        Args:
+            kind: STRUCTURE_CHANGE, CONTENT_CHANGE u OVERLAY_CHANGE
+            positions: Posiciones afectadas, o None si cambió todo el mundo
+        """
+        self.version += 1
+        if kind == STRUCTURE_CHANGE:
+            self.structure_version += 1
+            self.content_version += 1
+            version = self.structure_version
+        elif kind == CONTENT_CHANGE:
+            self.content_version += 1
+            version = self.content_version
+        else:
+            self.overlay_version += 1
+            version = self.overlay_version
+        
+        for callback, kinds in self._subscribers:
+            if kinds is None or kind in kinds:
+                callback(kind, positions, version)
+    
+    def walkability_changes_since(self, version):
+        """
+        Celdas que pasaron de transitables a obstáculo (o al revés) después de una versión.
+        
+        Args:
+            version: structure_version de referencia
+            
+        Returns:
+            Conjunto de posiciones, o None si el historial no llega tan atrás
+            (mundo regenerado o demasiados lotes desde entonces)
+        """
+        if version < self._log_start:
+            return None
+        changes = set()
+        for entry_version, positions in reversed(self._walkability_log):
+            if entry_version <= version:
+                break
+            changes.update(positions)
+        return changes
+    
+    def is_connected(self, pos1, pos2):
+        """
+        True si existe un camino de celdas transitables entre dos posiciones.
+        La primera consulta etiqueta las componentes; después se mantienen
+        de forma incremental con los eventos.
+        """
+        if not (self.is_walkable(pos1) and self.is_walkable(pos2)):
+            return False
+        if not self._components_ready:
+            self.components.build(self.content != CELL_OBSTACLE)
+            self._components_ready = True
+        return self.components.connected(pos1, pos2)
+    
     def is_walkable(self, position):
         """
         Verifica si una posición es transitable (no es obstáculo y está dentro del grid).
@@ -201,7 +362,7 @@ class GridWorld:
             return False
         
         # Verificar que no sea obstáculo
-        return self.grid.get(position, CELL_EMPTY) != CELL_OBSTACLE
+        return self.content[x, y] != CELL_OBSTACLE
     
     def get_cell_type(self, position):
         """
@@ -211,71 +372,108 @@ class GridWorld:
             position: Tupla (x, y)
             
         Returns:
-            int: Tipo de celda (CELL_EMPTY, CELL_OBSTACLE, etc.)
+            int: Tipo de celda (CELL_EMPTY, CELL_OBSTACLE, etc.). La abeja
+            (CELL_BEE) tapa el contenido de su celda salvo en la colmena.
         """
-        return self.grid.get(position, CELL_EMPTY)
+        x, y = position
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return CELL_EMPTY
+        if position == self.bee_pos and position != self.hive_pos:
+            return CELL_BEE
+        return int(self.content[x, y])
     
-    def render(self, screen, path=None, explored=None):
+    @property
+    def grid(self):
+        """
+        Matriz de celdas (compatibilidad): es la capa de contenido, que ya no
+        se modifica al mover la abeja. Usar get_cell_type() para ver CELL_BEE.
         """
-        Renderiza el mundo en la pantalla de Pygame.
+        return self.content
+    
+    def get_content(self, position):
+        """
+        Obtiene el contenido de una celda sin tener en cuenta a la abeja, en O(1).
         
         Args:
-            screen: Superficie de Pygame donde renderizar
-            path: Lista de posiciones que representan el camino (opcional)
-            explored: Conjunto de posiciones exploradas (opcional)
+            position: Tupla (x, y)
+            
+        Returns:
+            int: Tipo de contenido (CELL_EMPTY, CELL_OBSTACLE, CELL_FLOWER, CELL_OBJECT o CELL_HIVE)
         """
-        # Dibujar fondo
-        screen.fill(COLOR_WHITE)
-        
-        # Dibujar grid
-        for i in range(self.size):
-            for j in range(self.size):
-                pos = (i, j)
-                rect = pygame.Rect(j * CELL_SIZE, i * CELL_SIZE, CELL_SIZE, CELL_SIZE)
-                
-                # Dibujar celdas exploradas
-                if explored and pos in explored and pos != self.bee_pos:
-                    pygame.draw.rect(screen, COLOR_EXPLORED, rect)
-                
-                # Dibujar camino
-                if path and pos in path and pos != self.bee_pos and pos != self.hive_pos:
-                    pygame.draw.rect(screen, COLOR_PATH, rect)
-                
-                # Dibujar contenido de la celda
-                cell_type = self.grid[pos]
-                
-                if cell_type == CELL_OBSTACLE:
-                    screen.blit(self.sprites['tree'], (j * CELL_SIZE, i * CELL_SIZE))
-                elif cell_type == CELL_FLOWER:
-                    screen.blit(self.sprites['flower'], (j * CELL_SIZE, i * CELL_SIZE))
-                elif cell_type == CELL_OBJECT:
-                    screen.blit(self.sprites['object'], (j * CELL_SIZE, i * CELL_SIZE))
-                elif cell_type == CELL_HIVE and pos == self.hive_pos:
-                    screen.blit(self.sprites['hive'], (j * CELL_SIZE, i * CELL_SIZE))
-                
-                # Dibujar bordes de celda
-                pygame.draw.rect(screen, COLOR_BLACK, rect, 1)
-        
-        # Dibujar abeja (siempre encima)
-        if self.bee_pos:
-            bee_x, bee_y = self.bee_pos
-            screen.blit(self.sprites['bee'], (bee_y * CELL_SIZE, bee_x * CELL_SIZE))
+        x, y = position
+        if not (0 <= x < self.size and 0 <= y < self.size):
+            return CELL_EMPTY
+        return int(self.content[x, y])
+    
+    @property
+    def walkable_count(self):
+        """Número de celdas transitables (todas menos los obstáculos)."""
+        return self.size * self.size - len(self.obstacles)
+    
+    def flowers_within_radius(self, position, radius, metric='manhattan'):
+        """
+        Flores a distancia <= radius de una posición, de la más cercana a la más lejana.
+        
+        Args:
+            position: Tupla (x, y)
+            radius: Radio de búsqueda en celdas
+            metric: 'manhattan' o 'euclidean'
+        """
+        return self.flower_index.within_radius(position, radius, metric)
+    
+    def nearest_flowers(self, position, k=1, metric='manhattan'):
+        """Las k flores más cercanas a una posición, ordenadas por distancia."""
+        return self.flower_index.nearest(position, k, metric)
+    
+    def objects_within_radius(self, position, radius, metric='manhattan'):
+        """Objetos a distancia <= radius de una posición, del más cercano al más lejano."""
+        return self.object_index.within_radius(position, radius, metric)
+    
+    def nearest_objects(self, position, k=1, metric='manhattan'):
+        """Los k objetos más cercanos a una posición, ordenados por distancia."""
+        return self.object_index.nearest(position, k, metric)
+    
+    @property
+    def renderer(self):
+        """GridRenderer de Pygame asociado al mundo (se importa y crea bajo demanda)."""
+        if self._renderer is None:
+            from grid_renderer import GridRenderer
+            self._renderer = GridRenderer(self)
+        return self._renderer
+    
+    @property
+    def overlay(self):
+        """Overlays de búsqueda (explorados y camino) del renderer."""
+        return self.renderer.overlay
+    
+    def render(self, screen, path=None, explored=None, camera=None):
+        """
+        Renderiza el mundo en la pantalla de Pygame (ver GridRenderer.render).
+        
+        Returns:
+            Lista de pygame.Rect modificados, para pasar a pygame.display.update()
+        """
+        return self.renderer.render(screen, path, explored, camera)
+    
+    def invalidate_render(self):
+        """Fuerza un redibujado completo en el próximo frame."""
+        if self._renderer is not None:
+            self._renderer.invalidate()
+    
+    def mark_dirty_area(self, rect):
+        """Marca como sucias las celdas bajo un rectángulo de pantalla (ver GridRenderer)."""
+        self.renderer.mark_dirty_area(rect)
     
     def set_bee_position(self, position):
-        """Actualiza la posición de la abeja."""
-        # Limpiar posición anterior
-        if self.bee_pos and self.bee_pos != self.hive_pos:
-            old_type = CELL_EMPTY
-            if self.bee_pos in self.flowers:
-                old_type = CELL_FLOWER
-            elif self.bee_pos in self.objects:
-                old_type = CELL_OBJECT
-            self.grid[self.bee_pos] = old_type
-        
-        # Establecer nueva posición
+        """
+        Actualiza la posición de la abeja. Solo es un cambio de overlay: la
+        matriz de celdas no se modifica, así que las cachés que dependen de
+        los obstáculos o del contenido siguen siendo válidas.
+        """
+        old_position = self.bee_pos
         self.bee_pos = position
-        if position != self.hive_pos:
-            self.grid[position] = CELL_BEE
+        if old_position != position:
+            self.notify(OVERLAY_CHANGE, [pos for pos in (old_position, position) if pos is not None])
     
     def get_neighbors(self, position):
         """
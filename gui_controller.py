@@ -7,6 +7,7 @@ from tkinter import ttk, messagebox, scrolledtext
 from PIL import Image, ImageTk
 import threading
 from config import *
+from simulation_clock import CLOCK_MODES
 from utils import Logger, load_random_flower_photo
 
 
@@ -16,7 +17,8 @@ class ControlPanel:
     Permite configurar parámetros y visualizar resultados.
     """
     
-    def __init__(self, on_start_callback, on_reload_callback, on_position_change_callback):
+    def __init__(self, on_start_callback, on_reload_callback, on_position_change_callback,
+                 on_speed_change_callback=None):
         """
         Inicializa el panel de control.
         
@@ -24,10 +26,12 @@ class ControlPanel:
             on_start_callback: Función a llamar cuando se presiona Start
             on_reload_callback: Función a llamar cuando se presiona Reload
             on_position_change_callback: Función a llamar cuando cambian posiciones
+            on_speed_change_callback: Función a llamar con el nuevo modo del reloj
         """
         self.on_start_callback = on_start_callback
         self.on_reload_callback = on_reload_callback
         self.on_position_change_callback = on_position_change_callback
+        self.on_speed_change_callback = on_speed_change_callback
         
         self.root = None
         self.running = False
@@ -39,6 +43,7 @@ class ControlPanel:
         self.hive_y = None
         self.algorithm = None
         self.mode = None
+        self.speed = None
         
         Logger.log("ControlPanel inicializado")
     
@@ -56,6 +61,7 @@ class ControlPanel:
         self.hive_y = tk.IntVar(value=GRID_SIZE-1)
         self.algorithm = tk.StringVar(value="BFS")
         self.mode = tk.StringVar(value="exploration")
+        self.speed = tk.StringVar(value=CLOCK_MODE)
         
         # Protocolo de cierre
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -151,6 +157,18 @@ class ControlPanel:
         )
         mode_combo.grid(row=1, column=1, sticky=tk.W, pady=5)
         
+        # Velocidad de la simulación (se puede cambiar durante la animación)
+        ttk.Label(algo_frame, text="Velocidad:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        speed_combo = ttk.Combobox(
+            algo_frame,
+            textvariable=self.speed,
+            values=list(CLOCK_MODES),
+            state="readonly",
+            width=15
+        )
+        speed_combo.grid(row=2, column=1, sticky=tk.W, pady=5)
+        speed_combo.bind("<<ComboboxSelected>>", self._on_speed_change)
+        
         # Frame de controles
         control_frame = ttk.Frame(self.root, padding=10)
         control_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -194,6 +212,11 @@ class ControlPanel:
             hive_pos = (self.hive_x.get(), self.hive_y.get())
             self.on_position_change_callback(bee_pos, hive_pos)
     
+    def _on_speed_change(self, event=None):
+        """Callback cuando se cambia la velocidad de la simulación."""
+        if self.on_speed_change_callback:
+            self.on_speed_change_callback(self.speed.get())
+    
     def _on_start(self):
         """Callback para el botón Start."""
         if self.on_start_callback:
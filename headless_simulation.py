@@ -0,0 +1,185 @@
+"""
+Simulación sin pantalla - Núcleo lógico del simulador para ejecuciones por lotes.
+Usa solo GridWorld, PathFinder y BeeAgent: no importa Pygame, Tkinter ni
+OpenCV, y el clasificador (PyTorch) solo se carga si se pide explícitamente.
+
+Uso:
+    python headless_simulation.py --runs 1000 --algorithm BFS --mode optimal
+"""
+import argparse
+import random
+import time
+from config import *
+from grid_world import GridWorld
+from search_algorithms import PathFinder
+from bee_agent import BeeAgent
+from world_events import DynamicObstacles
+from utils import Logger
+
+
+class HeadlessSimulation:
+    """
+    Ejecuta simulaciones completas (generar mundo, buscar camino y recorrerlo)
+    sin ventana. El mundo, el buscador y la abeja se reutilizan entre corridas.
+    """
+
+    def __init__(self, size=GRID_SIZE, algorithm='BFS', mode='optimal', classifier=None, dynamic=False):
+        """
+        Inicializa la simulación.
+
+        Args:
+            size: Tamaño del mundo (NxN)
+            algorithm: 'BFS' o 'DFS'
+            mode: 'exploration' u 'optimal'
+            classifier: Instancia de FlowerClassifier (opcional). Sin clasificador
+                la abeja registra las celdas visitadas pero no clasifica imágenes.
+            dynamic: Si es True el mundo cambia (DynamicObstacles) en cada paso de la abeja
+        """
+        self.size = size
+        self.mode = mode
+        self.grid_world = GridWorld(size)
+        self.pathfinder = PathFinder(self.grid_world)
+        self.pathfinder.set_algorithm(algorithm)
+        self.bee_agent = BeeAgent(self.grid_world, classifier)
+        self.world_events = DynamicObstacles(self.grid_world) if dynamic else None
+
+    def run(self, bee_pos=(0, 0), hive_pos=None, seed=None):
+        """
+        Ejecuta una simulación.
+
+        Args:
+            bee_pos: Posición inicial de la abeja
+            hive_pos: Posición de la colmena (por defecto la esquina opuesta)
+            seed: Semilla para generar el mundo (opcional)
+
+        Returns:
+            Dict con las métricas de la corrida
+        """
+        if seed is not None:
+            random.seed(seed)
+            if self.world_events is not None:
+                self.world_events.rng.seed(seed)
+        if hive_pos is None:
+            hive_pos = (self.size - 1, self.size - 1)
+
+        self.grid_world.initialize_world(bee_pos, hive_pos)
+        self.bee_agent.reset_statistics()
+        self.bee_agent.set_position(bee_pos)
+
+        start_time = time.perf_counter()
+        path, explored, steps = self.pathfinder.find_path(bee_pos, hive_pos, mode=self.mode)
+        search_time = time.perf_counter() - start_time
+
+        # Sin camino, la reconstrucción solo contiene la meta
+        found = bool(path) and path[0] == bee_pos
+        if found:
+            path, reached = self._walk(path)
+            found = reached
+        self.bee_agent.wait_for_detections()
+        self.bee_agent.detection_log.flush()
+
+        stats = self.bee_agent.get_statistics()
+        return {
+            'seed': seed,
+            'found': found,
+            'path_length': len(path) if found else 0,
+            'world_version': self.grid_world.version,
+            'explored_nodes': len(explored),
+            'steps': steps,
+            'search_time': search_time,
+            'cells_visited': stats['cells_visited'],
+            'total_detections': stats['total_detections'],
+            'detection_accuracy': stats['detection_accuracy'],
+        }
+
+    def _walk(self, path):
+        """
+        Recorre un camino; en mundos dinámicos aplica un lote de eventos antes
+        de cada paso y repara el camino si lo bloquean.
+
+        Returns:
+            Tupla (camino recorrido, True si se llegó a la meta)
+        """
+        self.bee_agent.plan_detections(path)
+        version = self.grid_world.structure_version
+        i = 1
+        while i < len(path):
+            if self.world_events is not None:
+                self.grid_world.apply_events(self.world_events.step())
+                repaired, version = self.pathfinder.repair_path(path, i - 1, version)
+                if repaired is not path:
+                    path = repaired
+                    self.bee_agent.plan_detections(path[i:])
+                if i >= len(path):
+                    return path, False
+            position = path[i]
+            cell_type = self.grid_world.get_cell_type(position)
+            self.bee_agent.move_to(position)
+            if cell_type in [CELL_FLOWER, CELL_OBJECT]:
+                self.bee_agent.submit_detection(cell_type)
+            i += 1
+        return path, True
+
+    def run_batch(self, runs, base_seed=0, **kwargs):
+        """
+        Ejecuta varias simulaciones con semillas consecutivas.
+
+        Returns:
+            Lista de dicts con las métricas de cada corrida
+        """
+        return [self.run(seed=base_seed + i, **kwargs) for i in range(runs)]
+
+
+def load_classifier(prediction_table=PREDICTION_TABLE, backbone=BACKBONE):
+    """
+    Carga el clasificador entrenado (importa PyTorch solo cuando se necesita).
+
+    Args:
+        prediction_table: Si es True precalcula antes de empezar las
+            predicciones de todas las imágenes que puede ver la abeja
+        backbone: Red base del clasificador (usa su checkpoint en MODELS_DIR)
+    """
+    from flower_classifier import FlowerClassifier
+    classifier = FlowerClassifier(backbone=backbone)
+    if not classifier.load_model():
+        Logger.log("Modelo no encontrado. Se usará modelo sin entrenar.", "WARNING")
+    if prediction_table:
+        classifier.enable_prediction_table()
+    return classifier
+
+
+def main():
+    """Punto de entrada para ejecuciones por lotes desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Simulaciones sin pantalla del simulador de abeja")
+    parser.add_argument('--runs', type=int, default=100, help="Número de simulaciones")
+    parser.add_argument('--size', type=int, default=GRID_SIZE, help="Tamaño del mundo (NxN)")
+    parser.add_argument('--algorithm', choices=['BFS', 'DFS'], default='BFS')
+    parser.add_argument('--mode', choices=['exploration', 'optimal'], default='optimal')
+    parser.add_argument('--seed', type=int, default=0, help="Semilla de la primera corrida")
+    parser.add_argument('--dynamic', action='store_true', help="Obstáculos dinámicos durante el recorrido")
+    parser.add_argument('--classify', action='store_true', help="Clasificar imágenes con el modelo")
+    parser.add_argument('--backbone', default=BACKBONE, help="Red base del clasificador (con --classify)")
+    parser.add_argument('--verbose', action='store_true', help="Mostrar los mensajes INFO")
+    args = parser.parse_args()
+
+    Logger.quiet = not args.verbose
+    classifier = load_classifier(backbone=args.backbone) if args.classify else None
+    simulation = HeadlessSimulation(args.size, args.algorithm, args.mode, classifier, args.dynamic)
+
+    start_time = time.perf_counter()
+    results = simulation.run_batch(args.runs, base_seed=args.seed)
+    total_time = time.perf_counter() - start_time
+
+    solved = [r for r in results if r['found']]
+    print("=" * 60)
+    print(f"Simulaciones: {len(results)} ({args.algorithm}, modo {args.mode}, {args.size}x{args.size})")
+    print(f"Con camino: {len(solved)}")
+    if solved:
+        print(f"Longitud media del camino: {sum(r['path_length'] for r in solved) / len(solved):.1f}")
+        print(f"Nodos explorados (media): {sum(r['explored_nodes'] for r in solved) / len(solved):.1f}")
+    print(f"Tiempo total: {total_time:.2f}s ({total_time / max(len(results), 1) * 1000:.1f} ms por simulación)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
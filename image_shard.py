@@ -0,0 +1,219 @@
+"""
+Clase ImageShard - Imágenes de entrenamiento ya decodificadas en disco.
+
+Un paso de empaquetado decodifica cada imagen una sola vez (PIL, RGB y
+redimensionado bilineal a IMAGE_SIZE, igual que transforms.Resize) y la
+guarda en un arreglo uint8 (N, V, IMAGE_SIZE, IMAGE_SIZE, 3) que se abre con
+memmap. Las V variantes son las técnicas de aumento de datos, que son
+deterministas: se aplican aquí a la imagen original, antes de redimensionar,
+y en el entrenamiento solo se elige el índice de la variante. Después
+FlowerDataset lee cada muestra como una vista del archivo, sin decodificar
+JPEG ni procesar la imagen en cada época.
+
+Archivos en el directorio del shard:
+    images.npy   uint8 (N, V, IMAGE_SIZE, IMAGE_SIZE, 3)
+    labels.npy   int64 (N,)
+    index.json   tamaño de imagen, variantes y la lista [ruta, mtime_ns] de cada fila
+
+Al volver a empaquetar solo se decodifican las imágenes nuevas o
+modificadas; las demás filas se copian del shard anterior.
+
+Empaquetar por adelantado (si no, se hace al empezar a entrenar):
+    python image_shard.py --root fotos_flores_proyecto/flores/train
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from config import *
+from utils import Logger
+
+
+IMAGES_FILE = 'images.npy'
+LABELS_FILE = 'labels.npy'
+INDEX_FILE = 'index.json'
+
+
+def shard_directory(root_dir, image_size=IMAGE_SIZE, variants=1, shard_dir=SHARD_DIR):
+    """Directorio del shard de un conjunto de imágenes: <shard_dir>/<carpeta>_<tamaño>x<variantes>_<hash de la ruta>."""
+    root_dir = os.path.abspath(root_dir)
+    digest = hashlib.sha1(root_dir.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(shard_dir, f"{os.path.basename(root_dir)}_{image_size}x{variants}_{digest}")
+
+
+def decode_image(path, image_size=IMAGE_SIZE, variants=1, augment=None):
+    """
+    Decodifica una imagen, le aplica las variantes de aumento y la redimensiona.
+
+    Args:
+        path: Ruta de la imagen
+        image_size: Lado de las imágenes redimensionadas
+        variants: Número de variantes (la 0 es la imagen original)
+        augment: Función (PIL Image, variante) -> PIL Image; obligatoria si variants > 1
+
+    Returns:
+        Arreglo uint8 (variants, image_size, image_size, 3); gris si no se puede cargar
+    """
+    try:
+        image = Image.open(path).convert('RGB')
+    except Exception:
+        # Misma imagen de respaldo que FlowerDataset
+        image = Image.new('RGB', (224, 224), color=(128, 128, 128))
+    result = np.empty((variants, image_size, image_size, 3), dtype=np.uint8)
+    for variant in range(variants):
+        augmented = augment(image, variant) if variant else image
+        result[variant] = np.asarray(augmented.resize((image_size, image_size), Image.BILINEAR), dtype=np.uint8)
+    return result
+
+
+class ImageShard:
+    """
+    Shard de imágenes uint8 en memmap.
+
+    Uso:
+        shard = ImageShard.pack(paths, labels, directory, variants=5, augment=FlowerDataset.augment)
+        shard.images[i, variant]   # vista (IMAGE_SIZE, IMAGE_SIZE, 3) uint8 del archivo
+    """
+
+    def __init__(self, directory):
+        """
+        Abre un shard existente.
+
+        Args:
+            directory: Directorio con images.npy, labels.npy e index.json
+        """
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.image_size = index['image_size']
+        self.variants = index['variants']
+        self.entries = [tuple(entry) for entry in index['entries']]
+        self.paths = [path for path, _ in self.entries]
+        # Copia en escritura: las vistas son modificables sin tocar el archivo
+        # (torch.from_numpy no admite arreglos de solo lectura)
+        self.images = np.load(os.path.join(directory, IMAGES_FILE), mmap_mode='c')
+        self.labels = np.load(os.path.join(directory, LABELS_FILE))
+        if len(self.images) != len(self.entries) or len(self.labels) != len(self.entries):
+            raise ValueError(f"Shard incompleto en {directory}")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getstate__(self):
+        # Los trabajadores del DataLoader reabren el memmap en vez de copiar el arreglo
+        state = dict(self.__dict__)
+        del state['images']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.images = np.load(os.path.join(self.directory, IMAGES_FILE), mmap_mode='c')
+
+    @staticmethod
+    def open(directory):
+        """Shard del directorio, o None si no existe o está dañado."""
+        if not os.path.exists(os.path.join(directory, INDEX_FILE)):
+            return None
+        try:
+            return ImageShard(directory)
+        except (OSError, ValueError, KeyError) as e:
+            Logger.log(f"Shard ilegible en {directory} ({e}), se vuelve a empaquetar", "WARNING")
+            return None
+
+    def matches(self, paths, labels, image_size=IMAGE_SIZE, variants=1):
+        """True si el shard contiene exactamente esas imágenes, sin cambios, y esas etiquetas."""
+        stamps = [_mtime(path) for path in paths]
+        return (self.image_size == image_size
+                and self.variants == variants
+                and self.entries == list(zip(paths, stamps))
+                and np.array_equal(self.labels, np.asarray(labels, dtype=np.int64)))
+
+    @staticmethod
+    def pack(paths, labels, directory, image_size=IMAGE_SIZE, variants=1, augment=None, workers=None):
+        """
+        Empaqueta las imágenes (o reutiliza el shard si sigue al día).
+
+        Args:
+            paths: Rutas de las imágenes, en el orden de las filas
+            labels: Etiqueta de cada imagen
+            directory: Directorio del shard
+            image_size: Lado de las imágenes redimensionadas
+            variants: Variantes de aumento por imagen (1 = solo la original)
+            augment: Función (PIL Image, variante) -> PIL Image para las variantes 1..variants-1
+            workers: Hilos de decodificación (por defecto uno por núcleo)
+
+        Returns:
+            ImageShard abierto
+        """
+        previous = ImageShard.open(directory)
+        if previous is not None and previous.matches(paths, labels, image_size, variants):
+            return previous
+
+        stamps = [_mtime(path) for path in paths]
+        old_rows = {}
+        if previous is not None and previous.image_size == image_size and previous.variants == variants:
+            old_rows = {entry: row for row, entry in enumerate(previous.entries)}
+        reuse = [old_rows.get(entry) for entry in zip(paths, stamps)]
+        pending = [i for i, row in enumerate(reuse) if row is None]
+
+        start = time.perf_counter()
+        os.makedirs(directory, exist_ok=True)
+        temporary = os.path.join(directory, IMAGES_FILE + '.tmp.npy')
+        images = np.lib.format.open_memmap(
+            temporary, mode='w+', dtype=np.uint8, shape=(len(paths), variants, image_size, image_size, 3))
+        for i, row in enumerate(reuse):
+            if row is not None:
+                images[i] = previous.images[row]
+        previous = None  # Cerrar el memmap anterior antes de reemplazar el archivo
+
+        # PIL y OpenCV liberan el GIL al decodificar y procesar: los hilos se reparten las imágenes
+        workers = workers or os.cpu_count() or 1
+        with ThreadPoolExecutor(workers) as pool:
+            decoded = pool.map(lambda i: decode_image(paths[i], image_size, variants, augment), pending)
+            for i, array in zip(pending, decoded):
+                images[i] = array
+        images.flush()
+        del images
+
+        os.replace(temporary, os.path.join(directory, IMAGES_FILE))
+        np.save(os.path.join(directory, LABELS_FILE), np.asarray(labels, dtype=np.int64))
+        index = {
+            'image_size': image_size,
+            'variants': variants,
+            'entries': [[path, stamp] for path, stamp in zip(paths, stamps)],
+        }
+        with open(os.path.join(directory, INDEX_FILE + '.tmp'), 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(os.path.join(directory, INDEX_FILE + '.tmp'), os.path.join(directory, INDEX_FILE))
+        Logger.log(f"Shard de imágenes en {directory}: {len(pending)} decodificadas x {variants} variantes en "
+                   f"{time.perf_counter() - start:.1f}s, {len(paths) - len(pending)} reutilizadas")
+        return ImageShard(directory)
+
+
+def _mtime(path):
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+
+
+def main():
+    """Empaqueta un conjunto de imágenes de entrenamiento."""
+    from flower_classifier import FlowerDataset
+
+    parser = argparse.ArgumentParser(description="Empaqueta imágenes decodificadas en un shard uint8")
+    parser.add_argument('--root', default=TRAIN_DIR, help="Directorio del conjunto (subcarpetas por flor)")
+    parser.add_argument('--no-augmentation', action='store_true', help="Guardar solo la imagen original (evaluación)")
+    args = parser.parse_args()
+
+    dataset = FlowerDataset(args.root, apply_augmentation=not args.no_augmentation, use_shard=True)
+    if dataset.shard is None:
+        Logger.log(f"No hay imágenes en {args.root}", "ERROR")
+        return
+    size = dataset.shard.images.nbytes / 2**20
+    Logger.log(f"Shard listo: {len(dataset.shard)} imágenes, {size:.0f} MB en {dataset.shard.directory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Motores de ejecución del clasificador: el mismo modelo se puede ejecutar en
+PyTorch normal ('eager'), como grafo TorchScript congelado y optimizado para
+inferencia ('torchscript') o con ONNX Runtime en CPU ('onnx').
+
+Los modelos exportados se guardan junto al checkpoint
+(flower_classifier.torchscript.pt, flower_classifier.onnx) y se vuelven a
+exportar si el checkpoint es más reciente. Todos devuelven las mismas
+probabilidades (n, NUM_CLASSES) que VisionTransformerClassifier.predict_proba.
+
+ONNX necesita los paquetes opcionales `onnx` (exportar) y `onnxruntime`
+(ejecutar); se importan solo al usarlo.
+
+Comparar latencias:
+    python inference_backends.py --backbone resnet18
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import torch
+import torch.nn as nn
+from config import *
+from utils import Logger
+
+
+INFERENCE_BACKENDS = ('eager', 'torchscript', 'onnx')
+BACKEND_SUFFIXES = {'torchscript': '.torchscript.pt', 'onnx': '.onnx'}
+
+
+def exported_model_path(model_path, backend):
+    """Ruta del modelo exportado junto al checkpoint."""
+    return os.path.splitext(model_path)[0] + BACKEND_SUFFIXES[backend]
+
+
+class ProbabilityModule(nn.Module):
+    """Envuelve un clasificador para que forward() devuelva probabilidades (lo que se exporta)."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, x):
+        return self.model.predict_proba(x)
+
+
+class EagerBackend:
+    """PyTorch normal: llama a predict_proba del modelo."""
+
+    name = 'eager'
+
+    def __init__(self, model, device):
+        self.model = model
+        self.device = device
+
+    def __call__(self, batch):
+        return self.model.predict_proba(batch)
+
+
+class TorchScriptBackend:
+    """
+    Grafo TorchScript congelado (pesos como constantes). Se guarda solo
+    congelado y se optimiza para inferencia al cargarlo, porque las
+    optimizaciones dependen de la máquina y no siempre se pueden serializar.
+    """
+
+    name = 'torchscript'
+
+    @staticmethod
+    def export(model, path, device):
+        module = ProbabilityModule(model).eval()
+        example = torch.randn(2, 3, IMAGE_SIZE, IMAGE_SIZE, device=device)
+        with torch.no_grad():
+            frozen = torch.jit.freeze(torch.jit.trace(module, example))
+        torch.jit.save(frozen, path)
+
+    def __init__(self, path, device):
+        self.device = device
+        self.module = torch.jit.optimize_for_inference(torch.jit.load(path, map_location=device))
+
+    def __call__(self, batch):
+        return self.module(batch)
+
+
+class OnnxBackend:
+    """ONNX Runtime en CPU con todas las optimizaciones de grafo."""
+
+    name = 'onnx'
+
+    @staticmethod
+    def export(model, path, device):
+        module = ProbabilityModule(model).eval()
+        example = torch.randn(1, 3, IMAGE_SIZE, IMAGE_SIZE, device=device)
+        torch.onnx.export(
+            module, (example,), path,
+            input_names=['images'], output_names=['probabilities'],
+            dynamic_axes={'images': {0: 'batch'}, 'probabilities': {0: 'batch'}},
+            opset_version=17, dynamo=False,
+        )
+
+    def __init__(self, path, device):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError("El motor 'onnx' necesita onnxruntime (pip install onnxruntime)") from e
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = torch.get_num_threads()
+        self.device = torch.device('cpu')
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+    def __call__(self, batch):
+        outputs = self.session.run(None, {'images': batch.cpu().numpy()})[0]
+        return torch.from_numpy(outputs)
+
+
+BACKEND_CLASSES = {
+    'torchscript': TorchScriptBackend,
+    'onnx': OnnxBackend,
+}
+
+
+def export_model(model, model_path, backend, device, path=None):
+    """
+    Exporta un modelo para un motor.
+
+    Args:
+        model: VisionTransformerClassifier en modo evaluación
+        model_path: Checkpoint del que proviene (define la ruta por defecto)
+        backend: 'torchscript' u 'onnx'
+        device: Dispositivo del modelo
+        path: Ruta de salida (por defecto junto al checkpoint)
+
+    Returns:
+        Ruta del modelo exportado
+    """
+    path = path or exported_model_path(model_path, backend)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Exportar a un archivo temporal propio y reemplazar de golpe: quien cargue
+    # `path` a la vez (otro hilo o proceso) nunca ve un archivo a medio escribir
+    handle, temporary = tempfile.mkstemp(suffix=BACKEND_SUFFIXES[backend] + '.tmp', dir=directory)
+    os.close(handle)
+    try:
+        BACKEND_CLASSES[backend].export(model, temporary, device)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    Logger.log(f"Modelo exportado a {backend}: {path}")
+    return path
+
+
+def create_backend(name, model, model_path, device):
+    """
+    Crea el motor de ejecución de un modelo, exportándolo si hace falta.
+
+    Args:
+        name: 'eager', 'torchscript' u 'onnx'
+        model: VisionTransformerClassifier en modo evaluación
+        model_path: Checkpoint guardado del modelo (None si no viene de disco;
+            entonces solo se puede usar 'eager')
+        device: Dispositivo del modelo
+
+    Returns:
+        Objeto invocable: tensor (n, 3, IMAGE_SIZE, IMAGE_SIZE) -> probabilidades (n, NUM_CLASSES)
+    """
+    if name not in INFERENCE_BACKENDS:
+        raise ValueError(f"Motor de inferencia desconocido: {name} (opciones: {', '.join(INFERENCE_BACKENDS)})")
+    if name == 'eager':
+        return EagerBackend(model, device)
+    if model_path is None:
+        raise ValueError(f"El motor '{name}' necesita un modelo guardado en disco")
+
+    path = exported_model_path(model_path, name)
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(model_path):
+        export_model(model, model_path, name, device, path)
+    return BACKEND_CLASSES[name](path, device)
+
+
+def time_backend(backend, batch, runs):
+    """Mediana de los segundos por llamada (tras dos de calentamiento)."""
+    timings = []
+    with torch.inference_mode():
+        for i in range(runs + 2):
+            start = time.perf_counter()
+            backend(batch)
+            if i >= 2:
+                timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    """Compara la latencia de los motores sobre el mismo checkpoint."""
+    from flower_classifier import BACKBONES, FlowerClassifier
+
+    parser = argparse.ArgumentParser(description="Latencia del clasificador en cada motor de inferencia")
+    parser.add_argument('--backbone', choices=list(BACKBONES), default=BACKBONE)
+    parser.add_argument('--model-path', default=None, help="Checkpoint (por defecto el de la red base)")
+    parser.add_argument('--backends', nargs='+', choices=INFERENCE_BACKENDS, default=list(INFERENCE_BACKENDS))
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 4, PREDICT_BATCH_SIZE])
+    parser.add_argument('--runs', type=int, default=10, help="Llamadas cronometradas por medida")
+    parser.add_argument('--verbose', action='store_true', help="Mostrar los mensajes INFO")
+    args = parser.parse_args()
+
+    Logger.quiet = not args.verbose
+    print(f"{args.backbone} en CPU ({torch.get_num_threads()} hilos)\n")
+    print(f"{'Motor':<12}" + "".join(f"{f'lote {n}':>12}" for n in args.batch_sizes) + f"{'Δ máx.':>10}")
+
+    batches = {n: torch.randn(n, 3, IMAGE_SIZE, IMAGE_SIZE) for n in args.batch_sizes}
+    reference = None
+    for name in args.backends:
+        classifier = FlowerClassifier(args.model_path, args.backbone, inference_backend=name)
+        if not classifier.load_model():
+            Logger.log(f"Se necesita un modelo guardado en {classifier.model_path}", "ERROR")
+            return 1
+        runtime = classifier.prepare()
+        if runtime.name != name:
+            print(f"{name:<12}no disponible")
+            continue
+        device = runtime.device
+        timings = [time_backend(runtime, batches[n].to(device), args.runs) * 1000 for n in args.batch_sizes]
+        with torch.inference_mode():
+            output = runtime(batches[args.batch_sizes[-1]].to(device)).cpu()
+        if reference is None:
+            reference = output
+        difference = float((output - reference).abs().max())
+        print(f"{name:<12}" + "".join(f"{t:>10.1f}ms" for t in timings) + f"{difference:>10.1e}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
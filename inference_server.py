@@ -0,0 +1,192 @@
+"""
+Clase InferenceServer - Servicio de inferencia en proceso con micro-lotes.
+Varios hilos (animación, detección asíncrona, clasificación anticipada,
+enjambre) envían imágenes a una cola; un único hilo las agrupa en lotes de
+hasta `max_batch` imágenes, esperando como mucho `max_wait_ms` a que lleguen
+más, y hace una sola pasada del modelo por lote. Cada petición recibe un
+Future (o un awaitable de asyncio) con su resultado.
+
+Expone predict() y predict_batch() como FlowerClassifier, así que se puede
+pasar en su lugar a BeeAgent o SwarmEngine.
+"""
+import asyncio
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from config import *
+from utils import Logger
+
+
+class InferenceServer:
+    """
+    Cola de peticiones de clasificación atendida por micro-lotes.
+
+    Estadísticas: profundidad de la cola en cada lote y tamaño de los lotes
+    (histogramas), peticiones atendidas y latencia media.
+    """
+
+    def __init__(self, classifier, max_batch=INFERENCE_MAX_BATCH, max_wait_ms=INFERENCE_MAX_WAIT_MS):
+        """
+        Inicializa el servicio y arranca su hilo.
+
+        Args:
+            classifier: Instancia de FlowerClassifier
+            max_batch: Imágenes máximas por pasada del modelo
+            max_wait_ms: Espera máxima para completar un lote desde la primera petición
+        """
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batch_sizes = Counter()     # tamaño de lote -> número de lotes
+        self.queue_depths = Counter()    # peticiones en espera al formar un lote -> veces
+        self.requests = 0
+        self._latency_total = 0.0
+        self._stopped = False  # Se activa (con _lock) antes de encolar la marca de fin
+        self._thread = threading.Thread(target=self._serve, daemon=True, name="inference-server")
+        self._thread.start()
+        Logger.log(f"InferenceServer iniciado (lotes de hasta {max_batch}, espera {max_wait_ms} ms)")
+
+    @property
+    def queue_depth(self):
+        """Peticiones en espera."""
+        return self._queue.qsize()
+
+    def submit(self, image, use_table=True):
+        """
+        Encola una imagen.
+
+        Args:
+            image: Ruta, PIL Image o arreglo (alto, ancho, 3) uint8
+            use_table: Si es False ignora la tabla de predicciones precalculadas
+
+        Returns:
+            Future que se resuelve con (class_name, probability); falla con
+            RuntimeError si el servicio está detenido
+        """
+        future = Future()
+        with self._lock:
+            if self._stopped:
+                future.set_exception(RuntimeError("InferenceServer detenido"))
+                return future
+            self._queue.put((image, future, time.perf_counter(), use_table))
+        return future
+
+    async def submit_async(self, image, use_table=True):
+        """Como submit(), pero para código asyncio: `label, conf = await server.submit_async(img)`."""
+        return await asyncio.wrap_future(self.submit(image, use_table))
+
+    def predict(self, image, timeout=None):
+        """Clasifica una imagen esperando el resultado (misma firma que FlowerClassifier)."""
+        return self.submit(image).result(timeout)
+
+    def predict_batch(self, images, batch_size=None, use_table=True):
+        """
+        Clasifica varias imágenes; se reparten en los lotes del servicio junto
+        con las peticiones de los demás hilos.
+
+        Args:
+            images: Lista de rutas, PIL Images o arreglos (alto, ancho, 3) uint8
+            batch_size: No se usa: el tamaño de las pasadas lo fija max_batch.
+                Se acepta para poder llamar al servicio igual que a
+                FlowerClassifier (LookaheadClassifier lo pasa)
+            use_table: Si es False ignora la tabla de predicciones precalculadas
+
+        Returns:
+            Lista de tuplas (class_name, probability), en el mismo orden
+        """
+        futures = [self.submit(image, use_table) for image in images]
+        return [future.result() for future in futures]
+
+    def _serve(self):
+        """Hilo del servicio: forma lotes y los clasifica hasta ver la marca de fin (None)."""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._run_batch(batch)
+
+        # Ninguna petición queda sin resolver: las que sigan en la cola fallan
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("InferenceServer detenido"))
+
+    def _run_batch(self, batch):
+        """Clasifica un lote y resuelve sus futures (una pasada por valor de use_table)."""
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        with self._lock:
+            self.batch_sizes[len(batch)] += 1
+            self.queue_depths[self._queue.qsize()] += 1
+
+        for use_table in (True, False):
+            group = [item for item in batch if item[3] == use_table]
+            if not group:
+                continue
+            try:
+                results = self.classifier.predict_batch([item[0] for item in group], len(group), use_table)
+            except Exception as e:
+                Logger.log(f"Error en el lote de inferencia: {e}", "ERROR")
+                for item in group:
+                    item[1].set_exception(e)
+                continue
+
+            now = time.perf_counter()
+            with self._lock:
+                self.requests += len(group)
+                self._latency_total += sum(now - item[2] for item in group)
+            for item, result in zip(group, results):
+                item[1].set_result(result)
+
+    def stats(self):
+        """
+        Estadísticas del servicio.
+
+        Returns:
+            Dict con requests, batches, mean_batch_size, mean_latency_ms,
+            queue_depth, batch_sizes y queue_depths (histogramas)
+        """
+        with self._lock:
+            batches = sum(self.batch_sizes.values())
+            return {
+                'requests': self.requests,
+                'batches': batches,
+                'mean_batch_size': self.requests / batches if batches else 0.0,
+                'mean_latency_ms': self._latency_total / self.requests * 1000 if self.requests else 0.0,
+                'queue_depth': self.queue_depth,
+                'batch_sizes': dict(sorted(self.batch_sizes.items())),
+                'queue_depths': dict(sorted(self.queue_depths.items())),
+            }
+
+    def stop(self, timeout=None):
+        """
+        Detiene el servicio tras atender las peticiones ya encoladas; las
+        que lleguen después fallan con RuntimeError.
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put(None)
+        self._thread.join(timeout)
@@ -11,9 +11,13 @@ import threading
 import time
 from config import *
 from grid_world import GridWorld
+from camera import Camera
 from search_algorithms import PathFinder
+from world_events import DynamicObstacles
 from bee_agent import BeeAgent
+from simulation_clock import SimulationClock
 from flower_classifier import FlowerClassifier
+from inference_server import InferenceServer
 from gui_controller import ControlPanel, MetricsComparator
 from utils import Logger, load_random_flower_photo
 
@@ -35,18 +39,30 @@ class BeeSimulator:
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("🐝 Simulador de Abeja Inteligente - Pygame")
         self.clock = pygame.time.Clock()
+        self.font = pygame.font.Font(None, 24)
+        self.info_rect = None  # Área ocupada por el texto informativo del frame anterior
         
         # Componentes principales
         self.grid_world = GridWorld(GRID_SIZE)
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, GRID_SIZE)
+        self.dragging = False
         self.classifier = FlowerClassifier()
-        self.bee_agent = BeeAgent(self.grid_world, self.classifier)
+        # Las detecciones asíncronas y anticipadas comparten el modelo por micro-lotes
+        self.inference = InferenceServer(self.classifier) if INFERENCE_SERVER else None
+        self.bee_agent = BeeAgent(self.grid_world, self.inference or self.classifier, log_dir=DETECTION_LOG_DIR)
         self.pathfinder = PathFinder(self.grid_world)
+        self.world_events = DynamicObstacles(self.grid_world)
+        
+        # Reloj de la simulación: los retardos de la animación son segundos simulados
+        self.sim_clock = SimulationClock()
+        self.bee_agent.clock = self.sim_clock
         
         # Panel de control (Tkinter)
         self.control_panel = ControlPanel(
             on_start_callback=self.start_simulation,
             on_reload_callback=self.reload_world,
-            on_position_change_callback=self.update_positions
+            on_position_change_callback=self.update_positions,
+            on_speed_change_callback=self.sim_clock.set_mode
         )
         
         # Comparador de métricas
@@ -81,6 +97,9 @@ class BeeSimulator:
                     "Para mejores resultados, entrena el modelo primero.\n\n"
                     "Presiona 'Iniciar Simulación' para continuar con el modelo base."
                 )
+            if PREDICTION_TABLE:
+                # Clasificar en segundo plano todas las imágenes que puede ver la abeja
+                self.classifier.enable_prediction_table(background=True)
         except Exception as e:
             Logger.log(f"Error cargando clasificador: {e}", "ERROR")
         
@@ -129,7 +148,6 @@ class BeeSimulator:
         
         # Si no hay simulación activa, actualizar inmediatamente
         if not self.simulation_active:
-            self.grid_world.bee_pos = bee_pos
             self.grid_world.hive_pos = hive_pos
             self.bee_agent.set_position(bee_pos)
             Logger.log(f"Posiciones actualizadas: Abeja={bee_pos}, Colmena={hive_pos}")
@@ -169,10 +187,16 @@ class BeeSimulator:
         
         self.simulation_active = True
         self.animation_step = 0
+        self.sim_clock.reset()
         
         if config['mode'] == 'exploration':
-            # Animar exploración paso a paso
-            self.animate_exploration(config['bee_pos'], config['hive_pos'], config['mode'])
+            # Animar exploración paso a paso en un hilo aparte: el hilo de Tk
+            # queda libre para cambiar la velocidad o detener la simulación
+            threading.Thread(
+                target=self.animate_exploration,
+                args=(config['bee_pos'], config['hive_pos'], config['mode']),
+                daemon=True
+            ).start()
         else:
             # Encontrar path óptimo y animar movimiento
             start_time = time.time()
@@ -217,47 +241,79 @@ class BeeSimulator:
         if not self.current_path:
             return
         
-        for i, position in enumerate(self.current_path):
+        # Clasificar por lotes, en segundo plano, las flores/objetos del camino
+        self.bee_agent.plan_detections(self.current_path)
+        self.bee_agent.on_detection = self._report_detection
+        
+        path_version = self.grid_world.structure_version
+        i = 0
+        while i < len(self.current_path):
             if not self.simulation_active or not self.running:
                 break
             
+            # Mundo dinámico: aplicar eventos y reparar el camino solo si lo bloquean
+            if DYNAMIC_WORLD and i > 0:
+                self.grid_world.apply_events(self.world_events.step())
+                repaired, path_version = self.pathfinder.repair_path(
+                    self.current_path, i - 1, path_version
+                )
+                if repaired is not self.current_path:
+                    self.current_path = repaired
+                    self.bee_agent.plan_detections(self.current_path[i:])
+                if i >= len(self.current_path):
+                    Logger.log("La meta quedó bloqueada por los cambios del mundo", "WARNING")
+                    break
+            position = self.current_path[i]
+            
             # Verificar el tipo de celda ANTES de mover la abeja
             cell_type = self.grid_world.get_cell_type(position)
             
             # Mover abeja
             self.bee_agent.move_to(position)
             
-            # Solo detectar si hay flor u objeto (verificamos el tipo que tenía antes de moverse)
+            # Solo detectar si hay flor u objeto (verificamos el tipo que tenía antes de moverse).
+            # La clasificación termina en segundo plano y se reporta en _report_detection
             detected = False
             if cell_type in [CELL_FLOWER, CELL_OBJECT]:
-                _, classification, confidence, analyzed_image = self.bee_agent.detect_cell_content(cell_type)
+                self.bee_agent.submit_detection(cell_type)
                 detected = True
-                image_name = os.path.basename(analyzed_image) if analyzed_image else 'N/A'
-                confidence_text = f"{confidence:.2f}" if isinstance(confidence, (int, float)) else 'N/A'
-                
-                metrics_text = (
-                    f"🔍 ANÁLISIS DE CONTENIDO\n"
-                    f"Paso {i+1}/{len(self.current_path)}\n"
-                    f"Posición: {position}\n"
-                    f"Tipo de celda: {'Flor' if cell_type == CELL_FLOWER else 'Objeto'}\n"
-                    f"Imagen analizada: {image_name}\n"
-                    f"Predicción: {classification if classification else 'N/A'}\n"
-                    f"Confianza: {confidence_text}\n"
-                    f"{'='*40}\n"
-                )
-                
-                self.control_panel.root.after(
-                    0,
-                    lambda text=metrics_text: self.control_panel.append_metrics(text)
-                )
             
-            # Delay para visualización (más tiempo si detectó)
+            # Delay para visualización (más tiempo si detectó), escalado por el reloj
             delay = ANALYSIS_DELAY if detected else SEARCH_DELAY
-            time.sleep(delay)
+            self.sim_clock.wait(delay)
+            i += 1
         
-        # Simulación completada
+        # Simulación completada (tras registrar las detecciones pendientes)
+        self.bee_agent.wait_for_detections()
+        self.bee_agent.detection_log.flush()
+        self.bee_agent.on_detection = None
         self.on_simulation_complete()
     
+    def _report_detection(self, entry):
+        """Muestra en el panel una detección ya registrada (llamado desde el detector)."""
+        image_name = os.path.basename(entry['image_path']) if entry['image_path'] else 'N/A'
+        confidence = entry['confidence']
+        confidence_text = f"{confidence:.2f}" if isinstance(confidence, (int, float)) else 'N/A'
+        
+        metrics_text = (
+            f"🔍 ANÁLISIS DE CONTENIDO\n"
+            f"Posición: {entry['position']}\n"
+            f"Tipo de celda: {'Flor' if entry['ground_truth'] == 'flor' else 'Objeto'}\n"
+            f"Imagen analizada: {image_name}\n"
+            f"Predicción: {entry['prediction'] if entry['prediction'] else 'N/A'}\n"
+            f"Confianza: {confidence_text}\n"
+            f"{'='*40}\n"
+        )
+        
+        self._post_metrics(metrics_text)
+    
+    def _post_metrics(self, text):
+        """Añade texto al panel de métricas desde cualquier hilo (a través del bucle de Tk)."""
+        if self.control_panel.root:
+            self.control_panel.root.after(0, lambda: self.control_panel.append_metrics(text))
+        else:
+            self.control_panel.append_metrics(text)
+    
     def animate_exploration(self, start, goal, mode):
         """Anima la exploración paso a paso del algoritmo."""
         Logger.log(f"Iniciando animación de exploración en modo {mode}")
@@ -269,10 +325,21 @@ class BeeSimulator:
         path_found = []
         found = False
         
+        # Lista en orden de expansión: el render solo procesa los nodos nuevos
+        self.explored_nodes = []
+        
+        # Las clasificaciones terminan en segundo plano y se reportan en _report_detection
+        self.bee_agent.on_detection = self._report_detection
+        
         for current_pos, explored, found_flag, path in exploration_generator:
             if not self.simulation_active or not self.running:
                 break
             
+            # Exploración agotada sin llegar a la meta
+            if current_pos is None:
+                explored_nodes = explored
+                break
+            
             # Verificar el tipo de celda ANTES de mover la abeja
             cell_type = self.grid_world.get_cell_type(current_pos)
             
@@ -282,7 +349,7 @@ class BeeSimulator:
             # Detectar si es celda con contenido
             detected = False
             if cell_type in [CELL_FLOWER, CELL_OBJECT]:
-                _, classification, confidence, analyzed_image = self.bee_agent.detect_cell_content(cell_type)
+                self.bee_agent.submit_detection(cell_type)
                 detected = True
             
             # Actualizar nodos explorados
@@ -292,39 +359,29 @@ class BeeSimulator:
                 path_found = path
             
             # Actualizar visualización (resaltar nodos explorados)
-            self.explored_nodes = list(explored_nodes)
+            self.explored_nodes.append(current_pos)
             
-            # Actualizar métricas
-            last_detection = self.bee_agent.detection_log[-1] if self.bee_agent.detection_log else None
-            image_name = os.path.basename(last_detection['image_path']) if last_detection and last_detection.get('image_path') else 'N/A'
-            prediction = last_detection.get('prediction') if last_detection else None
-            confidence_value = last_detection.get('confidence') if last_detection else None
-            confidence_text = f"{confidence_value:.2f}" if isinstance(confidence_value, (int, float)) else 'N/A'
+            # Actualizar métricas (las detecciones las publica _report_detection)
             metrics_text = (
                 f"Explorando...\n"
                 f"Nodo actual: {current_pos}\n"
-                f"Imagen analizada: {image_name}\n"
-                f"Predicción: {prediction if prediction else 'N/A'}\n"
-                f"Confianza: {confidence_text}\n"
                 f"Nodos explorados: {len(explored_nodes)}\n"
                 f"Meta encontrada: {'Sí' if found else 'No'}\n"
             )
             
-            if self.control_panel.root:
-                self.control_panel.root.after(
-                    0,
-                    lambda text=metrics_text: self.control_panel.append_metrics(text)
-                )
+            # En los modos acelerados se publica como mucho una actualización por frame
+            if self.sim_clock.frame_due():
+                self._post_metrics(metrics_text)
             
-            # Delay para visualización (más tiempo si detectó)
+            # Delay para visualización (más tiempo si detectó), escalado por el reloj
             delay = ANALYSIS_DELAY if detected else SEARCH_DELAY
-            time.sleep(delay)
+            self.sim_clock.wait(delay)
         
         # Exploración completada
         if found:
             Logger.log(f"Meta encontrada durante exploración. Camino: {len(path_found)} pasos")
             self.current_path = path_found
-            self.control_panel.append_metrics(
+            self._post_metrics(
                 f"\n✓ Meta encontrada!\n"
                 f"Camino óptimo: {len(path_found)} pasos\n"
                 f"Total explorados: {len(explored_nodes)}\n"
@@ -332,13 +389,16 @@ class BeeSimulator:
         else:
             Logger.log("Exploración completada sin encontrar meta")
             self.current_path = []
-            self.control_panel.append_metrics(
+            self._post_metrics(
                 f"\n✓ Exploración completada\n"
                 f"Total nodos explorados: {len(explored_nodes)}\n"
                 f"Meta no encontrada (posiblemente inaccesible)\n"
             )
         
-        # Completar simulación
+        # Completar simulación (tras registrar las detecciones pendientes)
+        self.bee_agent.wait_for_detections()
+        self.bee_agent.detection_log.flush()
+        self.bee_agent.on_detection = None
         self.on_simulation_complete()
     
     def on_simulation_complete(self):
@@ -356,6 +416,7 @@ class BeeSimulator:
             f"📊 ESTADÍSTICAS FINALES:\n"
             f"  Algoritmo: {self.current_config['algorithm']}\n"
             f"  Modo: {self.current_config['mode']}\n"
+            f"  Tiempo simulado: {self.sim_clock.sim_time:.1f}s ({self.sim_clock.mode})\n"
         )
         
         if self.current_config['mode'] == 'exploration':
@@ -376,7 +437,7 @@ class BeeSimulator:
                 f"\n✓ La abeja ha llegado a la colmena!\n"
             )
         
-        self.control_panel.append_metrics(report)
+        self._post_metrics(report)
         
         # Guardar métricas para comparación
         metrics = {
@@ -414,31 +475,75 @@ class BeeSimulator:
                     # Toggle simulación
                     if not self.simulation_active:
                         self.start_simulation(self.current_config)
+                
+                # Cámara: flechas para desplazar, +/- para zoom, 0 para ver todo
+                elif event.key == pygame.K_LEFT:
+                    self.camera.pan(-CAMERA_PAN_STEP, 0)
+                elif event.key == pygame.K_RIGHT:
+                    self.camera.pan(CAMERA_PAN_STEP, 0)
+                elif event.key == pygame.K_UP:
+                    self.camera.pan(0, -CAMERA_PAN_STEP)
+                elif event.key == pygame.K_DOWN:
+                    self.camera.pan(0, CAMERA_PAN_STEP)
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    self.camera.zoom_at(ZOOM_STEP)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self.camera.zoom_at(1 / ZOOM_STEP)
+                elif event.key == pygame.K_0:
+                    self.camera.fit_world()
+                elif event.key == pygame.K_c and self.bee_agent.position:
+                    self.camera.center_on(self.bee_agent.position)
+            
+            elif event.type == pygame.MOUSEWHEEL:
+                factor = ZOOM_STEP if event.y > 0 else 1 / ZOOM_STEP
+                self.camera.zoom_at(factor, pygame.mouse.get_pos())
+            
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+                self.dragging = True
+            
+            elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+                self.dragging = False
+            
+            elif event.type == pygame.MOUSEMOTION and self.dragging:
+                dx, dy = event.rel
+                self.camera.pan(-dx, -dy)
+            
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # La ventana fue tapada/restaurada: redibujar todo
+                self.grid_world.invalidate_render()
     
     def render(self):
-        """Renderiza el mundo en Pygame."""
-        self.grid_world.render(
+        """Renderiza el mundo en Pygame, actualizando solo las zonas modificadas."""
+        # El texto del frame anterior tapa celdas: deben redibujarse
+        if self.info_rect:
+            self.grid_world.mark_dirty_area(self.info_rect)
+        
+        dirty_rects = self.grid_world.render(
             self.screen,
             path=self.current_path,
-            explored=self.explored_nodes
+            explored=self.explored_nodes,
+            camera=self.camera
         )
         
         # Dibujar información en pantalla
-        font = pygame.font.Font(None, 24)
-        
         info_texts = [
             f"Algoritmo: {self.current_config['algorithm']} - {self.current_config['mode']}",
             f"Posición: {self.bee_agent.position}",
             f"Flores: {self.bee_agent.flowers_detected} | Objetos: {self.bee_agent.objects_detected}"
         ]
         
+        text_rects = []
         y_offset = 5
         for text in info_texts:
-            text_surface = font.render(text, True, COLOR_BLACK, COLOR_WHITE)
-            self.screen.blit(text_surface, (5, y_offset))
+            text_surface = self.font.render(text, True, COLOR_BLACK, COLOR_WHITE)
+            text_rects.append(self.screen.blit(text_surface, (5, y_offset)))
             y_offset += 25
         
-        pygame.display.flip()
+        new_info_rect = text_rects[0].unionall(text_rects[1:])
+        dirty_rects.append(new_info_rect.union(self.info_rect) if self.info_rect else new_info_rect)
+        self.info_rect = new_info_rect
+        
+        pygame.display.update(dirty_rects)
     
     def run(self):
         """Loop principal del simulador."""
@@ -472,6 +577,10 @@ class BeeSimulator:
         """Limpia recursos al cerrar."""
         Logger.log("Cerrando simulador...")
         
+        if self.inference is not None:
+            Logger.log(f"Servicio de inferencia: {self.inference.stats()}")
+            self.inference.stop(timeout=1.0)
+        
         # Guardar reporte comparativo
         if len(self.metrics_comparator.results) > 0:
             report = self.metrics_comparator.save_report()
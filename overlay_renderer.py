@@ -0,0 +1,264 @@
+"""
+Clase OverlayRenderer - Capa de nodos explorados y camino basada en NumPy.
+Guarda el orden de expansión, la profundidad y la pertenencia al camino en
+matrices, y las colorea en una sola pasada vectorizada.
+"""
+import numpy as np
+import pygame
+from config import *
+
+
+# Color clave para las celdas sin overlay (no aparece en las paletas)
+TRANSPARENT_KEY = (255, 0, 255)
+
+
+class OverlayRenderer:
+    """
+    Mantiene el estado de los overlays (explorados y camino) de un GridWorld.
+
+    - order[i, j]: orden de expansión de la celda (-1 si no fue explorada)
+    - depth[i, j]: profundidad de la celda en el árbol de búsqueda (-1 si no fue explorada)
+    - path_mask[i, j]: True si la celda pertenece al camino
+    """
+
+    def __init__(self, size, color_mode=OVERLAY_COLOR_MODE):
+        """
+        Inicializa la capa de overlays.
+
+        Args:
+            size: Tamaño del mundo (NxN)
+            color_mode: 'order' (orden de expansión), 'depth' (profundidad) o 'flat' (color único)
+        """
+        self.size = size
+        self.color_mode = color_mode
+
+        self.order = np.full((size, size), -1, dtype=np.int32)
+        self.depth = np.full((size, size), -1, dtype=np.int32)
+        self.path_mask = np.zeros((size, size), dtype=bool)
+
+        self.explored_cells = []
+        self.path_cells = []
+        self.hive_pos = None
+        self._explored_source = None
+        self._path_source = None
+
+        # Superficie de 1 píxel por celda; se actualiza solo en las celdas que cambian
+        self._surface = None
+
+        # Escala fija para normalizar colores: así el color de una celda no
+        # cambia cuando se exploran otras (necesario para el redibujado parcial)
+        self.order_scale = size * size
+        self.depth_scale = 2 * size
+
+    def reset(self, walkable_count=None):
+        """
+        Limpia todos los overlays.
+
+        Args:
+            walkable_count: Número de celdas transitables del mundo (escala del color por orden)
+        """
+        self.order.fill(-1)
+        self.depth.fill(-1)
+        self.path_mask.fill(False)
+        self.explored_cells = []
+        self.path_cells = []
+        self._explored_source = None
+        self._path_source = None
+        self._surface = None
+        if walkable_count:
+            self.order_scale = walkable_count
+
+    @property
+    def is_empty(self):
+        """True si no hay celdas exploradas ni camino."""
+        return not self.explored_cells and not self.path_cells
+
+    def mark_explored(self, position):
+        """
+        Marca una celda como explorada en O(1).
+        La profundidad se toma del vecino explorado más cercano al inicio + 1,
+        que en BFS coincide con la distancia al nodo inicial.
+        """
+        if self.order[position] >= 0:
+            return
+
+        x, y = position
+        best = -1
+        for nx, ny in ((x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)):
+            if 0 <= nx < self.size and 0 <= ny < self.size:
+                neighbor_depth = self.depth[nx, ny]
+                if neighbor_depth >= 0 and (best < 0 or neighbor_depth < best):
+                    best = neighbor_depth
+
+        self.order[position] = len(self.explored_cells)
+        self.depth[position] = best + 1
+        self.explored_cells.append(position)
+
+    def _clear_explored(self):
+        """Borra los nodos explorados y retorna las celdas afectadas."""
+        changed = self.explored_cells
+        for position in changed:
+            self.order[position] = -1
+            self.depth[position] = -1
+        self.explored_cells = []
+        return changed
+
+    def sync_explored(self, explored):
+        """
+        Sincroniza los nodos explorados con los del llamador.
+
+        Si `explored` es una lista/tupla ordenada que solo crece, se procesan
+        únicamente los elementos nuevos. Con conjuntos se recorre el conjunto
+        completo (no se conoce el orden de expansión).
+
+        Returns:
+            Lista de posiciones cuyo overlay cambió
+        """
+        if not explored:
+            self._explored_source = explored
+            return self._clear_explored() if self.explored_cells else []
+
+        count = len(self.explored_cells)
+        if explored is self._explored_source and len(explored) == count:
+            return []
+        self._explored_source = explored
+
+        changed = []
+        if isinstance(explored, (list, tuple)):
+            if len(explored) < count or (count and explored[count - 1] != self.explored_cells[-1]):
+                changed = self._clear_explored()
+                new_cells = explored
+            else:
+                new_cells = explored[count:]
+        else:
+            if len(explored) < count:
+                changed = self._clear_explored()
+            new_cells = [pos for pos in explored if self.order[pos] < 0]
+
+        for position in new_cells:
+            self.mark_explored(position)
+        changed.extend(new_cells)
+        return changed
+
+    def sync_path(self, path):
+        """
+        Sincroniza el camino con el del llamador.
+
+        Returns:
+            Lista de posiciones cuyo overlay cambió
+        """
+        path = path or []
+        if path is self._path_source and len(path) == len(self.path_cells):
+            return []
+        self._path_source = path
+
+        old_cells = set(self.path_cells)
+        new_cells = set(path)
+        for position in old_cells - new_cells:
+            self.path_mask[position] = False
+        for position in new_cells - old_cells:
+            self.path_mask[position] = True
+
+        self.path_cells = list(path)
+        return list(old_cells ^ new_cells)
+
+    def sync(self, path, explored, hive_pos=None):
+        """
+        Sincroniza camino, explorados y colmena (el camino no se pinta sobre ella).
+
+        Returns:
+            Lista de posiciones cuyo overlay cambió
+        """
+        changed = self.sync_explored(explored) + self.sync_path(path)
+        if hive_pos != self.hive_pos:
+            changed.extend(pos for pos in (self.hive_pos, hive_pos) if pos is not None)
+            self.hive_pos = hive_pos
+        self._update_surface(changed)
+        return changed
+
+    def _colors(self, order, depth, path, hive_mask):
+        """
+        Colorea en una sola pasada vectorizada las celdas dadas por sus matrices
+        de orden, profundidad y camino (de cualquier forma).
+
+        Returns:
+            Matriz uint8 (..., 3); las celdas sin overlay valen TRANSPARENT_KEY
+        """
+        colors = np.empty(order.shape + (3,), dtype=np.uint8)
+        colors[:] = TRANSPARENT_KEY
+
+        explored = order >= 0
+        if self.color_mode == 'flat':
+            colors[explored] = COLOR_EXPLORED
+        else:
+            if self.color_mode == 'depth':
+                values, scale = depth[explored], self.depth_scale
+            else:
+                values, scale = order[explored], self.order_scale
+            t = np.clip(values / max(scale - 1, 1), 0.0, 1.0)[:, None]
+            start = np.array(COLOR_EXPLORED, dtype=np.float32)
+            end = np.array(COLOR_EXPLORED_LATE, dtype=np.float32)
+            colors[explored] = (start + (end - start) * t).astype(np.uint8)
+
+        colors[path & ~hive_mask] = COLOR_PATH
+        return colors
+
+    def colorize(self, visible):
+        """
+        Colorea una región rectangular.
+
+        Args:
+            visible: Tupla (fila_inicio, fila_fin, col_inicio, col_fin)
+
+        Returns:
+            Matriz uint8 (filas, columnas, 3)
+        """
+        first_row, last_row, first_col, last_col = visible
+        region = (slice(first_row, last_row), slice(first_col, last_col))
+
+        hive_mask = np.zeros((last_row - first_row, last_col - first_col), dtype=bool)
+        if self.hive_pos is not None:
+            hive_row, hive_col = self.hive_pos[0] - first_row, self.hive_pos[1] - first_col
+            if 0 <= hive_row < hive_mask.shape[0] and 0 <= hive_col < hive_mask.shape[1]:
+                hive_mask[hive_row, hive_col] = True
+
+        return self._colors(self.order[region], self.depth[region], self.path_mask[region], hive_mask)
+
+    def _colors_at(self, positions):
+        """Colores de una lista de celdas (fancy indexing, sin bucles por celda)."""
+        rows, cols = np.asarray(positions, dtype=np.intp).reshape(-1, 2).T
+        if self.hive_pos is not None:
+            hive_mask = (rows == self.hive_pos[0]) & (cols == self.hive_pos[1])
+        else:
+            hive_mask = np.zeros(rows.shape, dtype=bool)
+        colors = self._colors(self.order[rows, cols], self.depth[rows, cols], self.path_mask[rows, cols], hive_mask)
+        return rows, cols, colors
+
+    def cell_color(self, position):
+        """Color del overlay de una sola celda, o None si no tiene."""
+        color = tuple(int(c) for c in self._colors_at([position])[2][0])
+        return None if color == TRANSPARENT_KEY else color
+
+    def _update_surface(self, changed):
+        """Repinta en la superficie cacheada solo las celdas que cambiaron."""
+        if self._surface is None or not changed:
+            return
+        rows, cols, colors = self._colors_at(changed)
+        pixels = pygame.surfarray.pixels3d(self._surface)
+        pixels[cols, rows] = colors  # surfarray indexa (x, y) = (columna, fila)
+        del pixels
+
+    def surface(self, visible):
+        """
+        Superficie de Pygame de 1 píxel por celda con los overlays de la región.
+        Las celdas sin overlay son transparentes (colorkey). La superficie del
+        mundo completo se colorea una vez y luego se actualiza por celdas.
+        """
+        if self._surface is None:
+            colors = self.colorize((0, self.size, 0, self.size))
+            self._surface = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+
+        first_row, last_row, first_col, last_col = visible
+        region = self._surface.subsurface((first_col, first_row, last_col - first_col, last_row - first_row))
+        region.set_colorkey(TRANSPARENT_KEY)
+        return region
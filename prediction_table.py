@@ -0,0 +1,186 @@
+"""
+Clase PredictionTable - Tabla precalculada de predicciones (ruta -> clase, confianza).
+Las imágenes que usa la simulación salen de conjuntos fijos (TEST_DIR y
+OBJECTS_DIR) y una misma imagen siempre recibe la misma respuesta del mismo
+modelo, así que se clasifican todas una vez, por lotes grandes, y la
+detección durante la simulación se reduce a consultar la tabla.
+
+La tabla se guarda junto al archivo del modelo y va ligada a su suma
+SHA-256: si el modelo cambia (reentrenamiento) se descarta.
+"""
+import hashlib
+import json
+import os
+import threading
+from config import *
+from utils import Logger, image_catalog
+
+
+def pool_images(directories=(TEST_DIR, OBJECTS_DIR)):
+    """
+    Lista las imágenes de los conjuntos que usa la simulación.
+
+    Returns:
+        Lista de rutas absolutas
+    """
+    paths = []
+    for directory in directories:
+        if os.path.isdir(directory):
+            paths.extend(image_catalog.paths(directory))
+    return paths
+
+
+def file_checksum(path):
+    """Suma SHA-256 de un archivo, o None si no existe."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PredictionTable:
+    """
+    Predicciones precalculadas de un modelo concreto, indexadas por ruta.
+
+    Cada entrada guarda también la fecha de modificación de la imagen. Las
+    fechas se comprueban una sola vez, al preparar la tabla (warm_up /
+    missing): una entrada de una imagen que cambió se vuelve a clasificar, y
+    lookup() es solo una consulta al diccionario, sin tocar el disco.
+    """
+
+    def __init__(self, model_checksum, table_path):
+        """
+        Inicializa la tabla y carga la versión guardada si es del mismo modelo.
+
+        Args:
+            model_checksum: SHA-256 del archivo del modelo, o None si el modelo
+                no viene de un archivo (la tabla solo vive en memoria)
+            table_path: Archivo JSON donde se guarda la tabla
+        """
+        self.model_checksum = model_checksum
+        self.table_path = table_path
+        self.entries = {}  # ruta -> (clase, confianza, mtime_ns), lo que se guarda en disco
+        self._fresh = {}   # ruta -> (clase, confianza) de las entradas ya comprobadas
+        self._lock = threading.Lock()
+        self._thread = None
+        self._load()
+
+    @staticmethod
+    def _key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def _load(self):
+        """Carga la tabla guardada si corresponde al mismo modelo."""
+        if self.model_checksum is None or not os.path.exists(self.table_path):
+            return
+        try:
+            with open(self.table_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            Logger.log(f"Error leyendo tabla de predicciones: {e}", "WARNING")
+            return
+        if data.get('model_sha256') != self.model_checksum:
+            Logger.log("Tabla de predicciones de otro modelo: se recalculará", "WARNING")
+            return
+        self.entries = {path: tuple(entry) for path, entry in data.get('predictions', {}).items()}
+        Logger.log(f"Tabla de predicciones cargada: {len(self.entries)} imágenes")
+
+    def save(self):
+        """Guarda la tabla junto al modelo (solo si el modelo viene de un archivo)."""
+        if self.model_checksum is None:
+            return
+        with self._lock:
+            predictions = {path: list(entry) for path, entry in self.entries.items()}
+        try:
+            os.makedirs(os.path.dirname(self.table_path), exist_ok=True)
+            temporary = self.table_path + '.tmp'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump({'model_sha256': self.model_checksum, 'predictions': predictions}, f)
+            os.replace(temporary, self.table_path)
+            Logger.log(f"Tabla de predicciones guardada en {self.table_path}")
+        except Exception as e:
+            Logger.log(f"Error guardando tabla de predicciones: {e}", "ERROR")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, path):
+        """
+        Predicción precalculada de una imagen.
+
+        Returns:
+            Tupla (clase, confianza), o None si no está en la tabla o no se
+            comprobó al prepararla
+        """
+        return self._fresh.get(self._key(path))
+
+    def missing(self, paths):
+        """
+        Comprueba (una vez) la fecha de modificación de las rutas con entrada
+        y activa las que siguen al día.
+
+        Returns:
+            Rutas que aún no tienen una predicción válida
+        """
+        pending = []
+        for path in paths:
+            key = self._key(path)
+            if key in self._fresh:
+                continue
+            entry = self.entries.get(key)
+            try:
+                valid = entry is not None and os.stat(key).st_mtime_ns == entry[2]
+            except OSError:
+                valid = False
+            if valid:
+                self._fresh[key] = (entry[0], entry[1])
+            else:
+                pending.append(path)
+        return pending
+
+    def warm_up(self, classifier, paths=None, batch_size=PREDICTION_TABLE_BATCH_SIZE):
+        """
+        Clasifica por lotes las imágenes que falten y guarda la tabla.
+
+        Args:
+            classifier: FlowerClassifier con el modelo de esta tabla
+            paths: Rutas a clasificar (por defecto, los conjuntos de la simulación)
+            batch_size: Imágenes por llamada a predict_batch
+
+        Returns:
+            Número de imágenes clasificadas
+        """
+        paths = self.missing(pool_images() if paths is None else paths)
+        if not paths:
+            return 0
+        Logger.log(f"Precalculando predicciones de {len(paths)} imágenes...")
+        for start in range(0, len(paths), batch_size):
+            chunk = paths[start:start + batch_size]
+            predictions = classifier.predict_batch(chunk, batch_size, use_table=False)
+            with self._lock:
+                for path, (label, confidence) in zip(chunk, predictions):
+                    if label == "unknown":
+                        continue  # No se pudo leer: no se guarda
+                    try:
+                        mtime = os.stat(path).st_mtime_ns
+                    except OSError:
+                        continue
+                    key = self._key(path)
+                    self.entries[key] = (label, confidence, mtime)
+                    self._fresh[key] = (label, confidence)
+        self.save()
+        Logger.log(f"Tabla de predicciones lista: {len(self.entries)} imágenes")
+        return len(paths)
+
+    def warm_up_background(self, classifier, paths=None):
+        """Ejecuta warm_up en un hilo de fondo; las consultas funcionan mientras tanto."""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._thread = threading.Thread(
+            target=self.warm_up, args=(classifier, paths), daemon=True, name="prediction-table"
+        )
+        self._thread.start()
+        return self._thread
@@ -0,0 +1,123 @@
+"""
+Cuantización INT8 del clasificador para inferencia en CPU.
+
+- 'dynamic': las capas lineales (la cabeza `fc` / `classifier`) guardan los
+  pesos en int8 y cuantizan las activaciones al vuelo. No necesita datos.
+- 'static': cuantización post-entrenamiento de toda la red base con el modo
+  FX de PyTorch; los rangos de las activaciones se calibran pasando un
+  conjunto de imágenes reales antes de convertir.
+
+Un modelo cuantizado no se puede reconstruir solo con su state_dict, así que
+el checkpoint guarda también el modo y el motor; load_quantized() rehace la
+misma estructura sobre un modelo float32 nuevo y después carga los pesos.
+"""
+import copy
+import os
+import torch
+import torch.nn as nn
+from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+from config import *
+from utils import Logger
+
+
+QUANTIZATION_MODES = ('dynamic', 'static')
+
+
+def quantized_model_path(model_path, mode):
+    """Ruta del checkpoint cuantizado junto al float32: flower_classifier_int8_static.pth."""
+    return f"{os.path.splitext(model_path)[0]}_int8_{mode}.pth"
+
+
+def _check_mode(mode):
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Modo de cuantización desconocido: {mode} (opciones: {', '.join(QUANTIZATION_MODES)})")
+
+
+def _set_engine(backend):
+    if backend not in torch.backends.quantized.supported_engines:
+        raise RuntimeError(f"Motor de cuantización no disponible: {backend}")
+    torch.backends.quantized.engine = backend
+
+
+def _prepare_static(model, backend):
+    """Inserta los observadores en la red base (el softmax queda en float)."""
+    example = torch.randn(1, 3, IMAGE_SIZE, IMAGE_SIZE)
+    model.backbone = prepare_fx(model.backbone, get_default_qconfig_mapping(backend), (example,))
+    return model
+
+
+def quantize_model(model, mode, calibration_batches=None, backend=QUANTIZATION_BACKEND):
+    """
+    Cuantiza una copia de un VisionTransformerClassifier float32.
+
+    Args:
+        model: Modelo float32 (no se modifica)
+        mode: 'dynamic' o 'static'
+        calibration_batches: Tensores (n, 3, IMAGE_SIZE, IMAGE_SIZE) para
+            calibrar; obligatorios en modo 'static'
+        backend: Motor de cuantización de PyTorch
+
+    Returns:
+        Modelo cuantizado en CPU y en modo evaluación
+    """
+    _check_mode(mode)
+    _set_engine(backend)
+    model = copy.deepcopy(model).cpu().eval()
+    if mode == 'dynamic':
+        return quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+    if not calibration_batches:
+        raise ValueError("La cuantización estática necesita imágenes de calibración")
+    _prepare_static(model, backend)
+    images = 0
+    with torch.inference_mode():
+        for batch in calibration_batches:
+            model(batch)
+            images += len(batch)
+    model.backbone = convert_fx(model.backbone)
+    Logger.log(f"Cuantización estática calibrada con {images} imágenes")
+    return model
+
+
+def save_quantized(model, path, mode, backbone, backend=QUANTIZATION_BACKEND):
+    """Guarda un modelo cuantizado junto con lo necesario para reconstruirlo."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    torch.save({
+        'quantization': mode,
+        'backbone': backbone,
+        'backend': backend,
+        'state_dict': model.state_dict(),
+    }, path)
+    Logger.log(f"Modelo cuantizado ({mode}) guardado en {path}")
+
+
+def load_quantized(model, path, mode):
+    """
+    Carga un checkpoint cuantizado sobre un modelo float32 recién creado.
+
+    Args:
+        model: VisionTransformerClassifier float32 con la misma red base
+        path: Checkpoint de save_quantized()
+        mode: Modo esperado ('dynamic' o 'static')
+
+    Returns:
+        Modelo cuantizado en CPU y en modo evaluación
+    """
+    _check_mode(mode)
+    checkpoint = torch.load(path, map_location='cpu')
+    if checkpoint['quantization'] != mode:
+        raise ValueError(f"{path} es un modelo '{checkpoint['quantization']}', no '{mode}'")
+    if checkpoint['backbone'] != model.backbone_name:
+        raise ValueError(f"{path} es de la red base {checkpoint['backbone']}, no {model.backbone_name}")
+
+    _set_engine(checkpoint['backend'])
+    model = model.cpu().eval()
+    if mode == 'dynamic':
+        model = quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    else:
+        # Misma estructura que al exportar; las escalas salen del state_dict
+        _prepare_static(model, checkpoint['backend'])
+        model.backbone = convert_fx(model.backbone)
+    model.load_state_dict(checkpoint['state_dict'])
+    return model
@@ -0,0 +1,127 @@
+"""
+Exporta las variantes INT8 del clasificador y las compara con el modelo
+float32: latencia, aceleración, tamaño del checkpoint, precisión sobre las
+imágenes de la simulación y coincidencia con las predicciones float32.
+
+- dynamic: capas lineales en int8 (sin calibración)
+- static: toda la red base en int8, calibrada con una muestra de TRAIN_DIR
+
+Los checkpoints se guardan junto al float32 (flower_classifier_int8_<modo>.pth)
+y se usan poniendo QUANTIZATION = 'dynamic' o 'static' en config.py.
+
+Uso:
+    python quantize_model.py
+    python quantize_model.py --backbone resnet18 --modes static --calibration 128
+"""
+import argparse
+import os
+import sys
+import numpy as np
+import torch
+from config import *
+from benchmark_backbones import labeled_images, time_forward
+from flower_classifier import BACKBONES, FlowerClassifier, FlowerDataset, model_path_for
+from quantization import QUANTIZATION_MODES, quantize_model, quantized_model_path, save_quantized
+from utils import Logger
+
+
+def calibration_batches(classifier, count, batch_size=BATCH_SIZE, seed=0):
+    """
+    Muestra aleatoria de TRAIN_DIR ya preprocesada, en lotes.
+
+    Returns:
+        Lista de tensores (n, 3, IMAGE_SIZE, IMAGE_SIZE)
+    """
+    dataset = FlowerDataset(TRAIN_DIR, transform=classifier.transform, apply_augmentation=False)
+    paths = [path for path, _ in dataset.samples]
+    rng = np.random.default_rng(seed)
+    chosen = [paths[i] for i in rng.permutation(len(paths))[:count]]
+    tensors = [t for t in classifier.preprocess(chosen) if t is not None]
+    return [torch.stack(tensors[i:i + batch_size]) for i in range(0, len(tensors), batch_size)]
+
+
+def evaluate_variant(classifier, images, labels, runs, batch_size):
+    """
+    Mide un clasificador ya cargado.
+
+    Returns:
+        Dict con latency_ms, throughput, accuracy y predictions
+    """
+    classifier.prepare()
+    single = torch.randn(1, 3, IMAGE_SIZE, IMAGE_SIZE, device=classifier.device)
+    batch = torch.randn(batch_size, 3, IMAGE_SIZE, IMAGE_SIZE, device=classifier.device)
+    result = {
+        'latency_ms': time_forward(classifier.model, single, runs) * 1000,
+        'throughput': batch_size / time_forward(classifier.model, batch, runs),
+        'accuracy': None,
+        'predictions': None,
+    }
+    if len(images):
+        classes, _, valid = classifier.predict_arrays(images, batch_size)
+        classes[~valid] = -1
+        result['predictions'] = classes
+        result['accuracy'] = 100.0 * float((classes[valid] == labels[valid]).mean()) if valid.any() else None
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cuantización INT8 del clasificador y comparación con float32")
+    parser.add_argument('--backbone', choices=list(BACKBONES), default=BACKBONE)
+    parser.add_argument('--model-path', default=None, help="Checkpoint float32 (por defecto el de la red base)")
+    parser.add_argument('--modes', nargs='+', choices=QUANTIZATION_MODES, default=list(QUANTIZATION_MODES))
+    parser.add_argument('--calibration', type=int, default=QUANTIZATION_CALIBRATION_IMAGES, help="Imágenes de calibración")
+    parser.add_argument('--backend', default=QUANTIZATION_BACKEND, help="Motor de cuantización de PyTorch")
+    parser.add_argument('--runs', type=int, default=10, help="Pasadas cronometradas por medida")
+    parser.add_argument('--batch-size', type=int, default=PREDICT_BATCH_SIZE)
+    parser.add_argument('--eval-limit', type=int, default=None, help="Máximo de imágenes para medir la precisión")
+    parser.add_argument('--verbose', action='store_true', help="Mostrar los mensajes INFO")
+    args = parser.parse_args()
+
+    Logger.quiet = not args.verbose
+    model_path = args.model_path or model_path_for(args.backbone)
+    reference = FlowerClassifier(model_path=model_path, backbone=args.backbone, quantization=None)
+    if not reference.load_model():
+        Logger.log(f"Se necesita un modelo float32 entrenado en {model_path} (python train_model.py)", "ERROR")
+        return 1
+
+    images, labels = labeled_images()
+    if args.eval_limit is not None and args.eval_limit < len(images):
+        keep = np.linspace(0, len(images) - 1, args.eval_limit).astype(int)
+        images, labels = [images[i] for i in keep], labels[keep]
+
+    # Exportar las variantes
+    variants = [('float32', model_path, reference)]
+    for mode in args.modes:
+        batches = calibration_batches(reference, args.calibration) if mode == 'static' else None
+        quantized = quantize_model(reference.model, mode, batches, args.backend)
+        path = quantized_model_path(model_path, mode)
+        save_quantized(quantized, path, mode, args.backbone, args.backend)
+        # Se vuelve a cargar desde disco, como lo hará la simulación
+        classifier = FlowerClassifier(model_path=path, backbone=args.backbone, quantization=mode)
+        if not classifier.load_model():
+            Logger.log(f"No se pudo recargar {path}", "ERROR")
+            return 1
+        variants.append((mode, path, classifier))
+
+    # Comparar
+    print(f"\n{args.backbone} en CPU ({torch.get_num_threads()} hilos), {len(images)} imágenes de evaluación\n")
+    print(f"{'Variante':<10} {'Tamaño':>9} {'Latencia':>10} {'Acelera':>8} {'Rendimiento':>13} "
+          f"{'Precisión':>10} {'Δ prec.':>8} {'Coincide':>9}")
+    base = None
+    for name, path, classifier in variants:
+        r = evaluate_variant(classifier, images, labels, args.runs, args.batch_size)
+        if base is None:
+            base = r
+        size = os.path.getsize(path) / 2**20
+        accuracy = f"{r['accuracy']:.1f}%" if r['accuracy'] is not None else "-"
+        delta = (f"{r['accuracy'] - base['accuracy']:+.1f}"
+                 if r['accuracy'] is not None and base['accuracy'] is not None else "-")
+        agreement = (f"{100.0 * float((r['predictions'] == base['predictions']).mean()):.1f}%"
+                     if r['predictions'] is not None else "-")
+        print(f"{name:<10} {size:>7.1f}MB {r['latency_ms']:>8.1f}ms {base['latency_ms'] / r['latency_ms']:>7.2f}x "
+              f"{r['throughput']:>9.1f} i/s {accuracy:>10} {delta:>8} {agreement:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,8 @@
 Algoritmos de búsqueda: BFS y DFS con modos de exploración y óptimo.
 Implementa ambos algoritmos con visualización paso a paso.
 """
-from collections import deque
+from collections import deque, OrderedDict
+from config import *
 from utils import Logger
 
 
@@ -23,12 +24,35 @@ class SearchAlgorithm:
         self.path = []
         self.parent_map = {}  # Para reconstruir el camino
         self.graph = None  # Para usar con algoritmo de bfs_chida.py
+        self._graph_version = None  # structure_version con la que se construyó el grafo
+        
+        # El grafo solo depende de los obstáculos: se parchea con los cambios estructurales
+        grid_world.subscribe(self._on_structure_change, (STRUCTURE_CHANGE,))
+    
+    def _on_structure_change(self, kind, positions, version):
+        """Suscriptor de GridWorld: actualiza solo las entradas del grafo afectadas."""
+        if positions is None or self.graph is None or self._graph_version != version - 1:
+            self.graph = None
+            return
+        for x, y in positions:
+            for pos in ((x, y), (x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)):
+                if self.grid_world.is_walkable(pos):
+                    self.graph[pos] = self.grid_world.get_neighbors(pos)
+                else:
+                    self.graph.pop(pos, None)
+        self._graph_version = version
     
     def _build_graph(self):
         """
         Construye el grafo desde grid_world para usar con bfs_meta/dfs_meta.
         Convierte la estructura de GridWorld al formato de diccionario usado en bfs_chida.py
+        
+        El grafo se memoiza por structure_version: mover la abeja no lo invalida
+        y los eventos de obstáculos lo parchean celda a celda.
         """
+        if self.graph is not None and self._graph_version == self.grid_world.structure_version:
+            return self.graph
+        
         graph = {}
         size = self.grid_world.size
         
@@ -38,6 +62,8 @@ class SearchAlgorithm:
                     neighbors = self.grid_world.get_neighbors((i, j))
                     graph[(i, j)] = neighbors
         
+        self.graph = graph
+        self._graph_version = self.grid_world.structure_version
         return graph
     
     def search(self, start, goal):
@@ -350,13 +376,19 @@ class PathFinder:
     """
     Clase unificadora para gestionar algoritmos de búsqueda.
     Facilita el cambio entre BFS y DFS.
+    
+    Los resultados de find_path se cachean junto con la versión del mundo;
+    en mundos dinámicos un resultado solo se descarta si algún evento cambió
+    la transitabilidad de una celda explorada o vecina de una explorada.
     """
     
-    def __init__(self, grid_world):
+    def __init__(self, grid_world, cache_size=PATH_CACHE_SIZE):
         self.grid_world = grid_world
         self.bfs = BFSSearch(grid_world)
         self.dfs = DFSSearch(grid_world)
         self.current_algorithm = None
+        self.cache_size = cache_size
+        self._cache = OrderedDict()  # (algoritmo, inicio, meta, modo) -> resultado
     
     def set_algorithm(self, algorithm_type):
         """
@@ -390,7 +422,135 @@ class PathFinder:
             Logger.log("No se ha establecido un algoritmo", "ERROR")
             return [], set(), 0
         
-        return self.current_algorithm.search(start, goal, mode)
+        key = (self.current_algorithm.algorithm_name, start, goal, mode)
+        entry = self._cache.get(key)
+        if entry is not None and self._is_still_valid(entry):
+            self._cache.move_to_end(key)
+            Logger.log(f"Camino en caché para {start} -> {goal} (versión {entry['version']})")
+            return entry['path'], entry['explored'], entry['steps']
+        
+        path, explored, steps = self.current_algorithm.search(start, goal, mode)
+        self._cache[key] = {
+            'path': path,
+            'explored': explored,
+            'steps': steps,
+            'version': self.grid_world.structure_version,
+            'depends': None,
+        }
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return path, explored, steps
+    
+    def _is_still_valid(self, entry):
+        """
+        Comprueba si un resultado cacheado sigue valiendo en la versión actual.
+        Solo se recorren los cambios de transitabilidad ocurridos desde entonces.
+        """
+        world = self.grid_world
+        if entry['version'] == world.structure_version:
+            return True
+        changes = world.walkability_changes_since(entry['version'])
+        if changes is None:
+            return False
+        if changes:
+            if entry['depends'] is None:
+                # La búsqueda depende de las celdas exploradas y de sus vecinos
+                depends = set(entry['explored'])
+                for x, y in entry['explored']:
+                    depends.update(((x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)))
+                entry['depends'] = depends
+            if not changes.isdisjoint(entry['depends']):
+                return False
+        entry['version'] = world.structure_version
+        return True
+    
+    def clear_cache(self):
+        """Descarta todos los caminos cacheados."""
+        self._cache.clear()
+    
+    def repair_path(self, path, index, version):
+        """
+        Repara el resto de un camino si algún evento posterior a `version` lo bloqueó.
+        
+        Si ningún cambio toca el camino se retorna el mismo. Si no, cada tramo
+        bloqueado se sustituye por un desvío local (BFS acotado entre la celda
+        anterior y la siguiente libre) y, si no hay desvío, se replanifica
+        desde la posición actual. Las celdas que se abren no acortan el camino.
+        
+        Args:
+            path: Camino completo (lista de posiciones)
+            index: Índice en path de la posición actual de la abeja
+            version: structure_version del mundo con la que se validó el camino
+            
+        Returns:
+            Tupla (camino, versión). El camino conserva path[:index + 1]; si la
+            meta quedó inalcanzable termina en la posición actual.
+        """
+        world = self.grid_world
+        if version == world.structure_version or not path:
+            return path, world.structure_version
+        
+        changes = world.walkability_changes_since(version)
+        remaining = path[index:]
+        if changes is not None:
+            blocked = {pos for pos in changes if not world.is_walkable(pos)}
+            if blocked.isdisjoint(remaining):
+                return path, world.structure_version
+        else:
+            blocked = {pos for pos in remaining if not world.is_walkable(pos)}
+            if not blocked:
+                return path, world.structure_version
+        
+        repaired = list(remaining)
+        position = 1
+        while position < len(repaired):
+            if repaired[position] not in blocked:
+                position += 1
+                continue
+            # Tramo bloqueado [position, end): buscar un desvío hasta repaired[end]
+            end = position
+            while end < len(repaired) and not world.is_walkable(repaired[end]):
+                end += 1
+            detour = self._local_detour(repaired[position - 1], repaired[end]) if end < len(repaired) else None
+            if detour is None:
+                Logger.log(f"Camino bloqueado en {repaired[position]}; replanificando", "WARNING")
+                return self._replan(path, index, remaining[-1]), world.structure_version
+            repaired[position - 1:end + 1] = detour
+            position += len(detour) - 1
+        
+        Logger.log(f"Camino reparado con desvío local ({len(remaining)} -> {len(repaired)} celdas)")
+        return path[:index] + repaired, world.structure_version
+    
+    def _local_detour(self, start, goal, max_nodes=PATH_REPAIR_MAX_NODES):
+        """BFS acotado a max_nodes expansiones; retorna [start, ..., goal] o None."""
+        parent = {start: None}
+        queue = deque([start])
+        expanded = 0
+        while queue and expanded < max_nodes:
+            node = queue.popleft()
+            expanded += 1
+            if node == goal:
+                detour = []
+                while node is not None:
+                    detour.append(node)
+                    node = parent[node]
+                return detour[::-1]
+            for neighbor in self.grid_world.get_neighbors(node):
+                if neighbor not in parent:
+                    parent[neighbor] = node
+                    queue.append(neighbor)
+        return None
+    
+    def _replan(self, path, index, goal):
+        """Busca un camino nuevo desde path[index] hasta goal con el algoritmo actual."""
+        current = path[index]
+        algorithm = self.current_algorithm or self.bfs
+        if not self.grid_world.is_connected(current, goal):
+            Logger.log(f"La meta {goal} ya no es alcanzable desde {current}", "WARNING")
+            return path[:index + 1]
+        new_path, _, _ = algorithm.search(current, goal, 'optimal')
+        return path[:index] + new_path
     
     def find_path_animated(self, start, goal, mode='exploration'):
         """
@@ -0,0 +1,98 @@
+"""
+Clase SimulationClock - Reloj de la simulación con aceleración de tiempo.
+Los retardos de la animación (SEARCH_DELAY, ANALYSIS_DELAY) se expresan en
+segundos simulados; el reloj los convierte a tiempo real según el modo:
+tiempo real, acelerado (x10, x100) o sin límite. El render sigue muestreando
+el estado a FPS mientras la simulación avanza tan rápido como se le permita.
+"""
+import threading
+import time
+from config import *
+
+
+# Nombre del modo -> factor de aceleración (None = sin límite, no espera nunca)
+CLOCK_MODES = {
+    'Tiempo real': 1.0,
+    'x10': 10.0,
+    'x100': 100.0,
+    'Sin límite': None,
+}
+
+
+class SimulationClock:
+    """
+    Reloj compartido por la animación y el agente.
+
+    El modo se puede cambiar en cualquier momento desde otro hilo (panel de
+    Tkinter): una espera en curso se recalcula con la nueva velocidad en
+    lugar de terminar el retardo anterior.
+    """
+
+    def __init__(self, mode=CLOCK_MODE):
+        """
+        Inicializa el reloj.
+
+        Args:
+            mode: Clave de CLOCK_MODES
+        """
+        self._condition = threading.Condition()
+        self.mode = None
+        self.speed = None
+        self.sim_time = 0.0       # Segundos simulados transcurridos
+        self._last_frame = 0.0    # Último instante real en que frame_due() devolvió True
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        """
+        Cambia el modo del reloj (despierta las esperas en curso).
+
+        Args:
+            mode: Clave de CLOCK_MODES
+        """
+        if mode not in CLOCK_MODES:
+            raise ValueError(f"Modo de reloj desconocido: {mode}")
+        with self._condition:
+            self.mode = mode
+            self.speed = CLOCK_MODES[mode]
+            self._condition.notify_all()
+
+    @property
+    def throttled(self):
+        """True si el reloj introduce esperas reales."""
+        return self.speed is not None
+
+    def wait(self, seconds):
+        """
+        Avanza `seconds` segundos simulados, esperando el tiempo real que
+        corresponda al modo actual.
+
+        Args:
+            seconds: Retardo en segundos simulados
+        """
+        remaining = seconds
+        with self._condition:
+            while remaining > 0 and self.speed is not None:
+                speed = self.speed
+                start = time.perf_counter()
+                self._condition.wait(remaining / speed)
+                remaining -= (time.perf_counter() - start) * speed
+            self.sim_time += seconds
+
+    def frame_due(self):
+        """
+        Indica si conviene publicar una actualización de la interfaz.
+        En tiempo real siempre; en los modos acelerados como mucho una vez
+        por frame (1/FPS segundos reales), para no saturar la cola de Tkinter.
+        """
+        if self.speed == 1.0:
+            return True
+        now = time.perf_counter()
+        if now - self._last_frame >= 1.0 / FPS:
+            self._last_frame = now
+            return True
+        return False
+
+    def reset(self):
+        """Pone a cero el tiempo simulado (al iniciar una simulación)."""
+        with self._condition:
+            self.sim_time = 0.0
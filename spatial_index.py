@@ -0,0 +1,148 @@
+"""
+Índice espacial por cubetas (grid buckets) para consultas de vecindad.
+Permite buscar flores u objetos dentro de un radio o los k más cercanos
+sin recorrer todas las posiciones del mundo.
+"""
+import heapq
+import math
+
+
+def _distance(pos1, pos2, metric):
+    """Distancia entre dos celdas según la métrica ('manhattan' o 'euclidean')."""
+    dx = abs(pos1[0] - pos2[0])
+    dy = abs(pos1[1] - pos2[1])
+    if metric == 'euclidean':
+        return math.sqrt(dx * dx + dy * dy)
+    return dx + dy
+
+
+class GridBucketIndex:
+    """
+    Índice de posiciones agrupadas en cubetas cuadradas de `bucket_size` celdas.
+
+    - add/remove/contains en O(1)
+    - within_radius recorre solo las cubetas que intersectan el radio
+    - nearest recorre anillos de cubetas alrededor del punto hasta asegurar
+      que ningún anillo más lejano puede mejorar el resultado
+    """
+
+    def __init__(self, bucket_size=8):
+        """
+        Inicializa el índice.
+
+        Args:
+            bucket_size: Lado de cada cubeta en celdas
+        """
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        self.count = 0
+
+    def _bucket_of(self, position):
+        return (position[0] // self.bucket_size, position[1] // self.bucket_size)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, position):
+        bucket = self.buckets.get(self._bucket_of(position))
+        return bucket is not None and position in bucket
+
+    def __iter__(self):
+        for bucket in self.buckets.values():
+            yield from bucket
+
+    def clear(self):
+        """Elimina todas las posiciones."""
+        self.buckets = {}
+        self.count = 0
+
+    def add(self, position):
+        """Añade una posición (ignora duplicados)."""
+        bucket = self.buckets.setdefault(self._bucket_of(position), set())
+        if position not in bucket:
+            bucket.add(position)
+            self.count += 1
+
+    def remove(self, position):
+        """Elimina una posición si existe."""
+        key = self._bucket_of(position)
+        bucket = self.buckets.get(key)
+        if bucket is not None and position in bucket:
+            bucket.remove(position)
+            self.count -= 1
+            if not bucket:
+                del self.buckets[key]
+
+    def within_radius(self, position, radius, metric='manhattan'):
+        """
+        Posiciones a distancia <= radius, ordenadas de la más cercana a la más lejana.
+
+        Args:
+            position: Centro de la búsqueda (x, y)
+            radius: Radio máximo
+            metric: 'manhattan' o 'euclidean'
+
+        Returns:
+            Lista de tuplas (x, y)
+        """
+        x, y = position
+        reach = int(math.floor(radius))
+        first_bx, first_by = self._bucket_of((x - reach, y - reach))
+        last_bx, last_by = self._bucket_of((x + reach, y + reach))
+
+        found = []
+        for bx in range(first_bx, last_bx + 1):
+            for by in range(first_by, last_by + 1):
+                bucket = self.buckets.get((bx, by))
+                if not bucket:
+                    continue
+                for candidate in bucket:
+                    distance = _distance(position, candidate, metric)
+                    if distance <= radius:
+                        found.append((distance, candidate))
+
+        found.sort()
+        return [candidate for _, candidate in found]
+
+    def nearest(self, position, k=1, metric='manhattan'):
+        """
+        Las k posiciones más cercanas, ordenadas por distancia.
+
+        Args:
+            position: Centro de la búsqueda (x, y)
+            k: Número de posiciones a retornar
+            metric: 'manhattan' o 'euclidean'
+
+        Returns:
+            Lista de tuplas (x, y) (puede tener menos de k si el índice es pequeño)
+        """
+        if k <= 0 or self.count == 0:
+            return []
+
+        center_bx, center_by = self._bucket_of(position)
+        best = []  # Max-heap (distancia negada) con los k mejores candidatos
+        visited_buckets = 0
+        ring = 0
+
+        while visited_buckets < len(self.buckets):
+            # Cualquier celda del anillo `ring` está al menos a (ring - 1) * bucket_size + 1
+            if len(best) == k and ring > 0 and -best[0][0] < (ring - 1) * self.bucket_size + 1:
+                break
+
+            for bx in range(center_bx - ring, center_bx + ring + 1):
+                for by in range(center_by - ring, center_by + ring + 1):
+                    if max(abs(bx - center_bx), abs(by - center_by)) != ring:
+                        continue
+                    bucket = self.buckets.get((bx, by))
+                    if not bucket:
+                        continue
+                    visited_buckets += 1
+                    for candidate in bucket:
+                        entry = (-_distance(position, candidate, metric), candidate)
+                        if len(best) < k:
+                            heapq.heappush(best, entry)
+                        elif entry > best[0]:
+                            heapq.heapreplace(best, entry)
+            ring += 1
+
+        return [candidate for _, candidate in sorted(best, key=lambda entry: (-entry[0], entry[1]))]
@@ -0,0 +1,127 @@
+"""
+Clase SpriteAtlas - Caché de sprites compartida por todo el proceso.
+Las imágenes de assets/ se cargan una sola vez, se convierten al formato de
+la pantalla para blits rápidos y se escalan una vez por tamaño de celda,
+aunque se creen y destruyan muchos GridWorld.
+"""
+from collections import OrderedDict
+import pygame
+from config import *
+from utils import Logger
+
+
+# Archivo y color de respaldo de cada sprite
+SPRITE_SOURCES = {
+    'bee': (SPRITE_BEE, COLOR_YELLOW),
+    'hive': (SPRITE_HIVE, COLOR_ORANGE),
+    'tree': (SPRITE_TREE, (139, 69, 19)),     # Marrón
+    'flower': (SPRITE_FLOWER, (255, 105, 180)),  # Rosa
+    'object': (SPRITE_OBJECT, COLOR_BLUE),    # Azul para objetos
+}
+
+
+class SpriteAtlas:
+    """
+    Sprites indexados por (nombre, tamaño de celda).
+
+    - Las imágenes originales se leen del disco la primera vez que se piden
+    - Cada tamaño se escala desde la imagen original (no desde otro tamaño ya escalado)
+    - Solo se guardan los últimos `max_sizes` tamaños usados (niveles de zoom)
+    """
+
+    def __init__(self, sources=SPRITE_SOURCES, max_sizes=SPRITE_CACHE_SIZES):
+        """
+        Inicializa el atlas (no carga nada hasta el primer uso).
+
+        Args:
+            sources: Dict nombre -> (ruta de la imagen, color de respaldo)
+            max_sizes: Número máximo de tamaños de celda cacheados
+        """
+        self.sources = sources
+        self.max_sizes = max_sizes
+        self._originals = {}
+        self._scaled = OrderedDict()  # tamaño -> {nombre: Surface}
+        self._converted = False
+
+    def _load_original(self, name):
+        """Carga una imagen original, o un cuadrado de color si no se puede leer."""
+        path, color = self.sources[name]
+        try:
+            surface = pygame.image.load(path)
+        except Exception as e:
+            Logger.log(f"Error cargando sprite '{name}' ({path}): {e}", "ERROR")
+            surface = pygame.Surface((CELL_SIZE, CELL_SIZE))
+            surface.fill(color)
+        return self._convert(surface)
+
+    def _convert(self, surface):
+        """Convierte al formato de la pantalla si ya hay una ventana abierta."""
+        if pygame.display.get_surface() is None:
+            return surface
+        if surface.get_flags() & pygame.SRCALPHA:
+            return surface.convert_alpha()
+        return surface.convert()
+
+    def _check_display(self):
+        """
+        Si los sprites se cargaron antes de abrir la ventana, se convierten
+        al aparecer esta (los tamaños escalados se regeneran).
+        """
+        if self._converted or pygame.display.get_surface() is None:
+            return
+        self._originals = {name: self._convert(surface) for name, surface in self._originals.items()}
+        self._scaled.clear()
+        self._converted = True
+
+    def original(self, name):
+        """Imagen original (sin escalar) de un sprite."""
+        self._check_display()
+        if name not in self._originals:
+            self._originals[name] = self._load_original(name)
+        return self._originals[name]
+
+    def sprites_for(self, cell_size):
+        """
+        Todos los sprites escalados a un tamaño de celda.
+
+        Args:
+            cell_size: Lado de la celda en píxeles
+
+        Returns:
+            Dict nombre -> pygame.Surface de cell_size x cell_size
+        """
+        self._check_display()
+        sprites = self._scaled.get(cell_size)
+        if sprites is not None:
+            self._scaled.move_to_end(cell_size)
+            return sprites
+
+        sprites = {}
+        for name in self.sources:
+            scaled = pygame.transform.scale(self.original(name), (cell_size, cell_size))
+            sprites[name] = self._convert(scaled)
+        self._scaled[cell_size] = sprites
+        while len(self._scaled) > self.max_sizes:
+            self._scaled.popitem(last=False)
+        return sprites
+
+    def get(self, name, cell_size=CELL_SIZE):
+        """Un sprite escalado a un tamaño de celda."""
+        return self.sprites_for(cell_size)[name]
+
+    def clear(self):
+        """Descarta todas las imágenes cargadas (se recargan en el próximo uso)."""
+        self._originals = {}
+        self._scaled.clear()
+        self._converted = False
+
+
+_shared_atlas = None
+
+
+def get_sprite_atlas():
+    """Atlas compartido por todos los GridRenderer del proceso (se crea bajo demanda)."""
+    global _shared_atlas
+    if _shared_atlas is None:
+        _shared_atlas = SpriteAtlas()
+    return _shared_atlas
@@ -0,0 +1,352 @@
+"""
+Motor de enjambre - Simula cientos o miles de abejas sobre el mismo GridWorld.
+El estado de todas las abejas (posiciones, objetivos, pasos, estadísticas)
+vive en arreglos de NumPy y cada tick avanza a todas a la vez con operaciones
+vectorizadas. Cada objetivo tiene un campo de distancias (BFS sobre la
+cuadrícula) compartido por todas las abejas que van hacia él, y las
+detecciones de todas las abejas se clasifican en una sola llamada por lotes.
+
+Uso:
+    python swarm.py --bees 1000 --ticks 200
+"""
+import argparse
+import random
+import time
+import numpy as np
+from config import *
+from detection_log import DetectionLog
+from grid_world import GridWorld
+from utils import Logger, image_catalog
+
+
+UNREACHABLE = np.iinfo(np.int32).max  # Distancia de las celdas sin camino al objetivo
+
+# Desplazamientos de los 4 vecinos: Arriba, Derecha, Abajo, Izquierda
+NEIGHBOR_OFFSETS = np.array([(-1, 0), (0, 1), (1, 0), (0, -1)], dtype=np.int32)
+
+
+def distance_fields(walkable, targets):
+    """
+    Distancias (en pasos) de cada celda transitable a cada objetivo: BFS
+    vectorizado que expande a la vez la frontera de todos los objetivos.
+
+    Args:
+        walkable: Matriz booleana de celdas transitables
+        targets: Lista de posiciones (fila, columna)
+
+    Returns:
+        Arreglo int32 (len(targets), filas, columnas) con UNREACHABLE en
+        obstáculos y celdas sin camino
+    """
+    count = len(targets)
+    distances = np.full((count,) + walkable.shape, UNREACHABLE, dtype=np.int32)
+    frontier = np.zeros(distances.shape, dtype=bool)
+    for i, target in enumerate(targets):
+        if walkable[tuple(target)]:
+            frontier[(i,) + tuple(target)] = True
+    distances[frontier] = 0
+    unvisited = np.broadcast_to(walkable, distances.shape) & ~frontier
+    grown = np.empty_like(frontier)
+    step = 0
+    while frontier.any():
+        step += 1
+        grown[:] = False
+        grown[:, 1:, :] |= frontier[:, :-1, :]
+        grown[:, :-1, :] |= frontier[:, 1:, :]
+        grown[:, :, 1:] |= frontier[:, :, :-1]
+        grown[:, :, :-1] |= frontier[:, :, 1:]
+        np.logical_and(grown, unvisited, out=frontier)
+        distances[frontier] = step
+        unvisited &= ~frontier
+    return distances
+
+
+class SwarmEngine:
+    """
+    Enjambre de abejas con estado vectorizado.
+
+    Las abejas bajan por el campo de distancias de su objetivo (el vecino con
+    menor distancia, desempatando al azar para que no sigan todas el mismo
+    camino). Al llegar eligen otro objetivo del conjunto (flores y colmena)
+    si `retarget` está activo, o se quedan quietas.
+
+    El motor se suscribe a los cambios del mundo; close() (o un bloque
+    `with`) cancela la suscripción cuando el mundo sobrevive al enjambre.
+    """
+
+    def __init__(self, grid_world, num_bees=SWARM_SIZE, classifier=None, seed=None,
+                 retarget=True, max_targets=SWARM_MAX_TARGETS, log_dir=None):
+        """
+        Inicializa el enjambre (las abejas se colocan con spawn()).
+
+        Args:
+            grid_world: Instancia de GridWorld (ya inicializada)
+            num_bees: Número de abejas
+            classifier: Instancia de FlowerClassifier (opcional). Sin clasificador
+                se registran las detecciones pero no se clasifican imágenes.
+            seed: Semilla del generador aleatorio
+            retarget: Si es True las abejas eligen un objetivo nuevo al llegar
+            max_targets: Máximo de objetivos distintos (un campo de distancias por objetivo)
+            log_dir: Directorio donde volcar detection_log (None = solo en memoria)
+        """
+        self.grid_world = grid_world
+        self.num_bees = num_bees
+        self.classifier = classifier
+        self.rng = np.random.default_rng(seed)
+        self.retarget = retarget
+        self.max_targets = max_targets
+
+        # Estado por abeja
+        self.positions = np.zeros((num_bees, 2), dtype=np.int32)
+        self.target_ids = np.zeros(num_bees, dtype=np.int32)   # Índice en self.targets
+        self.cursors = np.zeros(num_bees, dtype=np.int32)      # Pasos dados hacia el objetivo actual
+        self.active = np.ones(num_bees, dtype=bool)            # False = llegó y no busca otro objetivo
+
+        # Estadísticas por abeja (mismo significado que en BeeAgent)
+        self.cells_visited = np.zeros(num_bees, dtype=np.int64)
+        self.flowers_detected = np.zeros(num_bees, dtype=np.int64)
+        self.objects_detected = np.zeros(num_bees, dtype=np.int64)
+        self.arrivals = np.zeros(num_bees, dtype=np.int64)
+        self.detection_log = DetectionLog(directory=log_dir, name='enjambre')
+        self.ticks = 0
+
+        # Objetivos y sus campos de distancias (con borde UNREACHABLE para indexar vecinos)
+        self.targets = []
+        self._fields = None
+
+        # Suscripción al mundo hasta close() (o al salir del bloque `with`)
+        self._subscription = grid_world.subscribe(self._on_structure_change, (STRUCTURE_CHANGE,))
+
+    def close(self):
+        """Deja de escuchar los cambios del mundo y vuelca el registro de detecciones."""
+        if self._subscription is not None:
+            self.grid_world.unsubscribe(self._subscription)
+            self._subscription = None
+        self.detection_log.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _on_structure_change(self, kind, positions, version):
+        """Los obstáculos cambiaron: los campos de distancias se recalculan en el próximo tick."""
+        self._fields = None
+
+    def _default_targets(self):
+        """Colmena y una muestra de las flores del mundo."""
+        world = self.grid_world
+        flowers = list(world.flowers)
+        if len(flowers) > self.max_targets - 1:
+            chosen = self.rng.choice(len(flowers), self.max_targets - 1, replace=False)
+            flowers = [flowers[i] for i in chosen]
+        return [world.hive_pos] + flowers
+
+    def spawn(self, positions=None, targets=None):
+        """
+        Coloca las abejas y asigna sus objetivos.
+
+        Args:
+            positions: Arreglo (num_bees, 2) de posiciones iniciales (por defecto
+                celdas transitables al azar)
+            targets: Lista de posiciones objetivo (por defecto colmena y flores).
+                La abeja i empieza yendo a targets[i % len(targets)].
+        """
+        world = self.grid_world
+        if positions is None:
+            free = np.argwhere(world.content != CELL_OBSTACLE)
+            positions = free[self.rng.integers(len(free), size=self.num_bees)]
+        self.positions[:] = positions
+        self.targets = list(targets) if targets is not None else self._default_targets()
+        self.target_ids[:] = np.arange(self.num_bees) % len(self.targets)
+        self.cursors[:] = 0
+        self.active[:] = True
+        self._fields = None
+        for stats in (self.cells_visited, self.flowers_detected, self.objects_detected, self.arrivals):
+            stats[:] = 0
+        self.detection_log.clear()
+        self.ticks = 0
+
+    def _ensure_fields(self):
+        """Calcula (o recalcula tras un cambio estructural) los campos de distancias."""
+        if self._fields is not None:
+            return
+        walkable = self.grid_world.content != CELL_OBSTACLE
+        size = self.grid_world.size
+        fields = np.full((len(self.targets), size + 2, size + 2), UNREACHABLE, dtype=np.int32)
+        fields[:, 1:-1, 1:-1] = distance_fields(walkable, self.targets)
+        self._fields = fields
+        Logger.log(f"Campos de distancias calculados para {len(self.targets)} objetivos")
+
+    def step(self):
+        """
+        Avanza un tick: todas las abejas activas dan un paso hacia su objetivo
+        y las que pisan una flor u objeto la analizan.
+
+        Returns:
+            Número de abejas que se movieron (pasos de agente del tick)
+        """
+        self._ensure_fields()
+        fields = self._fields
+        rows = self.positions[:, 0] + 1  # Coordenadas en el campo con borde
+        cols = self.positions[:, 1] + 1
+        current = fields[self.target_ids, rows, cols]
+
+        # Distancia de los 4 vecinos de cada abeja: (num_bees, 4)
+        neighbor_rows = rows[:, None] + NEIGHBOR_OFFSETS[:, 0]
+        neighbor_cols = cols[:, None] + NEIGHBOR_OFFSETS[:, 1]
+        candidates = fields[self.target_ids[:, None], neighbor_rows, neighbor_cols].astype(np.int64)
+
+        # Desempate aleatorio entre vecinos igual de cercanos
+        ranked = candidates * 4 + self.rng.integers(0, 4, size=candidates.shape)
+        best = ranked.argmin(axis=1)
+        best_distance = candidates[np.arange(self.num_bees), best]
+        moving = self.active & (best_distance < current)
+
+        moved = np.flatnonzero(moving)
+        self.positions[moved] += NEIGHBOR_OFFSETS[best[moved]]
+        self.cursors[moved] += 1
+        self.cells_visited[moved] += 1
+        self._detect(moved)
+
+        # Llegadas (distancia 0) y abejas sin camino a su objetivo
+        arrived = self.active & (fields[self.target_ids, self.positions[:, 0] + 1, self.positions[:, 1] + 1] == 0)
+        stuck = self.active & ~moving & (current == UNREACHABLE) & (best_distance == UNREACHABLE)
+        self.arrivals[arrived] += 1
+        if self.retarget:
+            reassign = np.flatnonzero(arrived | stuck)
+            if len(reassign):
+                self.target_ids[reassign] = self.rng.integers(len(self.targets), size=len(reassign))
+                self.cursors[reassign] = 0
+        else:
+            self.active &= ~(arrived | stuck)
+
+        self.ticks += 1
+        return len(moved)
+
+    def _detect(self, bees):
+        """
+        Analiza las flores y objetos que pisaron las abejas que se movieron,
+        con una sola llamada por lotes al clasificador.
+        """
+        positions = self.positions[bees]
+        content = self.grid_world.content[positions[:, 0], positions[:, 1]]
+        on_flower = content == CELL_FLOWER
+        on_object = content == CELL_OBJECT
+        detecting = on_flower | on_object
+        if not detecting.any():
+            return
+
+        bees = bees[detecting]
+        positions = positions[detecting]
+        is_flower = on_flower[detecting]
+        ground_truth = np.where(is_flower, 'flor', 'objeto')
+
+        if self.classifier is None:
+            image_paths = [None] * len(bees)
+            predictions = [None] * len(bees)
+            confidences = np.zeros(len(bees), dtype=np.float32)
+            correct = np.zeros(len(bees), dtype=bool)
+        else:
+            image_paths = self._pick_images(is_flower)
+            results = self.classifier.predict_batch([path for path in image_paths if path])
+            results = iter(results)
+            predictions, confidences = zip(*[next(results) if path else (None, 0.0) for path in image_paths])
+            confidences = np.array(confidences, dtype=np.float32)
+            correct = np.array(predictions, dtype=object) == ground_truth
+            # Mismos contadores que BeeAgent: solo las detecciones acertadas
+            np.add.at(self.flowers_detected, bees[correct & is_flower], 1)
+            np.add.at(self.objects_detected, bees[correct & ~is_flower], 1)
+
+        self.detection_log.extend(positions, image_paths, ground_truth, predictions, confidences, correct)
+
+    def _pick_images(self, is_flower):
+        """Una imagen aleatoria por detección según su clase real."""
+        flowers = image_catalog.paths(TEST_DIR)
+        objects = image_catalog.paths(OBJECTS_DIR)
+        picks = self.rng.random(len(is_flower))
+        return [
+            (pool[int(pick * len(pool))] if pool else None)
+            for pool, pick in zip((flowers if flag else objects for flag in is_flower), picks)
+        ]
+
+    def run(self, ticks):
+        """
+        Ejecuta varios ticks.
+
+        Returns:
+            Número total de pasos de agente
+        """
+        return sum(self.step() for _ in range(ticks))
+
+    def get_statistics(self):
+        """
+        Estadísticas agregadas del enjambre.
+
+        Returns:
+            Dict con estadísticas
+        """
+        log = self.detection_log
+        return {
+            'bees': self.num_bees,
+            'ticks': self.ticks,
+            'cells_visited': int(self.cells_visited.sum()),
+            'arrivals': int(self.arrivals.sum()),
+            'flowers_detected': int(self.flowers_detected.sum()),
+            'objects_detected': int(self.objects_detected.sum()),
+            'total_detections': log.total,
+            'correct_detections': log.correct,
+            'detection_accuracy': (log.correct / log.total * 100) if log.total else 0,
+        }
+
+
+def main():
+    """Punto de entrada: mide el rendimiento del enjambre sin pantalla."""
+    parser = argparse.ArgumentParser(description="Enjambre de abejas sin pantalla")
+    parser.add_argument('--bees', type=int, default=SWARM_SIZE, help="Número de abejas")
+    parser.add_argument('--ticks', type=int, default=200, help="Ticks a simular")
+    parser.add_argument('--size', type=int, default=GRID_SIZE, help="Tamaño del mundo (NxN)")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla")
+    parser.add_argument('--dynamic', action='store_true', help="Obstáculos dinámicos en cada tick")
+    parser.add_argument('--classify', action='store_true', help="Clasificar imágenes con el modelo")
+    parser.add_argument('--verbose', action='store_true', help="Mostrar los mensajes INFO")
+    args = parser.parse_args()
+
+    Logger.quiet = not args.verbose
+    random.seed(args.seed)
+    world = GridWorld(args.size)
+    world.initialize_world((0, 0), (args.size - 1, args.size - 1))
+
+    classifier = None
+    if args.classify:
+        from headless_simulation import load_classifier
+        classifier = load_classifier()
+
+    with SwarmEngine(world, args.bees, classifier, seed=args.seed) as swarm:
+        swarm.spawn()
+        events = None
+        if args.dynamic:
+            from world_events import DynamicObstacles
+            events = DynamicObstacles(world, rng=random.Random(args.seed))
+
+        start_time = time.perf_counter()
+        agent_steps = 0
+        for _ in range(args.ticks):
+            if events is not None:
+                world.apply_events(events.step())
+            agent_steps += swarm.step()
+        total_time = time.perf_counter() - start_time
+
+        stats = swarm.get_statistics()
+    print("=" * 60)
+    print(f"Enjambre: {args.bees} abejas, {args.ticks} ticks, mundo {args.size}x{args.size}")
+    print(f"Pasos de agente: {agent_steps} ({agent_steps / max(total_time, 1e-9):,.0f} por segundo)")
+    print(f"Llegadas a objetivos: {stats['arrivals']}")
+    print(f"Detecciones: {stats['total_detections']} (precisión {stats['detection_accuracy']:.2f}%)")
+    print(f"Tiempo total: {total_time:.2f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@ Script de prueba para los algoritmos BFS y DFS mejorados.
 Compara la eficiencia y el comportamiento de ambos algoritmos.
 """
 
-import pygame
 import sys
 from grid_world import GridWorld
 from search_algorithms import BFSSearch, DFSSearch, PathFinder
@@ -16,9 +15,6 @@ def main():
     print("PRUEBA DE ALGORITMOS BFS Y DFS MEJORADOS")
     print("="*60)
     
-    # Inicializar Pygame
-    pygame.init()
-    
     # Crear mundo
     Logger.log("Creando mundo de prueba...")
     world = GridWorld()
@@ -146,7 +142,6 @@ def main():
     ✓ Código más limpio y mantenible
     """)
     
-    pygame.quit()
     print("\nPrueba completada exitosamente! 🐝✨")
 
 if __name__ == "__main__":
@@ -156,5 +151,4 @@ if __name__ == "__main__":
         Logger.log(f"Error en prueba: {e}", "ERROR")
         import traceback
         traceback.print_exc()
-        pygame.quit()
         sys.exit(1)
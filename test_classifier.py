@@ -2,10 +2,41 @@
 Script de prueba simple para verificar que el clasificador funciona
 """
 import os
-from flower_classifier import FlowerClassifier
+import tempfile
+import numpy as np
+import torch
+from PIL import Image
+from flower_classifier import BACKBONES, FlowerClassifier, VisionTransformerClassifier, model_path_for
+from quantization import load_quantized, quantize_model, save_quantized
 from utils import load_random_flower_test_image, load_random_object_image
 from config import TEST_DIR, OBJECTS_DIR
 
+
+def random_weight_classifier(directory):
+    """
+    Clasificador resnet18 con pesos aleatorios guardados en directory, para
+    probar la inferencia sin descargar los pesos preentrenados.
+    """
+    torch.manual_seed(0)
+    path = os.path.join(directory, 'modelo_prueba.pth')
+    model = VisionTransformerClassifier(num_classes=2, pretrained=False, backbone='resnet18')
+    torch.save(model.state_dict(), path)
+    classifier = FlowerClassifier(path, backbone='resnet18')
+    assert classifier.load_model()
+    return classifier
+
+
+def write_test_images(directory, count):
+    """Guarda count imágenes RGB aleatorias en directory y devuelve sus rutas."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f'imagen_{i}.png')
+        Image.fromarray(rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
 def test_classifier():
     print("="*60)
     print("PRUEBA DEL CLASIFICADOR DE FLORES")
@@ -54,10 +85,104 @@ def test_classifier():
     else:
         print("   ✗ No se encontró imagen de objeto")
     
+    # Probar la clasificación por lotes (debe coincidir con predict); con
+    # pesos aleatorios guardados en un temporal para no depender de descargas
+    print("\n4. Probando clasificación por lotes...")
+    with tempfile.TemporaryDirectory() as tmp:
+        local = random_weight_classifier(tmp)
+        images = write_test_images(tmp, 3)
+        batch_results = local.predict_batch(images + [os.path.join(tmp, 'imagen_inexistente.png')])
+        single_results = [local.predict(path) for path in images]
+        for (label, conf), (single_label, single_conf) in zip(batch_results, single_results):
+            assert label == single_label and abs(conf - single_conf) < 1e-4
+        assert batch_results[-1] == ("unknown", 0.0)
+        print(f"   ✓ {len(images)} imágenes clasificadas en un lote, igual que una a una")
+
+    # Probar las redes base ligeras (arquitectura y checkpoint propio de cada una)
+    print("\n5. Probando redes base...")
+    try:
+        batch = torch.randn(2, 3, 224, 224)
+        for backbone in BACKBONES:
+            model = VisionTransformerClassifier(num_classes=2, pretrained=False, backbone=backbone).eval()
+            with torch.inference_mode():
+                assert tuple(model(batch).shape) == (2, 2)
+        paths = {model_path_for(backbone) for backbone in BACKBONES}
+        assert len(paths) == len(BACKBONES)
+        assert FlowerClassifier(backbone='resnet18').model_path == model_path_for('resnet18')
+        print(f"   ✓ {len(BACKBONES)} redes base con salida de 2 clases y checkpoints distintos")
+    except Exception as e:
+        print(f"   ✗ Error en las redes base: {e}")
+        import traceback
+        traceback.print_exc()
+
+    # Probar la cuantización INT8 (exportar, recargar y comparar con float32)
+    print("\n6. Probando cuantización INT8...")
+    try:
+        torch.manual_seed(0)
+        model = VisionTransformerClassifier(num_classes=2, pretrained=False, backbone='resnet18').eval()
+        calibration = [torch.randn(4, 3, 224, 224) for _ in range(2)]
+        with tempfile.TemporaryDirectory() as tmp:
+            for mode in ('dynamic', 'static'):
+                quantized = quantize_model(model, mode, calibration)
+                path = os.path.join(tmp, f'model_int8_{mode}.pth')
+                save_quantized(quantized, path, mode, 'resnet18')
+                fresh = VisionTransformerClassifier(num_classes=2, pretrained=False, backbone='resnet18')
+                loaded = load_quantized(fresh, path, mode)
+                with torch.inference_mode():
+                    expected = quantized.predict_proba(batch)
+                    assert torch.allclose(loaded.predict_proba(batch), expected)
+                    assert (expected - model.predict_proba(batch)).abs().max() < 0.2
+                print(f"   ✓ Cuantización {mode}: recargada igual y cercana a float32")
+    except Exception as e:
+        print(f"   ✗ Error en la cuantización: {e}")
+        import traceback
+        traceback.print_exc()
+
     print("\n" + "="*60)
     print("PRUEBA COMPLETADA")
     print("="*60)
     return True
 
+def test_prediction_table():
+    print("="*60)
+    print("PRUEBA DE LA TABLA DE PREDICCIONES")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        classifier = random_weight_classifier(tmp)
+        images = write_test_images(tmp, 4)
+        expected = classifier.predict_batch(images)
+
+        # La tabla responde lo mismo que el modelo
+        table = classifier.enable_prediction_table(paths=images)
+        assert len(table) == len(images) and os.path.exists(table.table_path)
+        for path, (label, conf) in zip(images, expected):
+            assert table.lookup(path) == (label, conf)
+            cached_label, cached_conf = classifier.predict(path)
+            assert cached_label == label and abs(cached_conf - conf) < 1e-4
+        print(f"  ✓ {len(table)} imágenes respondidas desde la tabla")
+
+        # Recargada del disco no reclasifica; una imagen modificada sí
+        Image.new('RGB', (64, 64), (200, 30, 30)).save(images[0])
+        os.utime(images[0], ns=(1, 1))
+        reloaded = classifier.enable_prediction_table(paths=[])
+        assert len(reloaded) == len(images) and reloaded.lookup(images[1]) is None
+        assert reloaded.missing(images) == images[:1]
+        assert reloaded.lookup(images[1]) == expected[1]
+        assert reloaded.warm_up(classifier, images) == 1
+        assert reloaded.lookup(images[0]) == classifier.predict_batch(images[:1], use_table=False)[0]
+        print("  ✓ Tabla recargada del disco; solo se reclasifica la imagen modificada")
+
+        # Otro modelo descarta la tabla guardada
+        torch.manual_seed(1)
+        model = VisionTransformerClassifier(num_classes=2, pretrained=False, backbone='resnet18')
+        torch.save(model.state_dict(), classifier.model_path)
+        classifier.load_model()
+        assert len(classifier.enable_prediction_table(paths=[])) == 0
+        print("  ✓ La tabla de otro modelo se descarta")
+    print("\n" + "="*60)
+
+
 if __name__ == "__main__":
     test_classifier()
+    test_prediction_table()
@@ -0,0 +1,58 @@
+"""
+Script de prueba para el planificador cooperativo (WHCA*).
+Verifica que muchas abejas lleguen a la colmena sin ocupar la misma celda
+ni intercambiarse de celda en el mismo tick.
+"""
+import random
+from grid_world import GridWorld
+from cooperative_planner import CooperativePlanner
+from utils import Logger
+from config import *
+
+
+def test_cooperative_planner():
+    print("="*60)
+    print("PRUEBA DEL PLANIFICADOR COOPERATIVO")
+    print("="*60)
+
+    Logger.quiet = True
+    random.seed(2)
+    grid = GridWorld(30)
+    grid.initialize_world((0, 0), (29, 29))
+    free = [(x, y) for x in range(30) for y in range(30)
+            if grid.is_connected((x, y), grid.hive_pos) and (x, y) != grid.hive_pos]
+    starts = random.sample(free, 80)
+
+    planner = CooperativePlanner(grid, window=8)
+    for start in starts:
+        planner.add_agent(start, grid.hive_pos)
+
+    previous = list(starts)
+    for positions in planner.run(max_ticks=500):
+        flying = [pos for pos, done in zip(positions, planner.arrived) if pos != grid.hive_pos]
+        assert len(flying) == len(set(flying)), "dos abejas en la misma celda"
+        for before, after in zip(previous, positions):
+            assert abs(before[0] - after[0]) + abs(before[1] - after[1]) <= 1
+            assert grid.is_walkable(after)
+        moves = {(before, after) for before, after in zip(previous, positions) if before != after}
+        assert not any((after, before) in moves for before, after in moves), "intercambio de celdas"
+        previous = positions
+
+    assert planner.finished
+    print(f"  ✓ {len(starts)} abejas en la colmena tras {planner.time} ticks sin colisiones")
+
+    # Sin salir del mundo: cada abeja se queda en su meta y la ejecución termina
+    goals = random.sample([cell for cell in free if cell not in starts], 20)
+    parked = CooperativePlanner(grid, window=8, remove_on_arrival=False)
+    for start, goal in zip(starts[:20], goals):
+        parked.add_agent(start, goal)
+    for positions in parked.run(max_ticks=500):
+        assert len(positions) == len(set(positions)), "dos abejas en la misma celda"
+    assert parked.finished and parked.time < 500 and parked.positions == goals
+    print(f"  ✓ {len(goals)} abejas paradas en su meta tras {parked.time} ticks")
+    Logger.quiet = False
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_cooperative_planner()
@@ -0,0 +1,63 @@
+"""
+Script de prueba para la carga de datos en paralelo.
+Verifica que los trabajadores no repiten el estado de np.random (las
+variantes de aumento) y que la elección automática de trabajadores funciona.
+"""
+import os
+import pickle
+import tempfile
+import numpy as np
+from PIL import Image
+from torch.utils.data import Dataset
+from data_loading import _dataset_key, autotune_workers, make_loader, worker_candidates
+from image_shard import ImageShard
+
+
+class RandomChoiceDataset(Dataset):
+    """Cada muestra es un número de np.random, como la variante de aumento de FlowerDataset."""
+
+    def __len__(self):
+        return 32
+
+    def __getitem__(self, idx):
+        return np.random.randint(0, 2**31 - 1), idx
+
+
+def test_data_loading():
+    print("="*60)
+    print("PRUEBA DE LA CARGA DE DATOS EN PARALELO")
+    print("="*60)
+
+    loader = make_loader(RandomChoiceDataset(), batch_size=4, shuffle=True, num_workers=2, seed=0)
+    for epoch in range(2):
+        values = [int(v) for batch, _ in loader for v in batch]
+        assert len(set(values)) == len(values) == 32
+    print("  ✓ 2 trabajadores persistentes sin elecciones aleatorias repetidas")
+
+    assert worker_candidates(16) == [0, 1, 2, 4, 8, 16] and worker_candidates(1) == [0]
+    workers = autotune_workers(RandomChoiceDataset(), batch_size=4, candidates=[0, 1, 2], probe_batches=2)
+    assert workers in (0, 1, 2)
+    print(f"  ✓ Trabajadores elegidos con la prueba corta: {workers}")
+
+    # La elección se recuerda por conjunto de datos, no por id() del objeto
+    assert _dataset_key(RandomChoiceDataset(), 4) is None
+    first, second = RandomChoiceDataset(), RandomChoiceDataset()
+    first.root_dir, second.root_dir = '/datos/train', '/datos/test'
+    assert _dataset_key(first, 4) != _dataset_key(second, 4)
+    second.root_dir = '/datos/train'
+    assert _dataset_key(first, 4) == _dataset_key(second, 4) != _dataset_key(first, 8)
+    print("  ✓ Clave estable del dataset para recordar los trabajadores")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'img.png')
+        Image.new('RGB', (32, 32), color=(200, 20, 20)).save(path)
+        shard = ImageShard.pack([path], [0], os.path.join(tmp, 'shard'), image_size=64)
+        data = pickle.dumps(shard)
+        assert len(data) < shard.images.nbytes and np.array_equal(pickle.loads(data).images, shard.images)
+    print("  ✓ El shard se pasa a los trabajadores sin copiar las imágenes")
+
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_data_loading()
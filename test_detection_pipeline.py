@@ -0,0 +1,167 @@
+"""
+Script de prueba para las etapas de detección desacopladas del movimiento.
+Usa un clasificador de prueba con latencia aleatoria para comprobar el orden
+de los resultados, la contrapresión de la cola y los resultados anticipados,
+y verifica el registro columnar de detecciones.
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+from detection_log import DetectionLog
+from detection_pipeline import AsyncDetector, LookaheadClassifier
+
+
+class SlowClassifier:
+    """Clasificador de prueba: etiqueta según el nombre y tarda un tiempo aleatorio."""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def predict(self, image_path):
+        time.sleep(random.uniform(0.0, 0.01))
+        return ('flor' if 'flor' in image_path else 'objeto'), 0.9
+
+    def predict_batch(self, images, batch_size=16):
+        with self.lock:
+            self.batches.append(len(images))
+        return [self.predict(path) for path in images]
+
+
+def test_async_detector_order():
+    print("="*60)
+    print("PRUEBA DE DETECCIÓN ASÍNCRONA")
+    print("="*60)
+
+    random.seed(0)
+    classifier = SlowClassifier()
+    log = []
+    detector = AsyncDetector(
+        lambda job: classifier.predict(job),
+        lambda job, result: log.append((job, result)),
+        workers=4,
+        queue_size=3
+    )
+
+    jobs = [f"{'flor' if i % 3 else 'objeto'}_{i}.png" for i in range(60)]
+    start = time.perf_counter()
+    for job in jobs:
+        detector.submit(job)
+    submit_time = time.perf_counter() - start
+    assert detector.drain(timeout=10)
+    assert [job for job, _ in log] == jobs
+    assert all(result[0] == ('flor' if 'flor' in job else 'objeto') for job, result in log)
+    print(f"  ✓ {len(jobs)} detecciones registradas en orden ({submit_time:.2f}s encolando)")
+
+    # Cancelar descarta lo pendiente y la etapa sigue funcionando
+    for job in jobs[:10]:
+        detector.submit(job)
+    detector.cancel()
+    log.clear()
+    detector.submit("flor_final.png")
+    assert detector.drain(timeout=10)
+    assert [job for job, _ in log] == ["flor_final.png"]
+    print("  ✓ Cancelación descarta los trabajos pendientes")
+
+    # on_result se llama fuera del cerrojo: una entrega lenta no bloquea a los demás
+    release = threading.Event()
+    slow = AsyncDetector(lambda job: job, lambda job, result: release.wait(10), workers=2)
+    slow.submit("flor_lenta.png")
+    time.sleep(0.05)
+    start = time.perf_counter()
+    assert slow.pending == 1 and not slow.drain(timeout=0.01)
+    slow.cancel()
+    assert time.perf_counter() - start < 1.0
+    release.set()
+    print("  ✓ Una entrega lenta no bloquea pending, drain ni cancel")
+    print("\n" + "="*60)
+
+
+def test_lookahead_classifier():
+    print("="*60)
+    print("PRUEBA DE CLASIFICACIÓN ANTICIPADA")
+    print("="*60)
+
+    classifier = SlowClassifier()
+    lookahead = LookaheadClassifier(classifier, batch_size=8)
+    items = [((i, i), f"{'flor' if i % 2 else 'objeto'}_{i}.png") for i in range(20)]
+    lookahead.submit(items)
+    for position, path in items:
+        assert lookahead.get(position, timeout=10) == (('flor' if 'flor' in path else 'objeto'), 0.9)
+    assert lookahead.get((99, 99)) is None
+    assert sum(classifier.batches) == len(items) and max(classifier.batches) <= 8
+    print(f"  ✓ {len(items)} celdas clasificadas en lotes de {classifier.batches}")
+
+    # Al reparar el camino se descartan las celdas que ya no están en el plan
+    lookahead.submit(items[:6])
+    assert lookahead.retain({position for position, _ in items[3:6]}) == 3
+    assert lookahead.get(items[0][0]) is None and lookahead.get(items[4][0], timeout=10) is not None
+    assert set(lookahead.results) | set(lookahead.pending) <= {items[3][0], items[5][0]}
+    print("  ✓ Las celdas fuera del camino reparado se descartan")
+    print("\n" + "="*60)
+
+
+def test_detection_log():
+    print("="*60)
+    print("PRUEBA DEL REGISTRO COLUMNAR DE DETECCIONES")
+    print("="*60)
+
+    entries = [
+        {
+            'position': (i, 2 * i),
+            'image_path': f"imagen_{i % 5}.png" if i % 9 else None,
+            'ground_truth': 'flor' if i % 2 else 'objeto',
+            'prediction': [None, 'flor', 'objeto', 'unknown'][i % 4],
+            'confidence': 0.5 if i % 4 else 0.0,
+            'correct': i % 3 == 0,
+        }
+        for i in range(50)
+    ]
+    assert DetectionLog().directory is None  # Por defecto solo en memoria
+    with tempfile.TemporaryDirectory() as directory:
+        for log_dir in (None, directory):
+            log = DetectionLog(chunk_size=7, directory=log_dir)
+            for entry in entries:
+                log.append(entry)
+            assert len(log) == 50 and log[-1] == entries[-1]
+            assert [log[i] for i in range(len(log))] == entries and list(log) == entries
+            assert log.correct == sum(entry['correct'] for entry in entries)
+            assert log.by_label['flor'] == 25 and len(log.paths) == 5
+            log.flush()
+            if log_dir is None:
+                assert log.path is None  # Sin directorio no se escribe nada
+            else:
+                rows, paths = DetectionLog.load(log.path)
+                assert len(rows) == 50 and paths == log.paths
+            log.clear()
+            assert len(log) == 0 and not log
+    print("  ✓ Filas, contadores y volcado a disco coinciden con la lista de dicts")
+
+    # Cada registro (y cada ejecución tras clear) escribe en su propio archivo
+    with tempfile.TemporaryDirectory() as directory:
+        bee = DetectionLog(chunk_size=7, directory=directory, name='abeja')
+        swarm = DetectionLog(chunk_size=7, directory=directory, name='enjambre', max_paths=2)
+        for entry in entries:
+            bee.append(entry)
+            swarm.append(entry)
+        bee.flush()
+        swarm.flush()
+        first = bee.path
+        bee.clear()
+        bee.append(entries[0])
+        bee.flush()
+        assert len({first, bee.path, swarm.path}) == 3
+        assert len(DetectionLog.load(first)[0]) == 50 and len(DetectionLog.load(swarm.path)[0]) == 50
+        assert swarm._paths_base > 0 and list(swarm) == entries
+        rows, paths = DetectionLog.load(swarm.path)
+        assert [paths[i] if i >= 0 else None for i in rows['image']] == [e['image_path'] for e in entries]
+    print("  ✓ Archivos separados por registro y por ejecución, rutas internadas acotadas")
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_async_detector_order()
+    test_lookahead_classifier()
+    test_detection_log()
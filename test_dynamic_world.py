@@ -0,0 +1,175 @@
+"""
+Script de prueba para los eventos de cambio de celdas (mundo dinámico).
+Verifica la actualización incremental del mundo, de las componentes conexas,
+de la caché de caminos de PathFinder y la reparación del camino de la abeja.
+"""
+import random
+from collections import deque
+from grid_world import GridWorld
+from search_algorithms import PathFinder
+from world_events import CellEvent, DynamicObstacles
+from utils import Logger
+from config import *
+
+
+def reachable(grid, start):
+    """Celdas alcanzables desde start (búsqueda exhaustiva de referencia)."""
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for neighbor in grid.get_neighbors(queue.popleft()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return seen
+
+
+def test_dynamic_world():
+    print("="*60)
+    print("PRUEBA DEL MUNDO DINÁMICO")
+    print("="*60)
+
+    Logger.quiet = True
+    random.seed(3)
+    grid = GridWorld(30)
+    grid.initialize_world((0, 0), (29, 29))
+    events = DynamicObstacles(grid, trees_per_step=3, objects_per_step=3, rng=random.Random(3))
+
+    grid.is_connected((0, 0), (29, 29))  # Etiquetar componentes antes de los eventos
+    for _ in range(100):
+        version = grid.version
+        changed = grid.apply_events(events.step())
+        assert grid.version == version + (1 if changed else 0)
+    grid.apply_events([CellEvent((0, 0), CELL_OBSTACLE), CellEvent((29, 29), CELL_EMPTY)])
+
+    # Listas, índices y matriz de celdas coinciden con el contenido
+    for cell_type, items in [(CELL_OBSTACLE, grid.obstacles), (CELL_FLOWER, grid.flowers), (CELL_OBJECT, grid.objects)]:
+        assert sorted(items) == sorted(map(tuple, zip(*(grid.content == cell_type).nonzero())))
+    assert set(grid.flower_index) == set(grid.flowers)
+    assert set(grid.object_index) == set(grid.objects)
+    assert grid.get_content((29, 29)) == CELL_HIVE and grid.is_walkable((0, 0))
+    print("  ✓ Listas e índices actualizados de forma incremental")
+
+    # Componentes incrementales frente a BFS
+    component = reachable(grid, (0, 0))
+    for _ in range(200):
+        pos = (random.randint(0, 29), random.randint(0, 29))
+        if grid.is_walkable(pos):
+            assert grid.is_connected((0, 0), pos) == (pos in component)
+    print("  ✓ Componentes conexas coinciden con la búsqueda exhaustiva")
+
+    # Caché de caminos: un evento lejano no invalida, uno sobre lo explorado sí
+    random.seed(5)
+    grid.initialize_world((0, 0), (29, 29))
+    pathfinder = PathFinder(grid)
+    pathfinder.set_algorithm('BFS')
+    path, explored, _ = pathfinder.find_path((0, 0), (5, 5), mode='optimal')
+    far = next(pos for pos in [(29, 0), (28, 0), (29, 1), (27, 0)] if grid.get_content(pos) == CELL_EMPTY)
+    grid.apply_events([CellEvent(far, CELL_OBSTACLE)])
+    assert pathfinder.find_path((0, 0), (5, 5), mode='optimal')[0] is path
+    grid.apply_events([CellEvent(path[3], CELL_OBSTACLE)])
+    new_path = pathfinder.find_path((0, 0), (5, 5), mode='optimal')[0]
+    assert new_path is not path and path[3] not in new_path
+    print("  ✓ La caché de caminos solo se invalida si el evento la toca")
+
+    # Reparación del camino de la abeja
+    for seed in range(20):
+        random.seed(seed)
+        grid.initialize_world((0, 0), (29, 29))
+        path, _, _ = pathfinder.find_path((0, 0), (29, 29), mode='optimal')
+        if path[0] != (0, 0):
+            continue
+        version = grid.structure_version
+        blocked = path[len(path) // 2]
+        grid.apply_events([CellEvent(blocked, CELL_OBSTACLE)])
+        repaired, version = pathfinder.repair_path(path, 2, version)
+        assert version == grid.structure_version and repaired[:3] == path[:3]
+        if grid.is_connected((0, 0), (29, 29)):
+            assert repaired[-1] == (29, 29) and blocked not in repaired
+            assert all(grid.is_walkable(pos) for pos in repaired)
+            assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(repaired, repaired[1:]))
+    print("  ✓ Caminos bloqueados reparados con desvíos válidos")
+    Logger.quiet = False
+    print("\n" + "="*60)
+
+
+def test_change_notifications():
+    print("="*60)
+    print("PRUEBA DE VERSIONES Y NOTIFICACIONES DEL MUNDO")
+    print("="*60)
+
+    Logger.quiet = True
+    random.seed(11)
+    grid = GridWorld(30)
+    grid.initialize_world((0, 0), (29, 29))
+    received = []
+    grid.subscribe(lambda kind, positions, version: received.append(kind), (STRUCTURE_CHANGE,))
+
+    # Mover la abeja es un cambio de overlay: no toca la matriz ni el grafo de búsqueda
+    pathfinder = PathFinder(grid)
+    graph = pathfinder.bfs._build_graph()
+    structure_version, content = grid.structure_version, grid.content.copy()
+    free = [pos for pos in graph if grid.get_content(pos) == CELL_FLOWER]
+    for pos in free * 10:
+        grid.set_bee_position(pos)
+        assert grid.get_cell_type(pos) == CELL_BEE
+    assert grid.structure_version == structure_version and (grid.content == content).all()
+    assert grid.overlay_version >= len(free) * 10 - 1 and not received
+    assert pathfinder.bfs._build_graph() is graph
+    print("  ✓ Los movimientos de la abeja no invalidan las cachés estructurales")
+
+    # Los eventos de obstáculos notifican y parchean el grafo memoizado
+    events = DynamicObstacles(grid, trees_per_step=4, objects_per_step=4, rng=random.Random(11))
+    for _ in range(50):
+        grid.apply_events(events.step())
+    assert received and grid.structure_version == structure_version + received.count(STRUCTURE_CHANGE)
+    patched = pathfinder.bfs._build_graph()
+    pathfinder.bfs.graph = None
+    assert patched == pathfinder.bfs._build_graph()
+    print("  ✓ Cambios estructurales notificados y grafo actualizado incrementalmente")
+    Logger.quiet = False
+    print("\n" + "="*60)
+
+
+def test_renderer_world_changes():
+    print("="*60)
+    print("PRUEBA DE LOS CAMBIOS DEL MUNDO EN EL RENDERER")
+    print("="*60)
+
+    import threading
+    import pygame
+    Logger.quiet = True
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    random.seed(5)
+    grid = GridWorld(20)
+    grid.initialize_world((0, 0), (19, 19))
+    screen = pygame.Surface((20 * CELL_SIZE, 20 * CELL_SIZE))
+    grid.render(screen)
+    renderer = grid.renderer
+    before = pygame.surfarray.array3d(renderer._static_layer)
+
+    # Los eventos llegan desde otro hilo (como en animate_path): solo se encolan
+    events = DynamicObstacles(grid, trees_per_step=4, objects_per_step=4, rng=random.Random(5))
+    thread = threading.Thread(target=lambda: [grid.apply_events(events.step()) for _ in range(10)])
+    thread.start()
+    thread.join()
+    assert renderer._pending_cells
+    assert (pygame.surfarray.array3d(renderer._static_layer) == before).all()
+
+    # El siguiente render los aplica y deja la capa igual que reconstruyéndola
+    grid.render(screen)
+    assert not renderer._pending_cells
+    incremental = pygame.surfarray.array3d(renderer._static_layer)
+    renderer.invalidate()
+    grid.render(screen)
+    assert (incremental == pygame.surfarray.array3d(renderer._static_layer)).all()
+    print("  ✓ Cambios encolados desde otro hilo y aplicados en render()")
+    Logger.quiet = False
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_dynamic_world()
+    test_change_notifications()
+    test_renderer_world_changes()
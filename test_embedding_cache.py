@@ -0,0 +1,89 @@
+"""
+Script de prueba para la caché de embeddings.
+Verifica que solo se calculan las imágenes nuevas o modificadas y que el
+entrenamiento de la capa final produce un checkpoint cargable.
+"""
+import os
+import tempfile
+import numpy as np
+import torch
+from PIL import Image
+from embedding_cache import EmbeddingCache
+from flower_classifier import AUGMENTATION_VARIANTS, FlowerClassifier, VisionTransformerClassifier
+
+
+def _write_images(directory, count, seed):
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f'img_{i}.png')
+        Image.fromarray(rng.integers(0, 256, (40, 60, 3), dtype=np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_embedding_cache():
+    print("="*60)
+    print("PRUEBA DE LA CACHÉ DE EMBEDDINGS")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        train_dir = os.path.join(tmp, 'train')
+        paths = _write_images(os.path.join(train_dir, 'daisy'), 4, seed=0)
+        classifier = FlowerClassifier(os.path.join(tmp, 'model.pth'), backbone='resnet18')
+        torch.manual_seed(0)
+        model = VisionTransformerClassifier(num_classes=2, pretrained=False, backbone='resnet18')
+
+        loads = []
+        def load_variant(path, variant):
+            loads.append((path, variant))
+            return classifier._load_variant(path, variant)
+
+        cache = EmbeddingCache('resnet18', os.path.join(tmp, 'cache'), weights='random')
+        embeddings = cache.update(model, paths, load_variant, AUGMENTATION_VARIANTS)
+        assert embeddings.shape == (4, AUGMENTATION_VARIANTS, 512) and embeddings.dtype == np.float16
+        assert len(loads) == 4 * AUGMENTATION_VARIANTS
+        with torch.inference_mode():
+            expected = model.eval().features(classifier._load_variant(paths[2], 3)[None])[0].numpy()
+        assert np.allclose(embeddings[2, 3], expected, atol=1e-2, rtol=1e-2)
+        print("  ✓ Embeddings float16 por (imagen, variante) iguales a los del modelo")
+
+        loads.clear()
+        cache.update(model, paths, load_variant, AUGMENTATION_VARIANTS)
+        assert not loads
+        _write_images(os.path.join(train_dir, 'daisy'), 1, seed=1)  # Reescribe img_0
+        os.utime(paths[0], ns=(1, 1))
+        cache.update(model, paths, load_variant, AUGMENTATION_VARIANTS)
+        assert {path for path, _ in loads} == {paths[0]}
+        print("  ✓ Solo se recalculan las imágenes modificadas")
+
+        # Una escritura interrumpida (embeddings nuevos sin manifiesto) no se lee
+        current, _ = cache.load()
+        np.lib.format.open_memmap(os.path.join(cache.directory, 'embeddings_interrumpida.npy'),
+                                  mode='w+', dtype=np.float16, shape=(4, AUGMENTATION_VARIANTS, 512))
+        reopened, _ = EmbeddingCache('resnet18', os.path.join(tmp, 'cache'), weights='random').load()
+        assert np.array_equal(reopened, current)
+        loads.clear()
+        cache.update(model, paths, load_variant, AUGMENTATION_VARIANTS)
+        assert not loads
+        print("  ✓ Una actualización interrumpida deja la caché anterior intacta")
+
+        # Cada conjunto de datos tiene su propia caché
+        other = EmbeddingCache('resnet18', os.path.join(tmp, 'cache'), weights='random', data_root=train_dir)
+        assert other.directory != cache.directory and other.load() is None
+
+        # Entrenar la capa final desde la caché y recargar el checkpoint
+        classifier.train_head(train_dir, epochs=2, pretrained=False, seed=0, cache_dir=os.path.join(tmp, 'cache'))
+        reloaded = FlowerClassifier(os.path.join(tmp, 'model.pth'), backbone='resnet18')
+        assert reloaded.load_model()
+        label, confidence = reloaded.predict(paths[1])
+        assert label in ('flor', 'objeto') and 0.0 <= confidence <= 1.0
+        assert other.load() is not None and cache.load() is not None
+        print("  ✓ Capa final entrenada desde la caché y checkpoint cargable")
+
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_embedding_cache()
@@ -0,0 +1,49 @@
+"""
+Script de prueba para el catálogo de imágenes de utils.py.
+Verifica el filtrado, la actualización al cambiar el directorio y el
+muestreo sin reemplazo con semilla.
+"""
+import os
+import tempfile
+from utils import ImageCatalog
+
+
+def test_image_catalog():
+    print("="*60)
+    print("PRUEBA DEL CATÁLOGO DE IMÁGENES")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ['a.png', 'b.JPG', 'flor_1.png', 'flor_2.jpg', 'notas.txt']:
+            open(os.path.join(directory, name), 'w').close()
+
+        catalog = ImageCatalog(check_interval=0)
+        names = [os.path.basename(path) for path in catalog.paths(directory)]
+        assert names == ['a.png', 'b.JPG', 'flor_1.png', 'flor_2.jpg']
+        assert catalog.paths(directory, extensions=('.png',), contains='flor') == [os.path.join(directory, 'flor_1.png')]
+        assert catalog.paths(directory) is catalog.paths(directory)
+        print("  ✓ Directorio listado una vez y filtrado por extensión y nombre")
+
+        # Un archivo nuevo cambia la fecha del directorio y fuerza la relectura
+        new_file = os.path.join(directory, 'c.png')
+        open(new_file, 'w').close()
+        stat = os.stat(directory)
+        os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert new_file in catalog.paths(directory)
+        print("  ✓ Listado actualizado al cambiar el directorio")
+
+        # Muestreo sin reemplazo: cada vuelta recorre todas las imágenes una vez
+        paths = catalog.paths(directory)
+        sampler = catalog.sampler(directory, seed=7)
+        first, second = sampler.sample(len(paths)), sampler.sample(len(paths))
+        assert sorted(first) == sorted(paths) and sorted(second) == sorted(paths)
+        assert catalog.sampler(directory, seed=7).sample(len(paths)) == first
+        print("  ✓ Muestreo sin reemplazo reproducible con semilla")
+
+        catalog.refresh()
+        assert catalog.choice(directory, contains='inexistente') is None
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_image_catalog()
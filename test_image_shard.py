@@ -0,0 +1,80 @@
+"""
+Script de prueba para el shard de imágenes decodificadas.
+Verifica que FlowerDataset devuelve lo mismo leyendo del shard que
+decodificando y aumentando cada imagen, y que solo se reempaqueta lo que cambió.
+"""
+import os
+import tempfile
+import numpy as np
+import torch
+from PIL import Image
+import image_shard
+from image_shard import ImageShard
+from flower_classifier import AUGMENTATION_VARIANTS, FlowerClassifier, FlowerDataset
+
+
+def _write_images(directory, sizes, seed):
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i, (height, width) in enumerate(sizes):
+        path = os.path.join(directory, f'img_{i}.jpg')
+        Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_image_shard():
+    print("="*60)
+    print("PRUEBA DEL SHARD DE IMÁGENES")
+    print("="*60)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shard_dir = os.path.join(tmp, 'shards')
+        root = os.path.join(tmp, 'train')
+        paths = _write_images(os.path.join(root, 'rose'), [(300, 200), (120, 400), (224, 224)], seed=0)
+        classifier = FlowerClassifier(os.path.join(tmp, 'model.pth'), backbone='resnet18')
+        transform = classifier.transform
+
+        plain = FlowerDataset(root, transform, apply_augmentation=False)
+        sharded = FlowerDataset(root, transform, apply_augmentation=False, use_shard=True, shard_dir=shard_dir)
+        assert os.path.dirname(sharded.shard.directory) == shard_dir
+        assert sharded.shard.images.shape == (3, 1, 224, 224, 3) and sharded.shard.images.dtype == np.uint8
+        for i in range(len(plain)):
+            image, label = plain[i]
+            shard_image, shard_label = sharded[i]
+            assert label == shard_label and torch.allclose(image, shard_image, atol=1e-6)
+        print("  ✓ Mismos tensores y etiquetas que decodificando cada imagen")
+
+        untransformed = FlowerDataset(root, apply_augmentation=False, use_shard=True, shard_dir=shard_dir)
+        raw, _ = untransformed[0]
+        assert raw.dtype == torch.uint8 and np.shares_memory(raw.numpy(), untransformed.shard.images)
+        print("  ✓ Lectura sin copia del memmap")
+
+        # Las variantes de aumento se guardan ya procesadas
+        augmented = FlowerDataset(root, transform, apply_augmentation=True, use_shard=True, shard_dir=shard_dir)
+        assert augmented.shard.images.shape == (3, AUGMENTATION_VARIANTS, 224, 224, 3)
+        for variant in range(AUGMENTATION_VARIANTS):
+            expected = classifier._load_variant(augmented.shard.paths[1], variant)
+            assert torch.allclose(augmented.shard_tensor(1, variant), expected, atol=1e-6)
+        image, _ = augmented[1]
+        assert image.shape == (3, 224, 224)
+        print(f"  ✓ {AUGMENTATION_VARIANTS} variantes de aumento precalculadas, iguales a las de cada época")
+
+        directory = sharded.shard.directory
+        paths = sharded.shard.paths  # Orden de las filas (el de FlowerDataset)
+        before = os.path.getmtime(os.path.join(directory, 'images.npy'))
+        assert ImageShard.pack(paths, [0, 0, 0], directory).matches(paths, [0, 0, 0])
+        assert os.path.getmtime(os.path.join(directory, 'images.npy')) == before
+        Image.new('RGB', (64, 64), color=(10, 200, 30)).save(paths[0])
+        os.utime(paths[0], ns=(1, 1))
+        shard = ImageShard.pack(paths, [0, 0, 0], directory)
+        assert np.array_equal(shard.images[0], image_shard.decode_image(paths[0]))
+        assert np.array_equal(shard.images[1], image_shard.decode_image(paths[1]))
+        print("  ✓ El shard se reutiliza y solo se reempaquetan las imágenes modificadas")
+
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_image_shard()
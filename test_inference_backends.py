@@ -0,0 +1,67 @@
+"""
+Script de prueba de los motores de inferencia.
+Verifica que TorchScript (y ONNX Runtime, si está instalado) dan las mismas
+predicciones que PyTorch normal sobre el mismo checkpoint.
+"""
+import importlib.util
+import os
+import tempfile
+import threading
+import numpy as np
+import torch
+from flower_classifier import FlowerClassifier, VisionTransformerClassifier
+
+
+def test_inference_backends():
+    print("="*60)
+    print("PRUEBA DE LOS MOTORES DE INFERENCIA")
+    print("="*60)
+
+    backends = ['torchscript']
+    if importlib.util.find_spec('onnx') and importlib.util.find_spec('onnxruntime'):
+        backends.append('onnx')
+    else:
+        print("  - onnx/onnxruntime no instalados: se omite el motor 'onnx'")
+
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (96, 128, 3), dtype=np.uint8) for _ in range(5)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, 'model.pth')
+        torch.manual_seed(0)
+        torch.save(VisionTransformerClassifier(num_classes=2, pretrained=False, backbone='resnet18').state_dict(), model_path)
+
+        eager = FlowerClassifier(model_path, backbone='resnet18', inference_backend='eager')
+        assert eager.load_model()
+        classes, confidences, valid = eager.predict_arrays(images, batch_size=2)
+
+        for backend in backends:
+            classifier = FlowerClassifier(model_path, backbone='resnet18', inference_backend=backend)
+            assert classifier.load_model()
+            other_classes, other_confidences, other_valid = classifier.predict_arrays(images, batch_size=2)
+            assert classifier.runtime.name == backend
+            assert os.path.exists(os.path.splitext(model_path)[0] + ('.torchscript.pt' if backend == 'torchscript' else '.onnx'))
+            assert (other_classes == classes).all() and (other_valid == valid).all()
+            assert np.abs(other_confidences - confidences).max() < 1e-4
+            print(f"  ✓ {backend}: mismas clases y confianzas que eager")
+
+        # Varios hilos a la vez sobre un clasificador recién creado: una sola exportación
+        os.remove(os.path.splitext(model_path)[0] + '.torchscript.pt')
+        shared = FlowerClassifier(model_path, backbone='resnet18', inference_backend='torchscript')
+        outputs = []
+        threads = [threading.Thread(target=lambda: outputs.append(shared.predict_arrays(images[:2])[0]))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(outputs) == 4 and all((output == classes[:2]).all() for output in outputs)
+        assert shared.runtime.name == 'torchscript'
+        assert not [name for name in os.listdir(tmp) if name.endswith('.tmp')]
+        print("  ✓ Carga y exportación concurrentes sin archivos a medio escribir")
+
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_inference_backends()
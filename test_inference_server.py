@@ -0,0 +1,82 @@
+"""
+Script de prueba para el servicio de inferencia por micro-lotes.
+Usa un clasificador de prueba con costo fijo por pasada (un solo modelo
+compartido) para comprobar que las peticiones concurrentes se agrupan.
+"""
+import asyncio
+import threading
+import time
+from inference_server import InferenceServer
+from utils import Logger
+
+
+class SerialClassifier:
+    """Clasificador de prueba: 20 ms por pasada más 1 ms por imagen, una pasada a la vez."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.table_flags = []
+
+    def predict_batch(self, images, batch_size=16, use_table=True):
+        with self.lock:
+            self.table_flags.append(use_table)
+            time.sleep(0.02 + 0.001 * len(images))
+        return [(f"clase_{image}", float(image)) for image in images]
+
+
+def test_inference_server():
+    print("="*60)
+    print("PRUEBA DEL SERVICIO DE INFERENCIA")
+    print("="*60)
+
+    Logger.quiet = True
+    classifier = SerialClassifier()
+    server = InferenceServer(classifier, max_batch=16, max_wait_ms=5)
+    results = []
+
+    def caller(k):
+        for j in range(10):
+            image = k * 100 + j
+            results.append(server.predict(image) == (f"clase_{image}", float(image)))
+
+    threads = [threading.Thread(target=caller, args=(k,)) for k in range(16)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = server.stats()
+    assert all(results) and stats['requests'] == 160
+    assert stats['mean_batch_size'] > 4 and elapsed < 160 * 0.021 / 2
+    print(f"  ✓ 160 peticiones de 16 hilos en {elapsed:.2f}s, lotes medios de {stats['mean_batch_size']:.1f}")
+
+    # Una petición aislada solo espera max_wait_ms más una pasada
+    start = time.perf_counter()
+    assert server.predict(7) == ("clase_7", 7.0)
+    assert time.perf_counter() - start < 0.2
+    assert asyncio.run(server.submit_async(8)) == ("clase_8", 8.0)
+    assert server.predict_batch([1, 2, 3]) == [("clase_1", 1.0), ("clase_2", 2.0), ("clase_3", 3.0)]
+    print("  ✓ Latencia acotada para peticiones aisladas y awaitables de asyncio")
+
+    classifier.table_flags.clear()
+    assert server.predict_batch([4, 5], use_table=False) == [("clase_4", 4.0), ("clase_5", 5.0)]
+    assert classifier.table_flags == [False]
+    print("  ✓ predict_batch respeta use_table")
+
+    # Al detener: lo encolado antes se atiende y lo posterior falla en vez de bloquear
+    pending = [server.submit(i) for i in range(40)]
+    server.stop(timeout=5.0)
+    assert [future.result(timeout=1.0) for future in pending] == [(f"clase_{i}", float(i)) for i in range(40)]
+    try:
+        server.predict(9, timeout=1.0)
+        assert False, "el servicio detenido aceptó una petición"
+    except RuntimeError:
+        pass
+    print("  ✓ stop() atiende lo encolado y rechaza las peticiones nuevas")
+    Logger.quiet = False
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_inference_server()
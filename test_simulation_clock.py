@@ -0,0 +1,43 @@
+"""
+Script de prueba para el reloj de la simulación.
+Verifica los modos acelerados y el cambio de modo durante una espera.
+"""
+import threading
+import time
+from simulation_clock import SimulationClock
+
+
+def test_simulation_clock():
+    print("="*60)
+    print("PRUEBA DEL RELOJ DE LA SIMULACIÓN")
+    print("="*60)
+
+    clock = SimulationClock('x100')
+    start = time.perf_counter()
+    for _ in range(10):
+        clock.wait(0.3)
+    assert time.perf_counter() - start < 0.3 and abs(clock.sim_time - 3.0) < 1e-9
+    print("  ✓ x100: 3s simulados en menos de 0.3s reales")
+
+    clock.set_mode('Sin límite')
+    start = time.perf_counter()
+    for _ in range(1000):
+        clock.wait(1.0)
+    assert time.perf_counter() - start < 0.5 and not clock.throttled
+    print("  ✓ Sin límite: las esperas no bloquean")
+
+    # Un cambio de modo desde otro hilo recalcula la espera en curso
+    clock.set_mode('Tiempo real')
+    threading.Timer(0.1, clock.set_mode, args=('Sin límite',)).start()
+    start = time.perf_counter()
+    clock.wait(10.0)
+    assert time.perf_counter() - start < 2.0
+    print("  ✓ El cambio de modo interrumpe la espera en tiempo real")
+
+    clock.reset()
+    assert clock.sim_time == 0.0
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_simulation_clock()
@@ -0,0 +1,50 @@
+"""
+Script de prueba para la capa de contenido y el índice espacial de GridWorld.
+Compara las consultas por radio y k-vecinos contra una búsqueda exhaustiva.
+"""
+import random
+from grid_world import GridWorld
+from utils import manhattan_distance
+from config import *
+
+
+def test_spatial_index():
+    print("="*60)
+    print("PRUEBA DEL ÍNDICE ESPACIAL")
+    print("="*60)
+
+    random.seed(7)
+    grid = GridWorld(40)
+    grid.initialize_world((0, 0), (39, 39))
+
+    # La capa de contenido no cambia al mover la abeja
+    flower = grid.flowers[0]
+    grid.set_bee_position(flower)
+    assert grid.get_cell_type(flower) == CELL_BEE
+    assert grid.get_content(flower) == CELL_FLOWER
+    grid.set_bee_position((0, 0))
+    assert grid.get_cell_type(flower) == CELL_FLOWER
+    print("  ✓ La capa de contenido es independiente de la abeja")
+
+    for _ in range(50):
+        center = (random.randint(0, 39), random.randint(0, 39))
+        radius = random.randint(0, 12)
+
+        expected = {f for f in grid.flowers if manhattan_distance(center, f) <= radius}
+        assert set(grid.flowers_within_radius(center, radius)) == expected
+
+        k = random.randint(1, 10)
+        nearest = grid.nearest_flowers(center, k)
+        distances = sorted(manhattan_distance(center, f) for f in grid.flowers)
+        assert [manhattan_distance(center, f) for f in nearest] == distances[:k]
+
+        nearest_objects = grid.nearest_objects(center, k, metric='euclidean')
+        distances = sorted((center[0] - o[0])**2 + (center[1] - o[1])**2 for o in grid.objects)
+        assert [(center[0] - o[0])**2 + (center[1] - o[1])**2 for o in nearest_objects] == distances[:k]
+
+    print("  ✓ Consultas por radio y k-vecinos coinciden con la búsqueda exhaustiva")
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_spatial_index()
@@ -0,0 +1,83 @@
+"""
+Script de prueba para el motor de enjambre.
+Verifica los campos de distancias frente a BFS, que los movimientos sean
+válidos y que las detecciones por lotes coincidan con el contenido pisado.
+"""
+import random
+from collections import deque
+import numpy as np
+from grid_world import GridWorld
+from swarm import SwarmEngine, distance_fields, UNREACHABLE
+from utils import Logger
+from config import *
+
+
+def bfs_distances(grid, target):
+    """Distancias de referencia con BFS sobre get_neighbors."""
+    distances = {target: 0}
+    queue = deque([target])
+    while queue:
+        current = queue.popleft()
+        for neighbor in grid.get_neighbors(current):
+            if neighbor not in distances:
+                distances[neighbor] = distances[current] + 1
+                queue.append(neighbor)
+    return distances
+
+
+def test_swarm():
+    print("="*60)
+    print("PRUEBA DEL MOTOR DE ENJAMBRE")
+    print("="*60)
+
+    Logger.quiet = True
+    random.seed(4)
+    grid = GridWorld(20)
+    grid.initialize_world((0, 0), (19, 19))
+
+    # Campos de distancias vectorizados frente a BFS
+    targets = [(19, 19)] + grid.flowers[:5]
+    fields = distance_fields(grid.content != CELL_OBSTACLE, targets)
+    for field, target in zip(fields, targets):
+        reference = bfs_distances(grid, target)
+        for (x, y), value in np.ndenumerate(field):
+            assert value == reference.get((x, y), UNREACHABLE)
+    print(f"  ✓ {len(targets)} campos de distancias coinciden con BFS")
+
+    # Sin reasignar objetivos, todas las abejas con camino llegan por pasos válidos
+    swarm = SwarmEngine(grid, 300, seed=1, retarget=False)
+    swarm.spawn(targets=targets)
+    start = swarm.positions.copy()
+    previous = start.copy()
+    for _ in range(200):
+        swarm.step()
+        assert (np.abs(swarm.positions - previous).sum(axis=1) <= 1).all()
+        assert (grid.content[swarm.positions[:, 0], swarm.positions[:, 1]] != CELL_OBSTACLE).all()
+        previous = swarm.positions.copy()
+    reachable = fields[swarm.target_ids, start[:, 0], start[:, 1]] != UNREACHABLE
+    goals = np.array(targets)[swarm.target_ids]
+    assert (swarm.positions[reachable] == goals[reachable]).all()
+    assert (swarm.cursors[reachable] == fields[swarm.target_ids, start[:, 0], start[:, 1]][reachable]).all()
+    print(f"  ✓ {reachable.sum()} abejas llegaron por caminos mínimos")
+
+    # Cada paso sobre una flor u objeto genera exactamente una detección
+    stats = swarm.get_statistics()
+    visited = swarm.detection_log.columns()
+    content = grid.content[visited['row'], visited['col']]
+    assert stats['total_detections'] == len(visited) and np.isin(content, [CELL_FLOWER, CELL_OBJECT]).all()
+    assert stats['cells_visited'] == swarm.cursors.sum()
+    print(f"  ✓ {stats['total_detections']} detecciones registradas en lote")
+
+    # close() cancela la suscripción al mundo
+    subscribers = len(grid._subscribers)
+    with SwarmEngine(grid, 10, seed=2) as other:
+        assert len(grid._subscribers) == subscribers + 1
+    swarm.close()
+    assert len(grid._subscribers) == subscribers - 1
+    print("  ✓ close() deja de escuchar los cambios del mundo")
+    Logger.quiet = False
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    test_swarm()
@@ -2,15 +2,23 @@
 Script para entrenar el modelo de clasificación de flores.
 Ejecuta este script antes de usar el simulador para obtener mejores resultados.
 """
+import argparse
 import os
 import sys
-from flower_classifier import FlowerClassifier
-from config import TRAIN_DIR, MODEL_PATH, EPOCHS, BATCH_SIZE
+from flower_classifier import BACKBONES, FlowerClassifier, model_path_for
+from config import TRAIN_DIR, EPOCHS, BATCH_SIZE, BACKBONE, FREEZE_BACKBONE
 from utils import Logger
 
 
-def train_model():
-    """Entrena el modelo clasificador de flores vs objetos."""
+def train_model(backbone=BACKBONE, freeze_backbone=FREEZE_BACKBONE):
+    """
+    Entrena el modelo clasificador de flores vs objetos.
+    
+    Args:
+        backbone: Red base (clave de BACKBONES); cada una tiene su checkpoint
+        freeze_backbone: Entrenar solo la capa final sobre la caché de embeddings
+    """
+    model_path = model_path_for(backbone)
     Logger.log("=" * 60)
     Logger.log("ENTRENAMIENTO DEL MODELO DE CLASIFICACIÓN")
     Logger.log("=" * 60)
@@ -41,19 +49,20 @@ def train_model():
     Logger.log(f"Configuración:")
     Logger.log(f"  - Épocas: {EPOCHS}")
     Logger.log(f"  - Batch size: {BATCH_SIZE}")
-    Logger.log(f"  - Modelo se guardará en: {MODEL_PATH}")
+    Logger.log(f"  - Red base: {backbone}" + (" (congelada, solo capa final)" if freeze_backbone else ""))
+    Logger.log(f"  - Modelo se guardará en: {model_path}")
     
     # Crear clasificador
-    classifier = FlowerClassifier()
+    classifier = FlowerClassifier(backbone=backbone)
     
     # Entrenar
     Logger.log("\nIniciando entrenamiento...")
     Logger.log("Esto puede tomar varios minutos dependiendo del hardware...")
     
     try:
-        classifier.train(train_dir=TRAIN_DIR, epochs=EPOCHS, batch_size=BATCH_SIZE)
+        classifier.train(train_dir=TRAIN_DIR, epochs=EPOCHS, batch_size=BATCH_SIZE, freeze_backbone=freeze_backbone)
         Logger.log("\n✓ Entrenamiento completado exitosamente!")
-        Logger.log(f"Modelo guardado en: {MODEL_PATH}")
+        Logger.log(f"Modelo guardado en: {model_path}")
         return True
     
     except Exception as e:
@@ -65,13 +74,19 @@ def train_model():
 
 def main():
     """Función principal."""
+    parser = argparse.ArgumentParser(description="Entrena el clasificador de flores")
+    parser.add_argument('--backbone', choices=list(BACKBONES), default=BACKBONE, help="Red base del clasificador")
+    parser.add_argument('--head-only', action='store_true', default=FREEZE_BACKBONE,
+                        help="Congelar la red base y entrenar solo la capa final (caché de embeddings)")
+    args = parser.parse_args()
+    
     print("\n🌸 ENTRENADOR DE MODELO - CLASIFICADOR DE FLORES 🌸\n")
     
     # Preguntar al usuario
     response = input("¿Deseas entrenar el modelo? (s/n): ").strip().lower()
     
     if response == 's' or response == 'si' or response == 'yes' or response == 'y':
-        success = train_model()
+        success = train_model(args.backbone, args.head_only)
         
         if success:
             print("\n" + "="*60)
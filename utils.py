@@ -1,208 +1,42 @@
 """
 Utilidades generales para el proyecto.
-Incluye funciones de procesamiento de imágenes, logging y helpers.
+Incluye logging, selección de imágenes y helpers de distancias.
+
+Este módulo no importa bibliotecas gráficas ni de visión (cv2, PIL, pygame)
+para que el núcleo de la simulación pueda ejecutarse sin pantalla. El
+procesamiento de imágenes vive en image_processing.py.
 """
-import cv2
 import numpy as np
-from PIL import Image, ImageEnhance, ImageFilter
 import os
 import random
+import threading
+import time
 from datetime import datetime
 
 
-class ImageProcessor:
-    """Clase para procesamiento avanzado de imágenes con técnicas de ecualización y mejora."""
-    
-    @staticmethod
-    def equalize_histogram_global(image):
-        """
-        Ecualización global de histograma.
-        Mejora el contraste general de la imagen.
-        """
-        if isinstance(image, Image.Image):
-            image = np.array(image)
-        
-        if len(image.shape) == 3:  # Color image
-            # Convertir a espacio de color YCrCb
-            ycrcb = cv2.cvtColor(image, cv2.COLOR_RGB2YCrCb)
-            # Ecualizar solo el canal Y (luminancia)
-            ycrcb[:, :, 0] = cv2.equalizeHist(ycrcb[:, :, 0])
-            # Convertir de vuelta a RGB
-            equalized = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2RGB)
-        else:  # Grayscale
-            equalized = cv2.equalizeHist(image)
-        
-        return Image.fromarray(equalized)
-    
-    @staticmethod
-    def equalize_histogram_adaptive(image, clip_limit=2.0, tile_grid_size=(8, 8)):
-        """
-        Ecualización adaptativa de histograma (CLAHE).
-        Mejora el contraste local, especialmente útil para imágenes subexpuestas.
-        """
-        if isinstance(image, Image.Image):
-            image = np.array(image)
-        
-        if len(image.shape) == 3:  # Color image
-            # Convertir a LAB para aplicar CLAHE en el canal L
-            lab = cv2.cvtColor(image, cv2.COLOR_RGB2LAB)
-            clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
-            lab[:, :, 0] = clahe.apply(lab[:, :, 0])
-            equalized = cv2.cvtColor(lab, cv2.COLOR_LAB2RGB)
-        else:  # Grayscale
-            clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
-            equalized = clahe.apply(image)
-        
-        return Image.fromarray(equalized)
-    
-    @staticmethod
-    def apply_gaussian_blur(image, kernel_size=5):
-        """Aplica suavizado Gaussiano."""
-        if isinstance(image, Image.Image):
-            image = np.array(image)
-        
-        blurred = cv2.GaussianBlur(image, (kernel_size, kernel_size), 0)
-        return Image.fromarray(blurred)
-    
-    @staticmethod
-    def apply_median_blur(image, kernel_size=5):
-        """Aplica suavizado de mediana (útil para eliminar ruido de sal y pimienta)."""
-        if isinstance(image, Image.Image):
-            image = np.array(image)
-        
-        blurred = cv2.medianBlur(image, kernel_size)
-        return Image.fromarray(blurred)
-    
-    @staticmethod
-    def apply_average_blur(image, kernel_size=5):
-        """Aplica suavizado promedio."""
-        if isinstance(image, Image.Image):
-            image = np.array(image)
-        
-        blurred = cv2.blur(image, (kernel_size, kernel_size))
-        return Image.fromarray(blurred)
-    
-    @staticmethod
-    def enhance_contrast(image, factor=1.5):
-        """Mejora el contraste usando PIL."""
-        if not isinstance(image, Image.Image):
-            image = Image.fromarray(image)
-        
-        enhancer = ImageEnhance.Contrast(image)
-        return enhancer.enhance(factor)
-    
-    @staticmethod
-    def enhance_brightness(image, factor=1.2):
-        """Ajusta el brillo de la imagen."""
-        if not isinstance(image, Image.Image):
-            image = Image.fromarray(image)
-        
-        enhancer = ImageEnhance.Brightness(image)
-        return enhancer.enhance(factor)
-    
-    @staticmethod
-    def sharpen_image(image):
-        """Aplica nitidez a la imagen."""
-        if not isinstance(image, Image.Image):
-            image = Image.fromarray(image)
-        
-        return image.filter(ImageFilter.SHARPEN)
-    
-    @staticmethod
-    def resize_image(image, size=(224, 224), method=Image.LANCZOS):
-        """
-        Redimensiona imagen usando interpolación de alta calidad.
-        method puede ser: Image.NEAREST, Image.BILINEAR, Image.BICUBIC, Image.LANCZOS
-        """
-        if not isinstance(image, Image.Image):
-            image = Image.fromarray(image)
-        
-        return image.resize(size, method)
-    
-    @staticmethod
-    def create_underexposed(image, factor=0.5):
-        """Crea una versión subexpuesta de la imagen."""
-        return ImageProcessor.enhance_brightness(image, factor)
-    
-    @staticmethod
-    def create_overexposed(image, factor=1.5):
-        """Crea una versión sobreexpuesta de la imagen."""
-        return ImageProcessor.enhance_brightness(image, factor)
-    
-    @staticmethod
-    def calculate_metrics(image):
-        """
-        Calcula métricas de calidad de imagen:
-        - Contraste (desviación estándar)
-        - Entropía (medida de información)
-        - Brillo promedio
-        """
-        if isinstance(image, Image.Image):
-            image = np.array(image)
-        
-        # Convertir a escala de grises si es necesario
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = image
-        
-        # Contraste (desviación estándar)
-        contrast = np.std(gray)
-        
-        # Entropía
-        histogram = cv2.calcHist([gray], [0], None, [256], [0, 256])
-        histogram = histogram.ravel() / histogram.sum()
-        entropy = -np.sum(histogram * np.log2(histogram + 1e-7))
-        
-        # Brillo promedio
-        brightness = np.mean(gray)
-        
-        return {
-            'contrast': contrast,
-            'entropy': entropy,
-            'brightness': brightness
-        }
-    
-    @staticmethod
-    def preprocess_for_model(image, apply_augmentation=True):
-        """
-        Pipeline completo de preprocesamiento para el modelo Transformer.
-        Incluye ecualización, mejora de contraste y redimensionamiento.
-        """
-        if not isinstance(image, Image.Image):
-            image = Image.fromarray(image)
-        
-        processed_images = []
-        
-        # Imagen original redimensionada
-        img_resized = ImageProcessor.resize_image(image, size=(224, 224))
-        processed_images.append(img_resized)
-        
-        if apply_augmentation:
-            # Versión con ecualización global
-            img_eq_global = ImageProcessor.equalize_histogram_global(image)
-            img_eq_global = ImageProcessor.resize_image(img_eq_global, size=(224, 224))
-            processed_images.append(img_eq_global)
-            
-            # Versión con ecualización adaptativa (CLAHE)
-            img_eq_adaptive = ImageProcessor.equalize_histogram_adaptive(image)
-            img_eq_adaptive = ImageProcessor.resize_image(img_eq_adaptive, size=(224, 224))
-            processed_images.append(img_eq_adaptive)
-            
-            # Versión con contraste mejorado
-            img_contrast = ImageProcessor.enhance_contrast(image, factor=1.5)
-            img_contrast = ImageProcessor.resize_image(img_contrast, size=(224, 224))
-            processed_images.append(img_contrast)
-        
-        return processed_images
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+CATALOG_CHECK_INTERVAL = 2.0  # Segundos entre comprobaciones de la fecha de modificación de un directorio
+
+
+def __getattr__(name):
+    """Compatibilidad: `from utils import ImageProcessor` sigue funcionando (carga diferida)."""
+    if name == 'ImageProcessor':
+        from image_processing import ImageProcessor
+        return ImageProcessor
+    raise AttributeError(f"module 'utils' has no attribute '{name}'")
 
 
 class Logger:
     """Sistema de logging para el proyecto."""
     
+    # En modo silencioso solo se muestran advertencias y errores (simulaciones por lotes)
+    quiet = False
+    
     @staticmethod
     def log(message, level="INFO"):
         """Registra un mensaje con timestamp."""
+        if Logger.quiet and level == "INFO":
+            return
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         print(f"[{timestamp}] [{level}] {message}")
     
@@ -218,15 +52,137 @@ class Logger:
             f.write(f"{'='*60}\n")
 
 
+class ImageCatalog:
+    """
+    Índice de las imágenes de cada directorio.
+
+    Cada directorio se lista una sola vez; la lista filtrada se guarda y solo
+    se vuelve a leer si cambia la fecha de modificación del directorio (como
+    mucho una comprobación cada `check_interval` segundos) o al llamar a
+    refresh(). Así la detección no paga un os.listdir por imagen, algo
+    costoso en sistemas de archivos de red.
+    """
+
+    def __init__(self, check_interval=CATALOG_CHECK_INTERVAL):
+        """
+        Args:
+            check_interval: Segundos entre comprobaciones de la fecha de
+                modificación (0 = comprobar en cada consulta)
+        """
+        self.check_interval = check_interval
+        self._listings = {}  # directorio -> [mtime_ns, última comprobación, nombres, {filtro: rutas}]
+        self._lock = threading.Lock()
+
+    def _listing(self, directory):
+        """Entrada del directorio, releyéndolo si cambió."""
+        now = time.monotonic()
+        listing = self._listings.get(directory)
+        if listing is not None and now - listing[1] < self.check_interval:
+            return listing
+        mtime = os.stat(directory).st_mtime_ns
+        if listing is not None and listing[0] == mtime:
+            listing[1] = now
+            return listing
+        names = sorted(os.listdir(directory))
+        listing = [mtime, now, names, {}]
+        self._listings[directory] = listing
+        return listing
+
+    def paths(self, directory, extensions=IMAGE_EXTENSIONS, contains=None):
+        """
+        Rutas de las imágenes de un directorio, en orden alfabético.
+
+        Args:
+            directory: Directorio a consultar
+            extensions: Extensiones admitidas (en minúsculas)
+            contains: Texto que debe aparecer en el nombre (opcional, sin distinguir mayúsculas)
+
+        Returns:
+            Lista de rutas (compartida: no modificarla)
+        """
+        with self._lock:
+            listing = self._listing(directory)
+            key = (extensions, contains)
+            paths = listing[3].get(key)
+            if paths is None:
+                paths = [
+                    os.path.join(directory, name) for name in listing[2]
+                    if name.lower().endswith(extensions)
+                    and (contains is None or contains in name.lower())
+                ]
+                listing[3][key] = paths
+            return paths
+
+    def version(self, directory):
+        """Fecha de modificación del listado vigente (cambia al releer el directorio)."""
+        with self._lock:
+            return self._listing(directory)[0]
+
+    def refresh(self, directory=None):
+        """Descarta el listado de un directorio (o de todos) para releerlo en la próxima consulta."""
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(directory, None)
+
+    def choice(self, directory, rng=random, **filters):
+        """
+        Imagen aleatoria de un directorio (con reemplazo).
+
+        Returns:
+            Ruta de la imagen, o None si no hay ninguna
+        """
+        paths = self.paths(directory, **filters)
+        return rng.choice(paths) if paths else None
+
+    def sampler(self, directory, seed=None, **filters):
+        """Crea un ImageSampler sobre las imágenes de un directorio."""
+        return ImageSampler(self, directory, seed, filters)
+
+
+class ImageSampler:
+    """
+    Muestreo sin reemplazo y reproducible: recorre las imágenes de un
+    directorio en un orden aleatorio fijado por la semilla y vuelve a
+    barajar al agotarlas (o si el directorio cambia).
+    """
+
+    def __init__(self, catalog, directory, seed=None, filters=None):
+        self.catalog = catalog
+        self.directory = directory
+        self.filters = filters or {}
+        self.rng = random.Random(seed)
+        self._deck = []
+        self._version = None
+
+    def next(self):
+        """
+        Siguiente imagen.
+
+        Returns:
+            Ruta de la imagen, o None si el directorio no tiene imágenes
+        """
+        version = self.catalog.version(self.directory)
+        if not self._deck or version != self._version:
+            self._deck = list(self.catalog.paths(self.directory, **self.filters))
+            self.rng.shuffle(self._deck)
+            self._version = version
+        return self._deck.pop() if self._deck else None
+
+    def sample(self, count):
+        """Lista de `count` imágenes sin repetir dentro de cada vuelta."""
+        return [self.next() for _ in range(count)]
+
+
+# Catálogo compartido por todos los cargadores de imágenes
+image_catalog = ImageCatalog()
+
+
 def load_random_object_sprite(objects_dir):
     """Carga un sprite de objeto aleatorio desde la carpeta objectos."""
     try:
-        object_files = [f for f in os.listdir(objects_dir) 
-                       if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
-        if object_files:
-            random_object = random.choice(object_files)
-            return os.path.join(objects_dir, random_object)
-        return None
+        return image_catalog.choice(objects_dir)
     except Exception as e:
         Logger.log(f"Error cargando sprite de objeto: {e}", "ERROR")
         return None
@@ -235,12 +191,7 @@ def load_random_object_sprite(objects_dir):
 def load_random_flower_photo(flowers_dir):
     """Carga una foto de flor real aleatoria desde fotos_flores_proyecto."""
     try:
-        flower_files = [f for f in os.listdir(flowers_dir) 
-                       if f.lower().endswith('.png') and 'flor' in f.lower()]
-        if flower_files:
-            random_flower = random.choice(flower_files)
-            return os.path.join(flowers_dir, random_flower)
-        return None
+        return image_catalog.choice(flowers_dir, extensions=('.png',), contains='flor')
     except Exception as e:
         Logger.log(f"Error cargando foto de flor: {e}", "ERROR")
         return None
@@ -249,14 +200,7 @@ def load_random_flower_photo(flowers_dir):
 def load_random_flower_test_image(test_dir):
     """Selecciona una imagen de flor aleatoria desde el conjunto de prueba."""
     try:
-        flower_files = [
-            f for f in os.listdir(test_dir)
-            if f.lower().endswith(('.png', '.jpg', '.jpeg'))
-        ]
-        if flower_files:
-            random_flower = random.choice(flower_files)
-            return os.path.join(test_dir, random_flower)
-        return None
+        return image_catalog.choice(test_dir)
     except Exception as e:
         Logger.log(f"Error cargando imagen de flor de prueba: {e}", "ERROR")
         return None
@@ -265,14 +209,7 @@ def load_random_flower_test_image(test_dir):
 def load_random_object_image(objects_dir):
     """Selecciona una imagen de objeto aleatoria desde la carpeta de objetos."""
     try:
-        object_files = [
-            f for f in os.listdir(objects_dir)
-            if f.lower().endswith(('.png', '.jpg', '.jpeg'))
-        ]
-        if object_files:
-            random_object = random.choice(object_files)
-            return os.path.join(objects_dir, random_object)
-        return None
+        return image_catalog.choice(objects_dir)
     except Exception as e:
         Logger.log(f"Error cargando imagen de objeto: {e}", "ERROR")
         return None
@@ -0,0 +1,83 @@
+"""
+Eventos de cambio de celdas para mundos dinámicos.
+Define el evento CellEvent y un generador de eventos de ejemplo (árboles que
+crecen y objetos que se mueven) que se aplican con GridWorld.apply_events().
+"""
+import random
+from collections import namedtuple
+from config import *
+
+
+# Cambio del contenido de una celda: position=(fila, columna), cell_type=CELL_*
+CellEvent = namedtuple('CellEvent', ['position', 'cell_type'])
+
+
+class DynamicObstacles:
+    """
+    Genera lotes de eventos que hacen variar el mundo con el tiempo:
+    árboles que crecen junto a otros árboles y objetos que se desplazan a
+    una celda vecina libre.
+    """
+
+    def __init__(self, grid_world, trees_per_step=DYNAMIC_TREES_PER_STEP,
+                 objects_per_step=DYNAMIC_OBJECTS_PER_STEP, rng=None):
+        """
+        Inicializa el generador.
+
+        Args:
+            grid_world: Instancia de GridWorld
+            trees_per_step: Árboles nuevos por lote
+            objects_per_step: Objetos que se mueven por lote
+            rng: Instancia de random.Random (opcional, para reproducibilidad)
+        """
+        self.grid_world = grid_world
+        self.trees_per_step = trees_per_step
+        self.objects_per_step = objects_per_step
+        self.rng = rng or random.Random()
+
+    def _is_free(self, position, taken):
+        """Celda vacía, sin abeja ni colmena y no usada ya en el lote."""
+        world = self.grid_world
+        return (
+            0 <= position[0] < world.size and 0 <= position[1] < world.size
+            and position not in taken
+            and position != world.bee_pos
+            and position != world.hive_pos
+            and world.get_content(position) == CELL_EMPTY
+        )
+
+    def _free_neighbors(self, position, taken):
+        x, y = position
+        candidates = [(x - 1, y), (x, y + 1), (x + 1, y), (x, y - 1)]
+        return [pos for pos in candidates if self._is_free(pos, taken)]
+
+    def step(self):
+        """
+        Genera el siguiente lote de eventos.
+
+        Returns:
+            Lista de CellEvent
+        """
+        world = self.grid_world
+        events = []
+        taken = set()
+
+        if world.obstacles:
+            for _ in range(self.trees_per_step):
+                tree = self.rng.choice(world.obstacles)
+                free = self._free_neighbors(tree, taken)
+                if free:
+                    position = self.rng.choice(free)
+                    taken.add(position)
+                    events.append(CellEvent(position, CELL_OBSTACLE))
+
+        if world.objects:
+            for obj in self.rng.sample(world.objects, min(self.objects_per_step, len(world.objects))):
+                free = self._free_neighbors(obj, taken)
+                if free and obj not in taken:
+                    position = self.rng.choice(free)
+                    taken.update((obj, position))
+                    events.append(CellEvent(obj, CELL_EMPTY))
+                    events.append(CellEvent(position, CELL_OBJECT))
+
+        return events